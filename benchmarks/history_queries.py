@@ -0,0 +1,183 @@
+"""Measure history query latency as the clipboard database grows.
+
+Builds a synthetic database for each requested size and times the queries the
+server runs on startup and for ``/history`` and ``/paste --id``::
+
+    python benchmarks/history_queries.py --sizes 10000 100000 1000000
+
+Pass ``--without-indexes`` to drop the secondary indexes first and compare.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from remoclip.db import (  # noqa: E402
+    CLIPBOARD_STATE_ID,
+    content_digest,
+    content_preview,
+    create_session_factory,
+    load_clipboard_state,
+    session_scope,
+)
+
+# The server restores its clipboard from this single row on startup.
+STARTUP_QUERY = "clipboard state on startup"
+
+QUERIES: dict[str, str] = {
+    "history first page": (
+        "SELECT e.id, e.timestamp, e.hostname, e.action, b.content "
+        "FROM clipboard_events e JOIN clipboard_blobs b ON b.hash = e.content_hash "
+        "WHERE e.action != 'history' ORDER BY e.id DESC LIMIT 20"
+    ),
+    "history deep page": (
+        "SELECT e.id, e.timestamp, e.hostname, e.action, b.content "
+        "FROM clipboard_events e JOIN clipboard_blobs b ON b.hash = e.content_hash "
+        "WHERE e.action != 'history' AND e.id < :middle ORDER BY e.id DESC LIMIT 20"
+    ),
+    "paste by id": (
+        "SELECT b.content FROM clipboard_events e "
+        "JOIN clipboard_blobs b ON b.hash = e.content_hash "
+        "WHERE e.id = :middle AND e.action != 'history'"
+    ),
+    "events in the last day": (
+        "SELECT count(*) FROM clipboard_events WHERE timestamp >= :since"
+    ),
+}
+
+ACTIONS = ("copy", "paste", "paste", "history")
+
+
+def populate(db_path: Path, rows: int) -> None:
+    create_session_factory(db_path).kw["bind"].dispose()
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    connection = sqlite3.connect(db_path)
+    with connection:
+        # Roughly one distinct value per ten events, as pastes repeat copies.
+        distinct = max(rows // 10, 1)
+        connection.executemany(
+            "INSERT INTO clipboard_blobs (hash, size, preview, content) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                (
+                    content_digest(f"value {index}"),
+                    len(f"value {index}"),
+                    content_preview(f"value {index}"),
+                    f"value {index}",
+                )
+                for index in range(distinct)
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO clipboard_events (timestamp, hostname, action, content_hash) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                (
+                    (start + timedelta(seconds=index)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    f"host-{index % 12}",
+                    ACTIONS[index % len(ACTIONS)],
+                    content_digest(f"value {index % distinct}"),
+                )
+                for index in range(rows)
+            ),
+        )
+        copies = range(ACTIONS.index("copy"), rows, len(ACTIONS))
+        connection.execute(
+            "INSERT INTO clipboard_state (id, content_hash, version, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                CLIPBOARD_STATE_ID,
+                content_digest(f"value {copies[-1] % distinct}"),
+                len(copies),
+                (start + timedelta(seconds=copies[-1])).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            ),
+        )
+    connection.close()
+
+
+def drop_secondary_indexes(db_path: Path) -> None:
+    connection = sqlite3.connect(db_path)
+    with connection:
+        for (name,) in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name = 'clipboard_events' AND name != 'ix_clipboard_events_content_hash' "
+            "AND sql IS NOT NULL"
+        ).fetchall():
+            connection.execute(f"DROP INDEX {name}")
+    connection.close()
+
+
+def time_query(run: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def load_state(session_factory) -> None:
+    with session_scope(session_factory) as session:
+        load_clipboard_state(session)
+
+
+def benchmark(db_path: Path, rows: int, repeat: int) -> dict[str, float]:
+    session_factory = create_session_factory(db_path)
+    results = {STARTUP_QUERY: time_query(lambda: load_state(session_factory), repeat)}
+    session_factory.kw["bind"].dispose()
+    connection = sqlite3.connect(db_path)
+    since = datetime(2020, 1, 1) + timedelta(seconds=rows - 86400)
+    parameters = {"middle": rows // 2, "since": since.strftime("%Y-%m-%d %H:%M:%S.%f")}
+    results.update(
+        (name, time_query(lambda: connection.execute(sql, parameters).fetchall(), repeat))
+        for name, sql in QUERIES.items()
+    )
+    connection.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="History sizes (event rows) to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+    parser.add_argument(
+        "--without-indexes",
+        action="store_true",
+        help="Drop secondary indexes before measuring",
+    )
+    args = parser.parse_args()
+
+    names = [STARTUP_QUERY, *QUERIES]
+    width = max(len(name) for name in names)
+    print(f"{'rows':>10}  " + "  ".join(f"{name:>{width}}" for name in names))
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.sizes:
+            db_path = Path(directory) / f"history-{rows}.sqlite"
+            populate(db_path, rows)
+            if args.without_indexes:
+                drop_secondary_indexes(db_path)
+            results = benchmark(db_path, rows, args.repeat)
+            print(
+                f"{rows:>10}  "
+                + "  ".join(f"{results[name]:>{width - 3}.3f} ms" for name in names)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,21 @@ The package exposes CLI entrypoints:
 - remoclip_server: server CLI
 """
 
-from importlib.metadata import version, PackageNotFoundError
-
-try:
-    __version__ = version("remoclip")
-except PackageNotFoundError:  # pragma: no cover
-    __version__ = "0.0.0"
+from __future__ import annotations
 
 __all__ = ["__version__"]
+
+
+def __getattr__(name: str) -> str:
+    # Resolved on first access: importlib.metadata would otherwise add to the
+    # start-up time of every client invocation.
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        value = version("remoclip")
+    except PackageNotFoundError:  # pragma: no cover
+        value = "0.0.0"
+    globals()["__version__"] = value
+    return value
@@ -0,0 +1,203 @@
+"""Local agent that answers ``remoclip`` copy and paste calls.
+
+``remoclip agent`` keeps one client with open connections to the server and
+listens on the Unix socket named by ``client.agent_socket``, speaking the
+frames of :mod:`remoclip.frames`. The CLI tries the agent first and talks to
+the server itself when no agent answers.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Mapping
+
+from .client_cli import RemoClipClient
+from .config import FEED_COMPLETE_HEADER, RemoClipConfig
+from .frames import handle_request, read_frame, write_frame
+
+logger = logging.getLogger(__name__)
+
+# Delay before reconnecting to a failed feed, doubled up to the maximum.
+FEED_RETRY_MIN = 1.0
+FEED_RETRY_MAX = 60.0
+# How often a server whose feed misses local copies is asked again.
+INCOMPLETE_FEED_RECHECK = 300.0
+
+
+class MemoryPasteCache:
+    """In-memory stand-in for :class:`~remoclip.client_cli.PasteCache`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entry: tuple[str, str] | None = None
+
+    def load(self) -> tuple[str, str] | None:
+        with self._lock:
+            return self._entry
+
+    def store(self, etag: str, content: str) -> None:
+        with self._lock:
+            self._entry = (etag, content)
+
+
+class ClipboardAgent:
+    """Copy and paste through one long-lived client.
+
+    While the server's ``/watch`` feed is connected and reports every
+    clipboard change, a paste returns the last value it delivered without
+    contacting the server. Otherwise pastes are forwarded, conditionally when
+    the client has a paste cache, so an unchanged clipboard costs a ``304``.
+    Instances follow the ``start()``/``stop()`` protocol of the server's
+    background services.
+    """
+
+    name = "remoclip-agent-feed"
+
+    def __init__(self, client: RemoClipClient) -> None:
+        self._client = client
+        self._lock = threading.Lock()
+        # Version and content from the feed, or None while it cannot be trusted.
+        self._current: tuple[int, str] | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def copy(self, content: str) -> None:
+        version = self._client.copy(content).get("version")
+        if isinstance(version, int):
+            # The feed delivers the same change shortly; recording it now
+            # keeps a paste right after this copy from returning the old value.
+            self._advance(version, content, reset=False)
+
+    def paste(self) -> str:
+        with self._lock:
+            current = self._current
+        if current is not None:
+            return current[1]
+        return self._client.paste()
+
+    def _advance(self, version: int, content: str, *, reset: bool) -> None:
+        with self._lock:
+            if self._current is None:
+                if reset:
+                    self._current = (version, content)
+            elif version > self._current[0]:
+                self._current = (version, content)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        # The feed thread may be blocked reading the stream until the next
+        # heartbeat; as a daemon thread it is not waited for.
+        self._stopped.set()
+        self._thread = None
+
+    def _run(self) -> None:
+        delay = FEED_RETRY_MIN
+        while not self._stopped.is_set():
+            incomplete = False
+
+            def connected(headers: Mapping[str, str]) -> None:
+                nonlocal incomplete
+                incomplete = headers.get(FEED_COMPLETE_HEADER) != "1"
+
+            try:
+                # -1 never matches the server's version, so the current
+                # clipboard is delivered first.
+                for change in self._client.watch(since=-1, on_connect=connected):
+                    if incomplete or self._stopped.is_set():
+                        break
+                    self._advance(int(change["version"]), str(change["content"]), reset=True)
+                    delay = FEED_RETRY_MIN
+            except Exception as exc:
+                logger.warning("Clipboard feed unavailable: %s", exc)
+            with self._lock:
+                self._current = None
+            if incomplete:
+                logger.info(
+                    "The server's feed misses local clipboard changes; "
+                    "forwarding every paste"
+                )
+                self._stopped.wait(INCOMPLETE_FEED_RECHECK)
+            else:
+                self._stopped.wait(delay)
+                delay = min(delay * 2, FEED_RETRY_MAX)
+
+
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    server: AgentServer
+
+    def handle(self) -> None:
+        agent = self.server.agent
+        while True:
+            try:
+                frame = read_frame(self.rfile)
+            except EOFError:
+                return
+            if frame is None:
+                return
+            write_frame(self.wfile, *handle_request(*frame, agent.copy, agent.paste))
+
+
+class AgentServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server, private to the current user, for a :class:`ClipboardAgent`."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, agent: ClipboardAgent) -> None:
+        self.agent = agent
+        _remove_stale_socket(socket_path)
+        # The agent acts with the configured security token, so only this
+        # user may connect.
+        previous = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), _AgentRequestHandler)
+        finally:
+            os.umask(previous)
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    if not socket_path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except OSError:
+        socket_path.unlink()
+    else:
+        raise ValueError(f"an agent is already listening on {socket_path}")
+    finally:
+        probe.close()
+
+
+def serve(config: RemoClipConfig) -> None:
+    """Run the agent for *config* until interrupted."""
+
+    socket_path = config.client.agent_socket_path
+    if socket_path is None:
+        raise ValueError("client.agent_socket must be set to run the agent")
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    client = RemoClipClient(config, paste_cache=MemoryPasteCache())
+    agent = ClipboardAgent(client)
+    server = AgentServer(socket_path, agent)
+    agent.start()
+    logger.info("Agent listening on %s", socket_path)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover - manual interrupt
+        pass
+    finally:
+        server.server_close()
+        agent.stop()
+        client.close()
+        socket_path.unlink(missing_ok=True)
@@ -0,0 +1,423 @@
+"""Asyncio client for the remoclip server.
+
+:class:`AsyncRemoClipClient` offers the copy, paste, history, search and
+delete calls of :class:`~remoclip.client_cli.RemoClipClient` as coroutines,
+so one event loop can run many of them at once. It speaks HTTP/1.1 over
+:mod:`asyncio` streams to ``http://`` and ``https://`` URLs or the configured
+Unix socket, keeps connections open for reuse, and raises the same
+``requests`` exceptions as the synchronous client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import socket
+import ssl
+from http.client import HTTPException, HTTPMessage, parse_headers
+from typing import Any, AsyncIterator, Iterable
+from urllib.parse import urlsplit
+
+from .client_cli import (
+    HISTORY_PAGE_SIZE,
+    PasteCache,
+    _advertised_codecs,
+    _basic_auth,
+    _history_options,
+    _http_error,
+    _HTTPResponse,
+    _negotiate_codec,
+    _rejected_encoding,
+    _requests,
+)
+from .compression import available_codecs, compress, decompress, is_codec_available
+from .config import SECURITY_TOKEN_HEADER, RemoClipConfig
+
+# Requests in flight, and so open connections, per client by default. Every
+# open connection occupies a server worker, so keep this below the server's
+# ``max_workers``.
+DEFAULT_MAX_CONNECTIONS = 4
+
+# Upper bound on the header lines of one response.
+_MAX_HEADERS = 100
+
+_Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncRemoClipClient:
+    """Asyncio counterpart of :class:`~remoclip.client_cli.RemoClipClient`.
+
+    At most *max_connections* requests are sent at a time; further calls
+    wait for a connection to become free. Idle connections are kept for the
+    next request until the server closes them or :meth:`close` is called.
+    Proxies from the environment are not used.
+    """
+
+    def __init__(
+        self,
+        config: RemoClipConfig,
+        *,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        paste_cache: Any | None = None,
+    ):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.config = config
+        self._socket_path = config.client.socket_path
+        self._ssl: ssl.SSLContext | None = None
+        self._headers = {"Accept-Encoding": ", ".join(available_codecs())}
+        if self._socket_path is not None:
+            self._host_header = "localhost"
+            self._prefix = ""
+            cache_key = f"http+unix://{self._socket_path}"
+        else:
+            base_url = config.client.url.rstrip("/")
+            url = urlsplit(base_url)
+            if url.scheme not in ("http", "https") or not url.hostname:
+                raise ValueError(f"unsupported client URL: {config.client.url}")
+            self._host = url.hostname
+            self._port = url.port or (443 if url.scheme == "https" else 80)
+            if url.scheme == "https":
+                self._ssl = ssl.create_default_context()
+            # Credentials in the URL become a basic Authorization header.
+            self._host_header = url.netloc.rpartition("@")[2]
+            authorization = _basic_auth(url)
+            if authorization is not None:
+                self._headers["Authorization"] = authorization
+            self._prefix = url.path
+            cache_key = base_url
+        if config.security_token:
+            self._headers[SECURITY_TOKEN_HEADER] = config.security_token
+        compression = config.client.compression
+        self._request_codec: str | None = None
+        if compression.enabled:
+            self._request_codec = (
+                compression.codec if is_codec_available(compression.codec) else "gzip"
+            )
+        self._compress_min_size = compression.min_size
+        # Request encodings the server advertised, unknown until it answers.
+        self._server_codecs: tuple[str, ...] | None = None
+        cache_path = config.client.paste_cache_path
+        if paste_cache is None and cache_path is not None:
+            paste_cache = PasteCache(cache_path, cache_key)
+        self._paste_cache = paste_cache
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: list[_Connection] = []
+
+    async def close(self) -> None:
+        """Close the connections kept open for reuse."""
+
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def __aenter__(self) -> AsyncRemoClipClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    def _payload(self, extra: dict[str, Any] | None = None) -> dict[str, Any]:
+        payload = {"hostname": socket.gethostname()}
+        if extra:
+            payload.update(extra)
+        return payload
+
+    async def _open(self) -> _Connection:
+        if self._socket_path is not None:
+            return await asyncio.open_unix_connection(str(self._socket_path))
+        return await asyncio.open_connection(self._host, self._port, ssl=self._ssl)
+
+    def _acquire(self) -> _Connection | None:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            # An end of stream while idle means the server closed it.
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return None
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        payload: dict[str, Any] | None = None,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float,
+    ) -> _HTTPResponse:
+        request_headers = {**self._headers, **(headers or {})}
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            request_headers.setdefault("Content-Type", "application/json")
+        async with self._slots:
+            try:
+                status, reason, response_headers, data = await asyncio.wait_for(
+                    self._exchange(method, path, body, request_headers), timeout
+                )
+            except (
+                OSError,
+                EOFError,
+                ValueError,
+                HTTPException,
+                asyncio.TimeoutError,
+            ) as exc:
+                # ValueError covers unparseable lengths in a malformed response.
+                raise _requests().RequestException(str(exc) or type(exc).__name__) from exc
+        if status >= 400:
+            raise _http_error(status, reason, response_headers, data)
+        return _HTTPResponse(
+            status, json.loads(data.decode("utf-8")) if data else {}, response_headers
+        )
+
+    async def _exchange(
+        self, method: str, path: str, body: bytes | None, headers: dict[str, str]
+    ) -> tuple[int, str, HTTPMessage, bytes]:
+        lines = [f"{method} {self._prefix}{path} HTTP/1.1", f"Host: {self._host_header}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+        connection = self._acquire()
+        reused = connection is not None
+        if connection is None:
+            connection = await self._open()
+        reader, writer = connection
+        try:
+            try:
+                status_line = await _send(reader, writer, request)
+            except ConnectionError:
+                # The server may close an idle connection just as it is
+                # reused; the request never reached it, so it is sent again.
+                if not reused:
+                    raise
+                writer.close()
+                reader, writer = await self._open()
+                status_line = await _send(reader, writer, request)
+            status, reason, response_headers, data, keep_alive = await _read_response(
+                reader, status_line, method
+            )
+        except BaseException:
+            # Also reached when the timeout cancels the exchange, which
+            # leaves the connection in an unknown state.
+            writer.close()
+            raise
+        if keep_alive:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        encoding = (response_headers.get("Content-Encoding") or "").strip().lower()
+        if data and encoding and encoding != "identity":
+            data = decompress(data, encoding)
+        return status, reason, response_headers, data
+
+    async def copy(self, content: str, timeout: float = 5.0) -> dict[str, Any]:
+        payload = self._payload({"content": content})
+        codec = _negotiate_codec(self._request_codec, self._server_codecs)
+        response = None
+        if codec is not None and len(content) >= self._compress_min_size:
+            try:
+                response = await self._request(
+                    "POST",
+                    "/copy",
+                    body=compress(json.dumps(payload).encode("utf-8"), codec),
+                    headers={"Content-Type": "application/json", "Content-Encoding": codec},
+                    timeout=timeout,
+                )
+            except Exception as exc:
+                # Sent again uncompressed when the server cannot decode it.
+                advertised = _rejected_encoding(exc, codec)
+                if advertised is None:
+                    raise
+                self._server_codecs = advertised
+        if response is None:
+            response = await self._request("POST", "/copy", payload=payload, timeout=timeout)
+        advertised = _advertised_codecs(response.headers)
+        if advertised is not None:
+            self._server_codecs = advertised
+        return response.json()
+
+    async def paste(self, event_id: int | None = None, timeout: float = 5.0) -> str:
+        """Return the clipboard content, or the history entry *event_id*.
+
+        With a paste cache configured, the current clipboard is only
+        downloaded when it differs from the cached copy.
+        """
+
+        extra: dict[str, Any] | None = None
+        if event_id is not None:
+            extra = {"id": event_id}
+        cache = self._paste_cache if event_id is None else None
+        cached = cache.load() if cache is not None else None
+        headers: dict[str, str] = {}
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        response = await self._request(
+            "GET", "/paste", payload=self._payload(extra), headers=headers, timeout=timeout
+        )
+        if cached is not None and response.status_code == 304:
+            return cached[1]
+        content = response.json().get("content", "")
+        if cache is not None:
+            etag = response.headers.get("ETag")
+            if etag:
+                try:
+                    cache.store(etag, content)
+                except OSError:
+                    # An unwritable cache only costs a full download next time.
+                    pass
+        return content
+
+    async def history(
+        self,
+        limit: int | None = None,
+        event_id: int | None = None,
+        timeout: float = 5.0,
+        *,
+        before_id: int | None = None,
+        after_id: int | None = None,
+        brief: bool = False,
+        from_hostname: str | None = None,
+        actions: Iterable[str] | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> dict[str, Any]:
+        """Return one page of history; see :meth:`RemoClipClient.history`."""
+
+        extra = _history_options(
+            limit=limit,
+            event_id=event_id,
+            before_id=before_id,
+            after_id=after_id,
+            brief=brief,
+            from_hostname=from_hostname,
+            actions=actions,
+            since=since,
+            until=until,
+        )
+        response = await self._request(
+            "GET", "/history", payload=self._payload(extra), timeout=timeout
+        )
+        return response.json()
+
+    async def iter_history(
+        self,
+        page_size: int = HISTORY_PAGE_SIZE,
+        timeout: float = 5.0,
+        *,
+        brief: bool = False,
+        **filters: Any,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield every history entry, newest first, fetching one page at a time."""
+
+        before_id: int | None = None
+        while True:
+            page = await self.history(
+                limit=page_size,
+                before_id=before_id,
+                timeout=timeout,
+                brief=brief,
+                **filters,
+            )
+            for entry in page.get("history", []):
+                yield entry
+            before_id = page.get("next_before_id")
+            if before_id is None:
+                return
+
+    async def search(
+        self,
+        query: str,
+        limit: int | None = None,
+        offset: int = 0,
+        timeout: float = 5.0,
+    ) -> dict[str, Any]:
+        extra: dict[str, Any] = {"query": query}
+        if limit is not None:
+            extra["limit"] = limit
+        if offset:
+            extra["offset"] = offset
+        response = await self._request(
+            "GET", "/history/search", payload=self._payload(extra), timeout=timeout
+        )
+        return response.json()
+
+    async def delete_history(self, event_id: int, timeout: float = 5.0) -> dict[str, Any]:
+        response = await self._request(
+            "DELETE", "/history", payload=self._payload({"id": event_id}), timeout=timeout
+        )
+        return response.json()
+
+
+async def _send(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes
+) -> bytes:
+    """Send *request* and return the status line of its response."""
+
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed by the server")
+    return status_line
+
+
+async def _read_response(
+    reader: asyncio.StreamReader, status_line: bytes, method: str
+) -> tuple[int, str, HTTPMessage, bytes, bool]:
+    """Read the rest of a response: status, reason, headers, body, keep-alive."""
+
+    parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+        raise HTTPException(f"malformed status line: {status_line!r}")
+    version, status = parts[0], int(parts[1])
+    reason = parts[2] if len(parts) > 2 else ""
+
+    header_lines = []
+    while True:
+        line = await reader.readline()
+        header_lines.append(line)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(header_lines) > _MAX_HEADERS:
+            raise HTTPException("too many response headers")
+    headers = parse_headers(io.BytesIO(b"".join(header_lines)))
+
+    keep_alive = (
+        version == "HTTP/1.1" and (headers.get("Connection") or "").lower() != "close"
+    )
+    if method == "HEAD" or status in (204, 304) or status < 200:
+        data = b""
+    elif (headers.get("Transfer-Encoding") or "").lower() == "chunked":
+        data = await _read_chunked(reader)
+    elif headers.get("Content-Length") is not None:
+        data = await reader.readexactly(int(headers["Content-Length"]))
+    else:
+        data = await reader.read()
+        keep_alive = False
+    return status, reason, headers, data, keep_alive
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    body = bytearray()
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            raise asyncio.IncompleteReadError(bytes(body), None)
+        size = int(size_line.split(b";", 1)[0].strip(), 16)
+        if size == 0:
+            break
+        body += await reader.readexactly(size)
+        await reader.readexactly(2)
+    # Trailer fields, if any, end with an empty line.
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+    return bytes(body)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run *action* every *interval* seconds on a daemon thread.
+
+    Instances follow the ``start()``/``stop()`` protocol that
+    :func:`remoclip.server_cli.serve` uses for ``BACKGROUND_SERVICES``.
+    Failures are logged and the task carries on with the next run.
+    """
+
+    def __init__(self, name: str, interval: float, action: Callable[[], object]) -> None:
+        self.name = name
+        self.interval = interval
+        self._action = action
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> None:
+        try:
+            self._action()
+        except Exception:
+            logger.exception("Background task %s failed", self.name)
+
+    def start(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopped.set()
+        thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.run_once()
@@ -1,24 +1,138 @@
 from __future__ import annotations
 
 import argparse
+import base64
 import json
+import os
+import select
 import socket
 import sys
+import textwrap
+import threading
 from http.client import HTTPConnection, HTTPException
 from pathlib import Path
-from typing import Any
+from types import ModuleType
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping
 
-from urllib.parse import quote, urlsplit
-
-import requests
-from requests import Response, Session as RequestsSession
+from urllib.parse import SplitResult, quote, unquote, urlencode, urlsplit
 
+from .compression import (
+    available_codecs,
+    compress,
+    decompress,
+    is_codec_available,
+    iter_compressed,
+    open_decompressed,
+)
 from .config import (
     DEFAULT_CONFIG_PATH,
     SECURITY_TOKEN_HEADER,
     RemoClipConfig,
     load_config,
 )
+from .frames import COPY, OK, PASTE, decode_text, encode_text, read_frame, write_frame
+
+# Proxy settings that only ``requests`` honours; plain HTTP connects directly
+# unless one of them is set.
+_PROXY_VARIABLES = ("http_proxy", "HTTP_PROXY", "all_proxy", "ALL_PROXY")
+
+
+def _requests() -> ModuleType:
+    """Import :mod:`requests` on first use.
+
+    Loading it (with urllib3, idna and charset detection) takes longer than a
+    whole copy or paste round trip, so the plain HTTP and Unix socket paths
+    only pay for it when a request fails and its exception types are needed.
+    """
+
+    import requests
+
+    return requests
+
+
+def _create_requests_session() -> Any:
+    return _requests().Session()
+
+
+def _has_pending_input(sock: socket.socket) -> bool:
+    """Return whether *sock* is readable, or cannot be checked (``select``
+    rejects descriptors past ``FD_SETSIZE``)."""
+
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _basic_auth(url: SplitResult) -> str | None:
+    """Return a basic ``Authorization`` value for credentials in *url*, as requests does."""
+
+    if url.username is None:
+        return None
+    credentials = f"{unquote(url.username)}:{unquote(url.password or '')}"
+    return "Basic " + base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+
+
+def _is_request_error(exc: BaseException) -> bool:
+    # A requests exception can only exist once the module has been imported.
+    requests = sys.modules.get("requests")
+    return requests is not None and isinstance(exc, requests.RequestException)
+
+
+def _http_error(
+    status: int, reason: str, headers: Mapping[str, str], content: bytes
+) -> Exception:
+    """Return the ``requests.HTTPError`` a ``requests.Session`` would raise."""
+
+    requests = _requests()
+    http_response = requests.Response()
+    http_response.status_code = status
+    http_response.reason = reason
+    http_response.headers = dict(headers.items())
+    http_response._content = content
+    return requests.HTTPError(f"{status} {reason}", response=http_response)
+
+
+def _advertised_codecs(headers: Mapping[str, str] | None) -> tuple[str, ...] | None:
+    """Return the request encodings a server lists in ``Accept-Encoding``.
+
+    ``None`` means the server did not say, as servers from before request
+    compression do not.
+    """
+
+    value = headers.get("Accept-Encoding") if headers is not None else None
+    if value is None:
+        return None
+    codecs = (part.split(";", 1)[0].strip().lower() for part in value.split(","))
+    return tuple(codec for codec in codecs if codec)
+
+
+def _negotiate_codec(preferred: str | None, advertised: tuple[str, ...] | None) -> str | None:
+    """Pick the encoding for a request body, or ``None`` to send it as is."""
+
+    if preferred is None or advertised is None or preferred in advertised:
+        return preferred
+    return "gzip" if "gzip" in advertised else None
+
+
+def _rejected_encoding(exc: BaseException, codec: str) -> tuple[str, ...] | None:
+    """Return what the server decodes when *exc* rejected a *codec* body.
+
+    Returns ``None`` when *exc* is any other failure. A ``415`` rejects the
+    encoding outright. A ``400`` without ``Accept-Encoding`` comes from a
+    server that cannot decode request bodies at all.
+    """
+
+    response = getattr(exc, "response", None)
+    if response is None or not _is_request_error(exc):
+        return None
+    advertised = _advertised_codecs(response.headers)
+    if response.status_code == 415 or (
+        response.status_code == 400 and advertised is None
+    ):
+        return tuple(advertised or ())
+    return None
 
 
 class _UnixSocketHTTPConnection(HTTPConnection):
@@ -34,22 +148,117 @@ class _UnixSocketHTTPConnection(HTTPConnection):
         self.sock = sock
 
 
-class _UnixSocketResponse:
-    def __init__(self, status_code: int, payload: dict[str, Any]):
+class _HTTPResponse:
+    def __init__(
+        self,
+        status_code: int,
+        payload: dict[str, Any],
+        headers: Mapping[str, str] | None = None,
+    ):
         self.status_code = status_code
         self._payload = payload
+        self.headers = headers if headers is not None else {}
 
     def raise_for_status(self) -> None:
         if self.status_code >= 400:
-            raise requests.HTTPError(f"{self.status_code}")
+            raise _requests().HTTPError(f"{self.status_code}")
 
     def json(self) -> dict[str, Any]:
         return self._payload
 
 
-class UnixSocketSession:
-    def __init__(self, socket_path: Path):
-        self._socket_path = str(socket_path)
+class _HTTPStreamResponse:
+    """Incrementally readable response that owns its connection."""
+
+    def __init__(
+        self,
+        connection: HTTPConnection,
+        status_code: int,
+        body: BinaryIO,
+        headers: Mapping[str, str],
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self._connection = connection
+        self._body = body
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise _requests().HTTPError(f"{self.status_code}")
+
+    def iter_lines(self, decode_unicode: bool = False) -> Iterator[Any]:
+        try:
+            while True:
+                line = self._body.readline()
+                if not line:
+                    return
+                line = line.rstrip(b"\r\n")
+                yield line.decode("utf-8") if decode_unicode else line
+        except (OSError, HTTPException) as exc:  # pragma: no cover - connection issues are exceptional
+            raise _requests().RequestException(str(exc)) from exc
+
+    def iter_content(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = self._body.read1(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        except (OSError, HTTPException) as exc:  # pragma: no cover - connection issues are exceptional
+            raise _requests().RequestException(str(exc)) from exc
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class HTTPSession:
+    """The part of ``requests.Session`` the client uses, on :mod:`http.client`.
+
+    Connections are kept open between requests and reused, up to
+    ``MAX_IDLE_CONNECTIONS`` per server. Failures are raised as the same
+    ``requests`` exceptions a ``requests.Session`` would raise.
+    """
+
+    MAX_IDLE_CONNECTIONS = 4
+
+    def __init__(self) -> None:
+        self._idle: dict[str, list[HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _connection(self, url: SplitResult, timeout: float) -> HTTPConnection:
+        return HTTPConnection(url.hostname, url.port, timeout=timeout)
+
+    def _acquire(self, url: SplitResult, timeout: float) -> tuple[HTTPConnection, bool]:
+        """Return an open connection to *url* and whether it was reused."""
+
+        with self._lock:
+            idle = self._idle.get(url.netloc, [])
+            while idle:
+                connection = idle.pop()
+                if connection.sock is not None and not _has_pending_input(connection.sock):
+                    connection.timeout = timeout
+                    connection.sock.settimeout(timeout)
+                    return connection, True
+                # Readable while idle means the server closed it.
+                connection.close()
+        return self._connection(url, timeout), False
+
+    def _release(self, url: SplitResult, connection: HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(url.netloc, [])
+            if len(idle) < self.MAX_IDLE_CONNECTIONS:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        """Close the idle connections."""
+
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
 
     def _request(
         self,
@@ -59,58 +268,90 @@ class UnixSocketSession:
         json_payload: dict[str, Any] | None,
         headers: dict[str, str] | None,
         timeout: float,
-    ) -> _UnixSocketResponse:
-        body: bytes | None = None
+        stream: bool = False,
+        data: Iterable[bytes] | None = None,
+    ) -> _HTTPResponse | _HTTPStreamResponse:
+        body: bytes | Iterable[bytes] | None = None
         request_headers = dict(headers or {})
+        request_headers.setdefault("Accept-Encoding", ", ".join(available_codecs()))
         if json_payload is not None:
             body = json.dumps(json_payload).encode("utf-8")
             request_headers.setdefault("Content-Type", "application/json")
+        elif data is not None:
+            # http.client sends an iterable body with chunked transfer encoding.
+            body = data
         parsed = urlsplit(url)
+        authorization = _basic_auth(parsed)
+        if authorization is not None:
+            request_headers.setdefault("Authorization", authorization)
         request_path = parsed.path or "/"
         if parsed.query:
             request_path = f"{request_path}?{parsed.query}"
-        connection = _UnixSocketHTTPConnection(self._socket_path, timeout)
+        connection, reused = self._acquire(parsed, timeout)
         try:
-            connection.request(method.upper(), request_path, body=body, headers=request_headers)
-            response = connection.getresponse()
-            raw_data = response.read()
+            try:
+                connection.request(
+                    method.upper(), request_path, body=body, headers=request_headers
+                )
+                response = connection.getresponse()
+            except ConnectionError:
+                # The server may close an idle connection just as it is
+                # reused; the request never reached it, so it is sent again
+                # on a new connection unless its body was a one-shot stream.
+                if not reused or not (body is None or isinstance(body, bytes)):
+                    raise
+                connection.close()
+                connection = self._connection(parsed, timeout)
+                connection.request(
+                    method.upper(), request_path, body=body, headers=request_headers
+                )
+                response = connection.getresponse()
             status = response.status
+            encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+            if encoding == "identity":
+                encoding = ""
+            if stream and status < 400:
+                body = open_decompressed(response, encoding) if encoding else response
+                return _HTTPStreamResponse(connection, status, body, response.headers)
+            raw_data = response.read()
+            if encoding:
+                raw_data = decompress(raw_data, encoding)
             reason = response.reason
-            headers_map = dict(response.getheaders())
-        except (OSError, HTTPException) as exc:  # pragma: no cover - connection issues are exceptional
-            raise requests.RequestException(str(exc)) from exc
-        finally:
+            response_headers = response.headers
+        except (OSError, HTTPException) as exc:
+            connection.close()
+            raise _requests().RequestException(str(exc)) from exc
+        if response.will_close:
             connection.close()
+        else:
+            self._release(parsed, connection)
 
         if status >= 400:
-            http_response = Response()
-            http_response.status_code = status
-            http_response.reason = reason
-            http_response.headers = headers_map
-            http_response._content = raw_data
-            raise requests.HTTPError(f"{status} {reason}", response=http_response)
+            raise _http_error(status, reason, response_headers, raw_data)
 
         payload: dict[str, Any]
         if raw_data:
             payload = json.loads(raw_data.decode("utf-8"))
         else:
             payload = {}
-        return _UnixSocketResponse(status, payload)
+        return _HTTPResponse(status, payload, response_headers)
 
     def post(
         self,
         url: str,
         *,
-        json: dict[str, Any],
+        json: dict[str, Any] | None = None,
+        data: Iterable[bytes] | None = None,
         headers: dict[str, str] | None,
         timeout: float,
-    ) -> _UnixSocketResponse:
+    ) -> _HTTPResponse:
         return self._request(
             "POST",
             url,
             json_payload=json,
             headers=headers,
             timeout=timeout,
+            data=data,
         )
 
     def get(
@@ -120,13 +361,15 @@ class UnixSocketSession:
         json: dict[str, Any],
         headers: dict[str, str] | None,
         timeout: float,
-    ) -> _UnixSocketResponse:
+        stream: bool = False,
+    ) -> _HTTPResponse | _HTTPStreamResponse:
         return self._request(
             "GET",
             url,
             json_payload=json,
             headers=headers,
             timeout=timeout,
+            stream=stream,
         )
 
     def delete(
@@ -136,7 +379,7 @@ class UnixSocketSession:
         json: dict[str, Any],
         headers: dict[str, str] | None,
         timeout: float,
-    ) -> _UnixSocketResponse:
+    ) -> _HTTPResponse:
         return self._request(
             "DELETE",
             url,
@@ -146,8 +389,128 @@ class UnixSocketSession:
         )
 
 
+class UnixSocketSession(HTTPSession):
+    def __init__(self, socket_path: Path):
+        super().__init__()
+        self._socket_path = str(socket_path)
+
+    def _connection(self, url: SplitResult, timeout: float) -> HTTPConnection:
+        return _UnixSocketHTTPConnection(self._socket_path, timeout)
+
+
+class PasteCache:
+    """The last pasted content and its ``ETag``, kept in one private file.
+
+    The file holds a JSON header line followed by the raw UTF-8 content, so
+    loading it never parses the content itself.
+    """
+
+    def __init__(self, path: Path, server: str):
+        self.path = path
+        self.server = server
+
+    def load(self) -> tuple[str, str] | None:
+        """Return the cached ``(etag, content)`` for this server, if any."""
+
+        try:
+            with self.path.open("rb") as handle:
+                header = json.loads(handle.readline())
+                if header.get("server") != self.server:
+                    return None
+                etag = str(header["etag"])
+                content = handle.read().decode("utf-8", errors="surrogatepass")
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+        return etag, content
+
+    def store(self, etag: str, content: str) -> None:
+        header = json.dumps({"server": self.server, "etag": etag}).encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        # Clipboard content can be sensitive, so the file is private from the
+        # moment it is created.
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(header + b"\n")
+                handle.write(content.encode("utf-8", errors="surrogatepass"))
+            os.replace(temporary, self.path)
+        except OSError:
+            temporary.unlink(missing_ok=True)
+            raise
+
+
+HISTORY_PAGE_SIZE = 200
+
+
+def _iter_sse_events(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Parse Server-Sent Events into ``(event, data)`` pairs."""
+
+    event = "message"
+    data: list[str] = []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event = "message"
+            data = []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            if value.startswith(" "):
+                value = value[1:]
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+
+
+def _history_options(
+    *,
+    limit: int | None,
+    event_id: int | None,
+    before_id: int | None,
+    after_id: int | None,
+    brief: bool,
+    from_hostname: str | None,
+    actions: Iterable[str] | None,
+    since: str | None,
+    until: str | None,
+) -> dict[str, Any]:
+    """Return the ``/history`` payload fields for the given filters."""
+
+    extra: dict[str, Any] = {}
+    if limit is not None:
+        extra["limit"] = limit
+    if event_id is not None:
+        extra["id"] = event_id
+    if before_id is not None:
+        extra["before_id"] = before_id
+    if after_id is not None:
+        extra["after_id"] = after_id
+    if brief:
+        extra["brief"] = True
+    if from_hostname is not None:
+        extra["from_hostname"] = from_hostname
+    if actions is not None:
+        extra["actions"] = list(actions)
+    if since is not None:
+        extra["since"] = since
+    if until is not None:
+        extra["until"] = until
+    return extra
+
+
 class RemoClipClient:
-    def __init__(self, config: RemoClipConfig):
+    def __init__(self, config: RemoClipConfig, *, paste_cache: Any | None = None):
+        """Create a client for the server in *config*.
+
+        *paste_cache* replaces the :class:`PasteCache` that
+        ``client.paste_cache`` would configure; any object with the same
+        ``load()`` and ``store()`` methods works.
+        """
+
         self.config = config
         socket_path = config.client.socket_path
         if socket_path is not None:
@@ -156,11 +519,42 @@ class RemoClipClient:
             session = UnixSocketSession(socket_path)
         else:
             self.base_url = config.client.url.rstrip("/")
-            session = RequestsSession()
+            if urlsplit(self.base_url).scheme == "http" and not any(
+                os.environ.get(name) for name in _PROXY_VARIABLES
+            ):
+                session = HTTPSession()
+            else:
+                # TLS verification against certifi's bundle and proxy support
+                # are left to requests.
+                session = _create_requests_session()
         self._session = session
         self._headers = {}
         if config.security_token:
             self._headers[SECURITY_TOKEN_HEADER] = config.security_token
+        compression = config.client.compression
+        self._request_codec: str | None = None
+        if compression.enabled:
+            self._request_codec = (
+                compression.codec if is_codec_available(compression.codec) else "gzip"
+            )
+        self._compress_min_size = compression.min_size
+        # Request encodings the server advertised, unknown until it answers.
+        self._server_codecs: tuple[str, ...] | None = None
+        cache_path = config.client.paste_cache_path
+        if paste_cache is None and cache_path is not None:
+            paste_cache = PasteCache(cache_path, self.base_url)
+        self._paste_cache = paste_cache
+
+    def close(self) -> None:
+        """Close the connections kept open for reuse."""
+
+        self._session.close()
+
+    def __enter__(self) -> RemoClipClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def _payload(self, extra: dict[str, Any] | None = None) -> dict[str, Any]:
         payload = {"hostname": socket.gethostname()}
@@ -168,43 +562,227 @@ class RemoClipClient:
             payload.update(extra)
         return payload
 
+    def _copied(self, response: Any) -> dict[str, Any]:
+        response.raise_for_status()
+        advertised = _advertised_codecs(response.headers)
+        if advertised is not None:
+            self._server_codecs = advertised
+        return response.json()
+
     def copy(self, content: str, timeout: float = 5.0) -> dict[str, Any]:
-        response = self._session.post(
-            f"{self.base_url}/copy",
-            json=self._payload({"content": content}),
-            headers=self._headers,
+        """Copy *content* to the server's clipboard.
+
+        Large content is compressed. Until the server has advertised the
+        encodings it decodes, a rejected compressed copy is sent again
+        uncompressed.
+        """
+
+        payload = self._payload({"content": content})
+        codec = _negotiate_codec(self._request_codec, self._server_codecs)
+        if codec is not None and len(content) >= self._compress_min_size:
+            body = compress(json.dumps(payload).encode("utf-8"), codec)
+            try:
+                return self._copied(
+                    self._session.post(
+                        f"{self.base_url}/copy",
+                        data=body,
+                        headers={
+                            **self._headers,
+                            "Content-Type": "application/json",
+                            "Content-Encoding": codec,
+                        },
+                        timeout=timeout,
+                    )
+                )
+            except Exception as exc:
+                advertised = _rejected_encoding(exc, codec)
+                if advertised is None:
+                    raise
+                self._server_codecs = advertised
+        return self._copied(
+            self._session.post(
+                f"{self.base_url}/copy",
+                json=payload,
+                headers=self._headers,
+                timeout=timeout,
+            )
+        )
+
+    def copy_stream(self, chunks: Iterable[bytes], timeout: float = 60.0) -> dict[str, Any]:
+        """Copy UTF-8 text sent as a chunked raw body, one chunk at a time.
+
+        The body is compressed only once the server has advertised a
+        suitable encoding, since a streamed body cannot be sent again.
+        """
+
+        query = urlencode(self._payload())
+        headers = {**self._headers, "Content-Type": "text/plain; charset=utf-8"}
+        codec = None
+        if self._server_codecs is not None:
+            codec = _negotiate_codec(self._request_codec, self._server_codecs)
+        if codec is not None:
+            # The total size is unknown up front, so a streamed body is always
+            # compressed when compression is enabled.
+            chunks = iter_compressed(chunks, codec)
+            headers["Content-Encoding"] = codec
+        return self._copied(
+            self._session.post(
+                f"{self.base_url}/copy?{query}",
+                data=chunks,
+                headers=headers,
+                timeout=timeout,
+            )
+        )
+
+    def paste_stream(
+        self,
+        event_id: int | None = None,
+        chunk_size: int = 65536,
+        timeout: float = 60.0,
+    ) -> Iterator[bytes]:
+        """Yield the clipboard content as raw UTF-8 chunks."""
+
+        extra: dict[str, Any] | None = None
+        if event_id is not None:
+            extra = {"id": event_id}
+        response = self._session.get(
+            f"{self.base_url}/paste",
+            json=self._payload(extra),
+            headers={**self._headers, "Accept": "text/plain"},
             timeout=timeout,
+            stream=True,
         )
-        response.raise_for_status()
-        return response.json()
+        try:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=chunk_size)
+        finally:
+            response.close()
 
     def paste(self, event_id: int | None = None, timeout: float = 5.0) -> str:
+        """Return the clipboard content, or the history entry *event_id*.
+
+        With a paste cache configured, the current clipboard is only
+        downloaded when it differs from the cached copy.
+        """
+
         extra: dict[str, Any] | None = None
         if event_id is not None:
             extra = {"id": event_id}
+        cache = self._paste_cache if event_id is None else None
+        cached = cache.load() if cache is not None else None
+        headers = self._headers
+        if cached is not None:
+            headers = {**headers, "If-None-Match": cached[0]}
         response = self._session.get(
             f"{self.base_url}/paste",
             json=self._payload(extra),
-            headers=self._headers,
+            headers=headers,
             timeout=timeout,
         )
+        if cached is not None and response.status_code == 304:
+            return cached[1]
         response.raise_for_status()
         data = response.json()
-        return data.get("content", "")
+        content = data.get("content", "")
+        if cache is not None:
+            etag = response.headers.get("ETag")
+            if etag:
+                try:
+                    cache.store(etag, content)
+                except OSError:
+                    # An unwritable cache only costs a full download next time.
+                    pass
+        return content
 
     def history(
         self,
         limit: int | None = None,
         event_id: int | None = None,
         timeout: float = 5.0,
+        *,
+        before_id: int | None = None,
+        after_id: int | None = None,
+        brief: bool = False,
+        from_hostname: str | None = None,
+        actions: Iterable[str] | None = None,
+        since: str | None = None,
+        until: str | None = None,
     ) -> dict[str, Any]:
-        extra: dict[str, Any] = {}
+        """Return one page of history.
+
+        With *brief* each entry carries the content ``size`` in bytes and a
+        short ``preview`` instead of the full ``content``. *from_hostname*,
+        *actions*, *since* and *until* (ISO 8601 timestamps, *until*
+        exclusive) narrow the listing on the server.
+        """
+
+        extra = _history_options(
+            limit=limit,
+            event_id=event_id,
+            before_id=before_id,
+            after_id=after_id,
+            brief=brief,
+            from_hostname=from_hostname,
+            actions=actions,
+            since=since,
+            until=until,
+        )
+        response = self._session.get(
+            f"{self.base_url}/history",
+            json=self._payload(extra),
+            headers=self._headers,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def iter_history(
+        self,
+        page_size: int = HISTORY_PAGE_SIZE,
+        timeout: float = 5.0,
+        *,
+        brief: bool = False,
+        **filters: Any,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield every history entry, newest first, fetching one page at a time.
+
+        *filters* are passed on to :meth:`history`.
+        """
+
+        before_id: int | None = None
+        while True:
+            page = self.history(
+                limit=page_size,
+                before_id=before_id,
+                timeout=timeout,
+                brief=brief,
+                **filters,
+            )
+            yield from page.get("history", [])
+            before_id = page.get("next_before_id")
+            if before_id is None:
+                return
+
+    def search(
+        self,
+        query: str,
+        limit: int | None = None,
+        offset: int = 0,
+        timeout: float = 5.0,
+    ) -> dict[str, Any]:
+        """Return history entries whose content contains every word of *query*.
+
+        Entries are summaries, best match first; pass ``next_offset`` back as
+        *offset* for the following page.
+        """
+
+        extra: dict[str, Any] = {"query": query}
         if limit is not None:
             extra["limit"] = limit
-        if event_id is not None:
-            extra["id"] = event_id
+        if offset:
+            extra["offset"] = offset
         response = self._session.get(
-            f"{self.base_url}/history",
+            f"{self.base_url}/history/search",
             json=self._payload(extra),
             headers=self._headers,
             timeout=timeout,
@@ -212,6 +790,58 @@ class RemoClipClient:
         response.raise_for_status()
         return response.json()
 
+    def export_history(
+        self, chunk_size: int = 65536, timeout: float = 60.0
+    ) -> Iterator[bytes]:
+        """Yield the full history as raw newline-delimited JSON chunks."""
+
+        response = self._session.get(
+            f"{self.base_url}/history/export",
+            json=self._payload(),
+            headers=self._headers,
+            timeout=timeout,
+            stream=True,
+        )
+        try:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=chunk_size)
+        finally:
+            response.close()
+
+    def watch(
+        self,
+        since: int | None = None,
+        timeout: float = 60.0,
+        *,
+        on_connect: Callable[[Mapping[str, str]], None] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield ``{"version", "content"}`` dicts as the clipboard changes.
+
+        *timeout* bounds the wait for any data, including the server's
+        periodic keep-alive comments. *on_connect* is called with the
+        response headers once the stream is open.
+        """
+
+        extra: dict[str, Any] = {}
+        if since is not None:
+            extra["since"] = since
+        response = self._session.get(
+            f"{self.base_url}/watch",
+            json=self._payload(extra),
+            headers=self._headers,
+            timeout=timeout,
+            stream=True,
+        )
+        try:
+            response.raise_for_status()
+            if on_connect is not None:
+                on_connect(response.headers)
+            for event, data in _iter_sse_events(response.iter_lines(decode_unicode=True)):
+                if event == "clipboard":
+                    yield json.loads(data)
+        finally:
+            response.close()
+
     def delete_history(self, event_id: int, timeout: float = 5.0) -> dict[str, Any]:
         response = self._session.delete(
             f"{self.base_url}/history",
@@ -223,6 +853,79 @@ class RemoClipClient:
         return response.json()
 
 
+# Seconds a CLI call waits for ``remoclip agent`` before asking the server.
+AGENT_TIMEOUT = 10.0
+
+
+def _ask_agent(socket_path: Path | None, code: bytes, payload: bytes = b"") -> bytes | None:
+    """Send one request to a running ``remoclip agent``.
+
+    Returns the response payload, or ``None`` when no agent is configured or
+    it did not answer, in which case the caller talks to the server itself.
+    """
+
+    if socket_path is None or not hasattr(socket, "AF_UNIX"):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(AGENT_TIMEOUT)
+    try:
+        with sock, sock.makefile("rwb") as stream:
+            sock.connect(str(socket_path))
+            write_frame(stream, code, payload)
+            response = read_frame(stream)
+    except (OSError, EOFError):
+        return None
+    if response is None or response[0] != OK:
+        return None
+    return response[1]
+
+
+def _write_history_stream(events: Iterable[dict[str, Any]]) -> None:
+    """Write *events* in the same layout as ``json.dump(..., indent=2)``."""
+
+    sys.stdout.write('{\n  "history": [')
+    separator = "\n"
+    for event in events:
+        sys.stdout.write(separator)
+        sys.stdout.write(textwrap.indent(json.dumps(event, indent=2), "    "))
+        separator = ",\n"
+    sys.stdout.write("\n  ]\n}\n" if separator != "\n" else "]\n}\n")
+
+
+RAW_CHUNK_SIZE = 65536
+
+
+def _write_bytes(chunk: bytes) -> None:
+    output = getattr(sys.stdout, "buffer", None)
+    if output is None:
+        sys.stdout.write(chunk.decode("utf-8"))
+    else:
+        output.write(chunk)
+
+
+def _iter_stdin_chunks(strip: bool) -> Iterator[bytes]:
+    """Yield stdin in chunks, echoing each one to stdout as it is sent."""
+
+    stream = getattr(sys.stdin, "buffer", None)
+    pending = b""
+    while True:
+        if stream is None:
+            chunk = sys.stdin.read(RAW_CHUNK_SIZE).encode("utf-8")
+        else:
+            chunk = stream.read(RAW_CHUNK_SIZE)
+        if not chunk:
+            return
+        if strip:
+            # Hold back trailing newlines until we know more data follows.
+            chunk = pending + chunk
+            body = chunk.rstrip(b"\n")
+            pending = chunk[len(body) :]
+            chunk = body
+        if chunk:
+            _write_bytes(chunk)
+            yield chunk
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="remoclip client CLI")
     parser.add_argument(
@@ -232,24 +935,104 @@ def main() -> None:
     )
     parser.add_argument(
         "command",
-        choices=["copy", "c", "paste", "p", "history", "h"],
+        choices=[
+            "copy",
+            "c",
+            "paste",
+            "p",
+            "history",
+            "h",
+            "search",
+            "s",
+            "watch",
+            "w",
+            "agent",
+        ],
         help="Action to perform on the remote clipboard",
     )
+    parser.add_argument(
+        "query",
+        nargs="*",
+        help="Words to look for in clipboard history (search command only)",
+    )
     parser.add_argument(
         "--limit",
         type=int,
-        help="Limit for history entries (only for history command)",
+        help="Limit for history entries (history and search commands)",
     )
     parser.add_argument(
         "--id",
         type=int,
         help="Retrieve a specific entry by id (available for paste and history commands)",
     )
+    parser.add_argument(
+        "--before-id",
+        type=int,
+        help="Only list history entries older than this id (history command only)",
+    )
+    parser.add_argument(
+        "--after-id",
+        type=int,
+        help="Only list history entries newer than this id (history command only)",
+    )
+    parser.add_argument(
+        "--offset",
+        type=int,
+        help="Skip this many search results (search command only)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Page through the entire history (history command only)",
+    )
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help=(
+            "Stream the entire history as newline-delimited JSON "
+            "(history command only)"
+        ),
+    )
+    parser.add_argument(
+        "--from-host",
+        help="Only list history entries recorded by this hostname (history command only)",
+    )
+    parser.add_argument(
+        "--action",
+        action="append",
+        choices=["copy", "paste"],
+        help="Only list history entries of this action; repeatable (history command only)",
+    )
+    parser.add_argument(
+        "--since",
+        help="Only list history entries at or after this ISO 8601 time (history command only)",
+    )
+    parser.add_argument(
+        "--until",
+        help="Only list history entries before this ISO 8601 time (history command only)",
+    )
+    parser.add_argument(
+        "--brief",
+        action="store_true",
+        help=(
+            "List each entry's size and a short preview instead of its full "
+            "content (history command only)"
+        ),
+    )
     parser.add_argument(
         "--delete",
         action="store_true",
         help="Delete a specific history entry by id (history command only)",
     )
+    parser.add_argument(
+        "-r",
+        "--raw",
+        action="store_true",
+        help=(
+            "Stream content as a raw body instead of JSON, for large payloads "
+            "(copy and paste commands only)"
+        ),
+    )
     parser.add_argument(
         "-s",
         "--strip",
@@ -267,17 +1050,50 @@ def main() -> None:
     try:
         if args.strip and args.command not in ("copy", "c"):
             raise ValueError("--strip can only be used with the copy command")
+        if args.raw and args.command not in ("copy", "c", "paste", "p"):
+            raise ValueError("--raw can only be used with the copy and paste commands")
+        if args.brief and args.command not in ("history", "h"):
+            raise ValueError("--brief can only be used with the history command")
+        filters = {
+            "from_hostname": args.from_host,
+            "actions": args.action,
+            "since": args.since,
+            "until": args.until,
+        }
+        filters = {name: value for name, value in filters.items() if value is not None}
+        if filters and args.command not in ("history", "h"):
+            raise ValueError("history filters can only be used with the history command")
+        if args.query and args.command not in ("search", "s"):
+            raise ValueError("search terms can only be used with the search command")
+        if args.offset is not None and args.command not in ("search", "s"):
+            raise ValueError("--offset can only be used with the search command")
         if args.command in ("copy", "c"):
-            content = sys.stdin.read()
-            if args.strip:
-                content = content.rstrip("\n")
-            client.copy(content)
-            sys.stdout.write(content)
+            if args.raw:
+                client.copy_stream(_iter_stdin_chunks(args.strip))
+                sys.stdout.flush()
+            else:
+                content = sys.stdin.read()
+                if args.strip:
+                    content = content.rstrip("\n")
+                if _ask_agent(config.client.agent_socket_path, COPY, encode_text(content)) is None:
+                    client.copy(content)
+                sys.stdout.write(content)
         elif args.command in ("paste", "p"):
             if args.id is not None and args.id <= 0:
                 raise ValueError("id must be a positive integer")
-            content = client.paste(event_id=args.id)
-            sys.stdout.write(content)
+            if args.raw:
+                for chunk in client.paste_stream(event_id=args.id):
+                    _write_bytes(chunk)
+                sys.stdout.flush()
+            else:
+                answer = None
+                if args.id is None:
+                    answer = _ask_agent(config.client.agent_socket_path, PASTE)
+                if answer is not None:
+                    content = decode_text(answer)
+                else:
+                    content = client.paste(event_id=args.id)
+                sys.stdout.write(content)
         elif args.command in ("history", "h"):
             if args.delete:
                 if args.id is None:
@@ -286,23 +1102,86 @@ def main() -> None:
                     raise ValueError("id must be a positive integer")
                 if args.limit is not None:
                     raise ValueError("limit cannot be combined with --delete")
+                if args.brief or filters:
+                    raise ValueError("--brief and filters cannot be combined with --delete")
                 result = client.delete_history(event_id=args.id)
                 json.dump(result, sys.stdout, indent=2)
                 sys.stdout.write("\n")
+            elif args.export:
+                if (
+                    args.all
+                    or args.limit is not None
+                    or args.id is not None
+                    or args.before_id is not None
+                    or args.after_id is not None
+                    or args.brief
+                    or filters
+                ):
+                    raise ValueError("--export cannot be combined with other history options")
+                for chunk in client.export_history():
+                    _write_bytes(chunk)
+                    sys.stdout.flush()
+            elif args.all:
+                if args.limit is not None or args.id is not None:
+                    raise ValueError("--all cannot be combined with --limit or --id")
+                if args.before_id is not None or args.after_id is not None:
+                    raise ValueError(
+                        "--all cannot be combined with --before-id or --after-id"
+                    )
+                _write_history_stream(client.iter_history(brief=args.brief, **filters))
             else:
                 if args.limit is not None and args.limit <= 0:
                     raise ValueError("limit must be a positive integer")
                 if args.id is not None and args.id <= 0:
                     raise ValueError("id must be a positive integer")
-                history = client.history(limit=args.limit, event_id=args.id)
+                for name in ("before_id", "after_id"):
+                    value = getattr(args, name)
+                    if value is not None and value <= 0:
+                        raise ValueError(f"{name} must be a positive integer")
+                history = client.history(
+                    limit=args.limit,
+                    event_id=args.id,
+                    before_id=args.before_id,
+                    after_id=args.after_id,
+                    brief=args.brief,
+                    **filters,
+                )
                 json.dump(history, sys.stdout, indent=2)
                 sys.stdout.write("\n")
-    except requests.RequestException as exc:
-        sys.stderr.write(f"Request failed: {exc}\n")
-        sys.exit(1)
-    except ValueError as exc:
-        sys.stderr.write(f"Error: {exc}\n")
-        sys.exit(2)
+        elif args.command in ("search", "s"):
+            if not args.query:
+                raise ValueError("search requires at least one search term")
+            if args.limit is not None and args.limit <= 0:
+                raise ValueError("limit must be a positive integer")
+            if args.offset is not None and args.offset < 0:
+                raise ValueError("offset must not be negative")
+            results = client.search(
+                " ".join(args.query), limit=args.limit, offset=args.offset or 0
+            )
+            json.dump(results, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        elif args.command in ("watch", "w"):
+            try:
+                for change in client.watch():
+                    content = change.get("content", "")
+                    sys.stdout.write(content)
+                    if not content.endswith("\n"):
+                        sys.stdout.write("\n")
+                    sys.stdout.flush()
+            except KeyboardInterrupt:
+                pass
+        elif args.command == "agent":
+            from .agent import serve
+
+            serve(config)
+    except Exception as exc:
+        if _is_request_error(exc):
+            sys.stderr.write(f"Request failed: {exc}\n")
+            sys.exit(1)
+        if isinstance(exc, ValueError):
+            sys.stderr.write(f"Error: {exc}\n")
+            sys.exit(2)
+        raise
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
-from typing import Protocol
+import queue
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol, Sequence, TypeVar
 
 try:  # pragma: no cover - import guard
     import pyperclip  # type: ignore
 except ModuleNotFoundError:  # pragma: no cover - import guard
     pyperclip = None  # type: ignore[assignment]
 
+from . import frames
+from .digest import content_digest
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 
 class ClipboardBackend(Protocol):
     """Minimal interface for clipboard implementations."""
@@ -19,18 +32,89 @@ class ClipboardBackend(Protocol):
     def paste(self) -> str:
         """Return the last persisted clipboard value."""
 
+    def snapshot(self) -> tuple[str, str]:
+        """Return the current value with its :func:`content_digest`."""
+
 
 @dataclass
 class PrivateClipboardBackend:
     """In-process clipboard implementation used for headless deployments."""
 
     _value: str = ""
+    _digest: str | None = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
 
     def copy(self, text: str) -> None:
-        self._value = text
+        with self._lock:
+            self._value = text
+            self._digest = None
 
     def paste(self) -> str:
-        return self._value
+        with self._lock:
+            return self._value
+
+    def snapshot(self) -> tuple[str, str]:
+        with self._lock:
+            if self._digest is None:
+                self._digest = content_digest(self._value)
+            return self._value, self._digest
+
+
+class ClipboardFeed:
+    """Versioned view of the clipboard that wakes watchers on every change."""
+
+    def __init__(self, content: str = "", version: int = 0) -> None:
+        self._condition = threading.Condition()
+        self._content = content
+        self._version = version
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """Wake every watcher for good, so open feeds can end."""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def version(self) -> int:
+        with self._condition:
+            return self._version
+
+    def publish(self, content: str) -> int:
+        """Record *content* as the newest clipboard value and return its version."""
+
+        with self._condition:
+            self._version += 1
+            self._content = content
+            self._condition.notify_all()
+            return self._version
+
+    def wait_for_change(
+        self, since: int, timeout: float | None = None
+    ) -> tuple[int, str] | None:
+        """Block until the version differs from *since*.
+
+        Returns the current ``(version, content)`` pair, or ``None`` when
+        *timeout* elapses first or the feed is closed. A cursor ahead of the
+        feed (for example after a server restart) counts as a change so
+        watchers resynchronise.
+        """
+
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._closed or self._version != since, timeout
+            ):
+                return None
+            if self._closed:
+                return None
+            return self._version, self._content
 
 
 class SystemClipboardBackend:
@@ -39,6 +123,10 @@ class SystemClipboardBackend:
     def __init__(self) -> None:
         if pyperclip is None:
             raise RuntimeError("pyperclip is not available")
+        # Other applications change the system clipboard behind our back, so
+        # the digest is recomputed whenever the pasted value differs.
+        self._last: tuple[str, str] | None = None
+        self._lock = threading.Lock()
 
     def copy(self, text: str) -> None:
         assert pyperclip is not None  # for type checkers
@@ -48,6 +136,274 @@ class SystemClipboardBackend:
         assert pyperclip is not None  # for type checkers
         return str(pyperclip.paste())
 
+    def snapshot(self) -> tuple[str, str]:
+        value = self.paste()
+        with self._lock:
+            last = self._last
+            if last is not None and last[0] == value:
+                return last
+            self._last = (value, content_digest(value))
+            return self._last
+
+
+# Runs the bundled helper with the server's own interpreter.
+DEFAULT_HELPER_COMMAND = (sys.executable, "-m", "remoclip.clipboard_helper")
+
+
+class HelperClipboardBackend:
+    """Clipboard access through one long-lived helper process.
+
+    Frames described in :mod:`remoclip.frames` are exchanged over the
+    helper's standard input and output, so an operation costs a pipe round
+    trip instead of a process spawn. A helper that exits is started again on
+    the next operation.
+    """
+
+    def __init__(self, command: Sequence[str] = DEFAULT_HELPER_COMMAND) -> None:
+        self.command = list(command)
+        self._process: subprocess.Popen[bytes] | None = None
+        self._lock = threading.Lock()
+        self._last: tuple[str, str] | None = None
+
+    def copy(self, text: str) -> None:
+        self._request(frames.COPY, frames.encode_text(text))
+
+    def paste(self) -> str:
+        return frames.decode_text(self._request(frames.PASTE))
+
+    def snapshot(self) -> tuple[str, str]:
+        value = self.paste()
+        with self._lock:
+            last = self._last
+            if last is not None and last[0] == value:
+                return last
+            self._last = (value, content_digest(value))
+            return self._last
+
+    def close(self) -> None:
+        with self._lock:
+            if self._process is not None:
+                self._stop(self._process)
+                self._process = None
+
+    def _request(self, code: bytes, payload: bytes = b"") -> bytes:
+        with self._lock:
+            # One retry: the first attempt may find a helper that died since
+            # the last request.
+            for attempt in range(2):
+                process = self._ensure_process()
+                try:
+                    assert process.stdin is not None and process.stdout is not None
+                    frames.write_frame(process.stdin, code, payload)
+                    response = frames.read_frame(process.stdout)
+                    if response is None:
+                        raise EOFError("clipboard helper exited")
+                except (OSError, EOFError):
+                    self._stop(process)
+                    self._process = None
+                    if attempt:
+                        raise RuntimeError("clipboard helper is not responding") from None
+                    logger.warning("Clipboard helper exited; restarting it")
+                    continue
+                status, body = response
+                if status != frames.OK:
+                    raise RuntimeError(
+                        "clipboard helper failed: "
+                        + body.decode("utf-8", errors="replace")
+                    )
+                return body
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def _ensure_process(self) -> subprocess.Popen[bytes]:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0
+            )
+        return self._process
+
+    @staticmethod
+    def _stop(process: subprocess.Popen[bytes]) -> None:
+        for stream in (process.stdin, process.stdout):
+            if stream is not None:
+                stream.close()
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@dataclass
+class BackendCallStats:
+    """Latency and failure counters for one clipboard operation."""
+
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, elapsed: float, *, failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+    def as_dict(self) -> dict[str, Any]:
+        average = self.total_seconds / self.calls if self.calls else 0.0
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "avg_ms": round(average * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
+
+
+class TimeoutClipboardBackend:
+    """Run another backend's calls on a dedicated thread with a time limit.
+
+    :mod:`pyperclip` forks ``xclip``/``xsel`` on X11, which can hang while
+    the clipboard owner is unresponsive. A call that takes longer than
+    *timeout* seconds is abandoned: a paste returns the last known value and
+    a copy carries on in the background. Until the stuck call returns, later
+    pastes get the last known value at once and the newest copy is held back
+    and applied afterwards, so requests never pile up behind the backend.
+    """
+
+    def __init__(self, backend: ClipboardBackend, *, timeout: float, fallback: str = "") -> None:
+        self._backend = backend
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: queue.SimpleQueue[tuple[Future[Any], Callable[[], Any]]] = (
+            queue.SimpleQueue()
+        )
+        self._stuck = False
+        self._deferred_copy: str | None = None
+        self._fallback: tuple[str, str | None] = (fallback, None)
+        # Calls are numbered as they are queued, so a call that returns late
+        # cannot replace the fallback set by a newer one.
+        self._sequence = 0
+        self._fallback_sequence = 0
+        self._stats = {name: BackendCallStats() for name in ("copy", "paste")}
+        # A daemon thread, unlike a ThreadPoolExecutor worker, does not keep
+        # the process from exiting while a call hangs.
+        self._worker = threading.Thread(
+            target=self._run, name="remoclip-clipboard", daemon=True
+        )
+        self._worker.start()
+
+    def copy(self, text: str) -> None:
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            if self._stuck:
+                self._deferred_copy = text
+                self._stats["copy"].timeouts += 1
+                self._set_fallback(sequence, (text, None))
+                return
+            future = self._submit("copy", lambda: self._backend.copy(text))
+        # A failed copy raises here and leaves the fallback alone; one that
+        # times out still carries on, so its text becomes the fallback.
+        self._wait("copy", future)
+        with self._lock:
+            self._set_fallback(sequence, (text, None))
+
+    def paste(self) -> str:
+        return self.snapshot()[0]
+
+    def snapshot(self) -> tuple[str, str]:
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            future = None
+            if not self._stuck:
+                future = self._submit("paste", self._backend.snapshot)
+        if future is not None and self._wait("paste", future):
+            snapshot = future.result()
+            with self._lock:
+                self._set_fallback(sequence, snapshot)
+            return snapshot
+        with self._lock:
+            value, digest = self._fallback
+            if digest is None:
+                digest = content_digest(value)
+                self._fallback = (value, digest)
+            return value, digest
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def _set_fallback(self, sequence: int, snapshot: tuple[str, str | None]) -> None:
+        # Called with the lock held.
+        if sequence >= self._fallback_sequence:
+            self._fallback = snapshot
+            self._fallback_sequence = sequence
+
+    def _submit(self, name: str, call: Callable[[], T]) -> Future[T]:
+        # Called with the lock held, so calls are queued in the order of
+        # their sequence numbers.
+        future: Future[T] = Future()
+        self._calls.put((future, self._timed(name, call)))
+        return future
+
+    def _wait(self, name: str, future: Future[Any]) -> bool:
+        """Wait for *future*, returning ``False`` when it takes too long.
+
+        Errors raised by the backend are re-raised to the caller.
+        """
+
+        try:
+            future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                # The call may have finished since the timeout, in which case
+                # the worker has cleared, or is about to clear, the flag.
+                finished = future.done()
+                if not finished:
+                    self._stuck = True
+                    self._stats[name].timeouts += 1
+            if finished:
+                future.result()
+                return True
+            logger.warning(
+                "Clipboard %s did not finish within %g seconds; "
+                "serving the last known value until the backend responds",
+                name,
+                self.timeout,
+            )
+            return False
+        return True
+
+    def _timed(self, name: str, call: Callable[[], T]) -> Callable[[], T]:
+        def run() -> T:
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = call()
+                failed = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._stats[name].record(elapsed, failed=failed)
+
+        return run
+
+    def _run(self) -> None:
+        while True:
+            future, call = self._calls.get()
+            try:
+                future.set_result(call())
+            except BaseException as exc:  # re-raised by future.result()
+                future.set_exception(exc)
+            with self._lock:
+                self._stuck = False
+                text, self._deferred_copy = self._deferred_copy, None
+                if text is not None:
+                    self._submit("copy", lambda text=text: self._backend.copy(text))
+
 
 def is_system_clipboard_available() -> bool:
     """Return ``True`` when the system clipboard backend can be constructed."""
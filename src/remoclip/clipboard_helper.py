@@ -0,0 +1,91 @@
+"""Long-lived clipboard helper used by the ``helper`` clipboard backend.
+
+The server starts this module once and exchanges frames with it over its
+standard input and output instead of spawning ``xclip``/``xsel`` for every
+operation. The frame format is described in :mod:`remoclip.frames`; any
+program that speaks it can be configured as the helper.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+try:  # pragma: no cover - import guard
+    import tkinter  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - import guard
+    tkinter = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - import guard
+    import pyperclip  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - import guard
+    pyperclip = None  # type: ignore[assignment]
+
+from .frames import (  # noqa: F401 - re-exported for helper authors
+    COPY,
+    ERROR,
+    OK,
+    PASTE,
+    handle_request,
+    read_frame,
+    write_frame,
+)
+
+
+def _serve_with_tk() -> None:  # pragma: no cover - needs a display
+    # Tk owns the X selection for as long as this process lives, so copies
+    # and pastes are in-process calls. Requests are read from the Tk event
+    # loop, which keeps answering other applications' selection requests
+    # between them.
+    root = tkinter.Tk()
+    root.withdraw()
+    # Unbuffered, so a request is never left in a Python buffer where the
+    # file handler cannot see it.
+    stdin = sys.stdin.buffer.raw
+    stdout = sys.stdout.buffer
+
+    def copy(text: str) -> None:
+        root.clipboard_clear()
+        root.clipboard_append(text)
+        root.update()
+
+    def paste() -> str:
+        try:
+            return str(root.clipboard_get())
+        except tkinter.TclError:
+            return ""
+
+    def on_request(*_: object) -> None:
+        frame = read_frame(stdin)
+        if frame is None:
+            root.destroy()
+            return
+        write_frame(stdout, *handle_request(*frame, copy, paste))
+
+    root.tk.createfilehandler(stdin, tkinter.READABLE, on_request)
+    root.mainloop()
+
+
+def _serve_with_pyperclip() -> None:
+    if pyperclip is None:
+        raise SystemExit("clipboard helper needs tkinter or pyperclip")
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    while True:
+        frame = read_frame(stdin)
+        if frame is None:
+            return
+        write_frame(
+            stdout, *handle_request(*frame, pyperclip.copy, lambda: str(pyperclip.paste()))
+        )
+
+
+def main() -> None:
+    if tkinter is not None and os.environ.get("DISPLAY"):
+        _serve_with_tk()
+    else:
+        _serve_with_pyperclip()
+
+
+if __name__ == "__main__":  # pragma: no cover - executed as a subprocess
+    main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import io
+import zlib
+from typing import Any, BinaryIO, Iterable, Iterator
+
+try:  # pragma: no cover - import guard
+    import zstandard  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover - import guard
+    zstandard = None  # type: ignore[assignment]
+
+# Compressed bytes read from the underlying stream per decompression step.
+READ_CHUNK_SIZE = 64 * 1024
+
+# zlib window bits selecting the gzip container format.
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def available_codecs() -> tuple[str, ...]:
+    """Return the ``Content-Encoding`` values this installation can handle."""
+
+    if zstandard is None:
+        return ("gzip",)
+    return ("zstd", "gzip")
+
+
+def is_codec_available(codec: str) -> bool:
+    return codec in available_codecs()
+
+
+def _compressobj(codec: str) -> Any:
+    if codec == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, _GZIP_WBITS)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor().compressobj()
+    raise ValueError(f"unsupported content encoding: {codec}")
+
+
+def _decompressobj(codec: str) -> Any:
+    if codec == "gzip":
+        return zlib.decompressobj(_GZIP_WBITS)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"unsupported content encoding: {codec}")
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    compressor = _compressobj(codec)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    decompressor = _decompressobj(codec)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def iter_compressed(chunks: Iterable[bytes], codec: str) -> Iterator[bytes]:
+    """Compress *chunks* as one stream, skipping empty output blocks."""
+
+    compressor = _compressobj(codec)
+    for chunk in chunks:
+        block = compressor.compress(chunk)
+        if block:
+            yield block
+    block = compressor.flush()
+    if block:
+        yield block
+
+
+class _DecompressingRaw(io.RawIOBase):
+    def __init__(self, source: BinaryIO, codec: str) -> None:
+        self._source = source
+        self._decompressor = _decompressobj(codec)
+        self._pending = b""
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            if self._eof:
+                return 0
+            chunk = self._source.read(READ_CHUNK_SIZE)
+            if chunk:
+                self._pending = self._decompressor.decompress(chunk)
+            else:
+                self._eof = True
+                self._pending = self._decompressor.flush()
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_decompressed(source: BinaryIO, codec: str) -> io.BufferedReader:
+    """Wrap *source* so reads return its decompressed contents incrementally."""
+
+    return io.BufferedReader(_DecompressingRaw(source, codec), READ_CHUNK_SIZE)
@@ -1,17 +1,51 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import os
+import shlex
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal, Mapping
 
-import yaml
-
 DEFAULT_CONFIG_PATH = Path("~/.remoclip.yaml").expanduser()
 
 SECURITY_TOKEN_HEADER = "X-RemoClip-Token"
-
-
-ClipboardBackendName = Literal["system", "private"]
+# Sent on /watch responses: "1" when every clipboard change reaches the feed.
+FEED_COMPLETE_HEADER = "X-RemoClip-Feed-Complete"
+
+
+ClipboardBackendName = Literal["system", "private", "helper"]
+ConcurrencyMode = Literal["threads", "single"]
+EventLogMode = Literal["sync", "async"]
+StoragePresetName = Literal["durable", "fast"]
+JournalMode = Literal["wal", "delete", "truncate", "persist"]
+SynchronousLevel = Literal["off", "normal", "full", "extra"]
+CompressionCodec = Literal["gzip", "zstd", "none"]
+
+# Tuning presets for the SQLite database. ``durable`` survives power loss
+# without losing committed events; ``fast`` trades the last few commits
+# before an OS crash or power cut for cheaper commits and larger caches.
+STORAGE_PRESETS: dict[str, dict[str, Any]] = {
+    "durable": {
+        "journal_mode": "wal",
+        "synchronous": "full",
+        "mmap_size": 0,
+        "cache_size": 8192,
+        "busy_timeout": 5.0,
+        "checkpoint_interval": 60.0,
+        "wal_size_limit": 64 * 1024 * 1024,
+    },
+    "fast": {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": 65536,
+        "busy_timeout": 5.0,
+        "checkpoint_interval": 30.0,
+        "wal_size_limit": 64 * 1024 * 1024,
+    },
+}
 
 
 DEFAULT_CONFIG: dict[str, Any] = {
@@ -21,22 +55,165 @@ DEFAULT_CONFIG: dict[str, Any] = {
         "port": 35612,
         "db": "~/.remoclip.sqlite",
         "clipboard_backend": "system",
+        "clipboard_timeout": 2.0,
+        "clipboard_helper": None,
         "allow_deletions": False,
+        "concurrency": "threads",
+        "max_workers": 8,
+        "queue_size": 32,
+        "keep_alive_timeout": 5.0,
+        "max_watchers": 4,
+        "event_log": {
+            "mode": "sync",
+            "batch_size": 256,
+            "flush_interval": 0.05,
+            "queue_size": 10000,
+        },
+        "storage": {
+            "preset": "durable",
+            "journal_mode": None,
+            "synchronous": None,
+            "mmap_size": None,
+            "cache_size": None,
+            "busy_timeout": None,
+            "checkpoint_interval": None,
+            "wal_size_limit": None,
+        },
+        "retention": {
+            "interval": 3600.0,
+            "batch_size": 500,
+            "vacuum_pages": 1024,
+            "max_age_days": None,
+            "max_events": None,
+            "max_bytes": None,
+            "actions": {},
+        },
+        "compression": {
+            "codec": "gzip",
+            "min_size": 1024,
+        },
+        "history_cache": {
+            "entries": 200,
+            "lookup_entries": 1000,
+            "max_bytes": 32 * 1024 * 1024,
+        },
+        "local_watch": {
+            "enabled": False,
+            "min_interval": 0.5,
+            "max_interval": 5.0,
+            "cpu_budget": 0.02,
+        },
     },
     "client": {
         "url": "http://127.0.0.1:35612",
         "socket": None,
+        "paste_cache": None,
+        "agent_socket": None,
+        "compression": {
+            "codec": "gzip",
+            "min_size": 1024,
+        },
     },
 }
 
 
+@dataclass(frozen=True)
+class EventLogConfig:
+    mode: EventLogMode = "sync"
+    batch_size: int = 256
+    flush_interval: float = 0.05
+    queue_size: int = 10000
+
+
+@dataclass(frozen=True)
+class StorageConfig:
+    preset: StoragePresetName = "durable"
+    journal_mode: JournalMode = "wal"
+    synchronous: SynchronousLevel = "full"
+    mmap_size: int = 0
+    cache_size: int = 8192
+    busy_timeout: float = 5.0
+    checkpoint_interval: float = 60.0
+    wal_size_limit: int = 64 * 1024 * 1024
+
+    def pragmas(self) -> dict[str, Any]:
+        """Return the ``PRAGMA`` settings applied to every database connection."""
+
+        return {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "mmap_size": self.mmap_size,
+            # A negative cache_size is measured in KiB rather than pages.
+            "cache_size": -self.cache_size,
+            "busy_timeout": int(self.busy_timeout * 1000),
+            "journal_size_limit": self.wal_size_limit,
+        }
+
+
+@dataclass(frozen=True)
+class CompressionConfig:
+    codec: CompressionCodec = "gzip"
+    min_size: int = 1024
+
+    @property
+    def enabled(self) -> bool:
+        return self.codec != "none"
+
+
+@dataclass(frozen=True)
+class HistoryCacheConfig:
+    entries: int = 200
+    lookup_entries: int = 1000
+    max_bytes: int = 32 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class LocalWatchConfig:
+    enabled: bool = False
+    min_interval: float = 0.5
+    max_interval: float = 5.0
+    # Largest fraction of wall-clock time spent reading the clipboard.
+    cpu_budget: float = 0.02
+
+
+@dataclass(frozen=True)
+class RetentionConfig:
+    interval: float = 3600.0
+    batch_size: int = 500
+    vacuum_pages: int = 1024
+    max_age_days: float | None = None
+    max_events: int | None = None
+    max_bytes: int | None = None
+    actions: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def enabled(self) -> bool:
+        limits = (self.max_age_days, self.max_events, self.max_bytes)
+        return self.interval > 0 and (
+            any(limit is not None for limit in limits) or bool(self.actions)
+        )
+
+
 @dataclass(frozen=True)
 class ServerConfig:
     host: str
     port: int
     db: Path
     clipboard_backend: ClipboardBackendName = "system"
+    clipboard_timeout: float = 2.0
+    clipboard_helper: tuple[str, ...] | None = None
     allow_deletions: bool = False
+    concurrency: ConcurrencyMode = "threads"
+    max_workers: int = 8
+    queue_size: int = 32
+    keep_alive_timeout: float = 5.0
+    max_watchers: int = 4
+    event_log: EventLogConfig = field(default_factory=EventLogConfig)
+    storage: StorageConfig = field(default_factory=StorageConfig)
+    retention: RetentionConfig = field(default_factory=RetentionConfig)
+    compression: CompressionConfig = field(default_factory=CompressionConfig)
+    history_cache: HistoryCacheConfig = field(default_factory=HistoryCacheConfig)
+    local_watch: LocalWatchConfig = field(default_factory=LocalWatchConfig)
 
     @property
     def db_path(self) -> Path:
@@ -47,6 +224,9 @@ class ServerConfig:
 class ClientConfig:
     url: str
     socket: Path | None = None
+    compression: CompressionConfig = field(default_factory=CompressionConfig)
+    paste_cache: Path | None = None
+    agent_socket: Path | None = None
 
     @property
     def socket_path(self) -> Path | None:
@@ -54,6 +234,18 @@ class ClientConfig:
             return None
         return self.socket.expanduser()
 
+    @property
+    def paste_cache_path(self) -> Path | None:
+        if self.paste_cache is None:
+            return None
+        return self.paste_cache.expanduser()
+
+    @property
+    def agent_socket_path(self) -> Path | None:
+        if self.agent_socket is None:
+            return None
+        return self.agent_socket.expanduser()
+
 
 @dataclass(frozen=True)
 class RemoClipConfig:
@@ -77,7 +269,30 @@ def load_config(path: str | None = None) -> RemoClipConfig:
         clipboard_backend=_normalize_clipboard_backend(
             server_config.get("clipboard_backend")
         ),
+        clipboard_timeout=_normalize_float(
+            server_config.get("clipboard_timeout"), "clipboard_timeout", minimum=0
+        ),
+        clipboard_helper=_normalize_command(
+            server_config.get("clipboard_helper"), "clipboard_helper"
+        ),
         allow_deletions=_normalize_allow_deletions(server_config.get("allow_deletions")),
+        concurrency=_normalize_concurrency(server_config.get("concurrency")),
+        max_workers=_normalize_int(server_config.get("max_workers"), "max_workers", minimum=1),
+        queue_size=_normalize_int(server_config.get("queue_size"), "queue_size", minimum=0),
+        keep_alive_timeout=_normalize_float(
+            server_config.get("keep_alive_timeout"), "keep_alive_timeout", minimum=0
+        ),
+        max_watchers=_normalize_int(
+            server_config.get("max_watchers"), "max_watchers", minimum=0
+        ),
+        event_log=_load_event_log_config(server_config["event_log"]),
+        storage=_load_storage_config(server_config["storage"]),
+        retention=_load_retention_config(server_config["retention"]),
+        compression=_load_compression_config(
+            server_config["compression"], "server.compression"
+        ),
+        history_cache=_load_history_cache_config(server_config["history_cache"]),
+        local_watch=_load_local_watch_config(server_config["local_watch"]),
     )
 
     socket_value = client_config.get("socket")
@@ -86,9 +301,19 @@ def load_config(path: str | None = None) -> RemoClipConfig:
     else:
         socket_path = Path(str(socket_value))
 
+    paste_cache_value = client_config.get("paste_cache")
+    paste_cache = None if paste_cache_value in (None, "") else Path(str(paste_cache_value))
+    agent_socket_value = client_config.get("agent_socket")
+    agent_socket = None if agent_socket_value in (None, "") else Path(str(agent_socket_value))
+
     client = ClientConfig(
         url=str(client_config["url"]),
         socket=socket_path,
+        paste_cache=paste_cache,
+        agent_socket=agent_socket,
+        compression=_load_compression_config(
+            client_config["compression"], "client.compression"
+        ),
     )
 
     security_token = data.get("security_token")
@@ -102,15 +327,174 @@ def load_config(path: str | None = None) -> RemoClipConfig:
     )
 
 
+def _load_event_log_config(values: Any) -> EventLogConfig:
+    if not isinstance(values, Mapping):
+        raise TypeError("event_log must be a mapping")
+    mode = str(values.get("mode") or "sync").lower()
+    if mode not in ("sync", "async"):
+        raise ValueError("event_log.mode must be either 'sync' or 'async'")
+    return EventLogConfig(
+        mode=mode,  # type: ignore[arg-type]
+        batch_size=_normalize_int(
+            values.get("batch_size"), "event_log.batch_size", minimum=1
+        ),
+        flush_interval=_normalize_float(
+            values.get("flush_interval"), "event_log.flush_interval", minimum=0
+        ),
+        queue_size=_normalize_int(
+            values.get("queue_size"), "event_log.queue_size", minimum=1
+        ),
+    )
+
+
+def _load_storage_config(values: Any) -> StorageConfig:
+    if not isinstance(values, Mapping):
+        raise TypeError("storage must be a mapping")
+    preset = str(values.get("preset") or "durable").lower()
+    if preset not in STORAGE_PRESETS:
+        raise ValueError(
+            "storage.preset must be one of: " + ", ".join(sorted(STORAGE_PRESETS))
+        )
+    settings = dict(STORAGE_PRESETS[preset])
+    settings.update(
+        {key: value for key, value in values.items() if key != "preset" and value is not None}
+    )
+    unknown = set(settings) - set(STORAGE_PRESETS[preset])
+    if unknown:
+        raise ValueError(f"unknown storage setting: {sorted(unknown)[0]}")
+
+    return StorageConfig(
+        preset=preset,  # type: ignore[arg-type]
+        journal_mode=_normalize_choice(
+            settings["journal_mode"],
+            "storage.journal_mode",
+            ("wal", "delete", "truncate", "persist"),
+        ),
+        synchronous=_normalize_choice(
+            settings["synchronous"],
+            "storage.synchronous",
+            ("off", "normal", "full", "extra"),
+        ),
+        mmap_size=_normalize_int(settings["mmap_size"], "storage.mmap_size", minimum=0),
+        cache_size=_normalize_int(settings["cache_size"], "storage.cache_size", minimum=0),
+        busy_timeout=_normalize_float(
+            settings["busy_timeout"], "storage.busy_timeout", minimum=0
+        ),
+        checkpoint_interval=_normalize_float(
+            settings["checkpoint_interval"], "storage.checkpoint_interval", minimum=0
+        ),
+        wal_size_limit=_normalize_int(
+            settings["wal_size_limit"], "storage.wal_size_limit", minimum=0
+        ),
+    )
+
+
+def _load_history_cache_config(values: Any) -> HistoryCacheConfig:
+    if not isinstance(values, Mapping):
+        raise TypeError("history_cache must be a mapping")
+    return HistoryCacheConfig(
+        entries=_normalize_int(values.get("entries"), "history_cache.entries", minimum=0),
+        lookup_entries=_normalize_int(
+            values.get("lookup_entries"), "history_cache.lookup_entries", minimum=0
+        ),
+        max_bytes=_normalize_int(
+            values.get("max_bytes"), "history_cache.max_bytes", minimum=0
+        ),
+    )
+
+
+def _load_local_watch_config(values: Any) -> LocalWatchConfig:
+    if not isinstance(values, Mapping):
+        raise TypeError("local_watch must be a mapping")
+    enabled = values.get("enabled")
+    if not isinstance(enabled, bool):
+        raise TypeError("local_watch.enabled must be a boolean")
+    min_interval = _normalize_float(
+        values.get("min_interval"), "local_watch.min_interval", minimum=0.01
+    )
+    max_interval = _normalize_float(
+        values.get("max_interval"), "local_watch.max_interval", minimum=min_interval
+    )
+    cpu_budget = _normalize_float(values.get("cpu_budget"), "local_watch.cpu_budget", minimum=0)
+    if not 0 < cpu_budget <= 1:
+        raise ValueError("local_watch.cpu_budget must be greater than 0 and at most 1")
+    return LocalWatchConfig(
+        enabled=enabled,
+        min_interval=min_interval,
+        max_interval=max_interval,
+        cpu_budget=cpu_budget,
+    )
+
+
+def _load_compression_config(values: Any, section: str) -> CompressionConfig:
+    if not isinstance(values, Mapping):
+        raise TypeError(f"{section} must be a mapping")
+    return CompressionConfig(
+        codec=_normalize_choice(
+            values.get("codec") or "none", f"{section}.codec", ("gzip", "zstd", "none")
+        ),
+        min_size=_normalize_int(values.get("min_size"), f"{section}.min_size", minimum=0),
+    )
+
+
+def _load_retention_config(values: Any) -> RetentionConfig:
+    if not isinstance(values, Mapping):
+        raise TypeError("retention must be a mapping")
+    actions = values.get("actions") or {}
+    if not isinstance(actions, Mapping):
+        raise TypeError("retention.actions must be a mapping")
+
+    def optional(key: str, normalize: Any) -> Any:
+        value = values.get(key)
+        if value is None:
+            return None
+        return normalize(value, f"retention.{key}", minimum=0)
+
+    return RetentionConfig(
+        interval=_normalize_float(values.get("interval"), "retention.interval", minimum=0),
+        batch_size=_normalize_int(
+            values.get("batch_size"), "retention.batch_size", minimum=1
+        ),
+        vacuum_pages=_normalize_int(
+            values.get("vacuum_pages"), "retention.vacuum_pages", minimum=1
+        ),
+        max_age_days=optional("max_age_days", _normalize_float),
+        max_events=optional("max_events", _normalize_int),
+        max_bytes=optional("max_bytes", _normalize_int),
+        actions={
+            _normalize_choice(action, "retention.actions", ("copy", "paste", "history")):
+            _normalize_float(days, f"retention.actions.{action}", minimum=0)
+            for action, days in actions.items()
+        },
+    )
+
+
+def _normalize_choice(value: Any, field: str, choices: tuple[str, ...]) -> Any:
+    choice = str(value).lower()
+    if choice not in choices:
+        raise ValueError(f"{field} must be one of: {', '.join(choices)}")
+    return choice
+
+
 def _normalize_clipboard_backend(value: Any) -> ClipboardBackendName:
     backend = str(value or "system").lower()
-    if backend not in ("system", "private"):
+    if backend not in ("system", "private", "helper"):
         raise ValueError(
-            "clipboard_backend must be either 'system' or 'private'"
+            "clipboard_backend must be one of 'system', 'private' or 'helper'"
         )
     return backend  # type: ignore[return-value]
 
 
+def _normalize_command(value: Any, field: str) -> tuple[str, ...] | None:
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        return tuple(shlex.split(value))
+    if isinstance(value, list) and value and all(isinstance(item, str) for item in value):
+        return tuple(value)
+    raise TypeError(f"{field} must be a command string or a list of arguments")
+
+
 def _normalize_allow_deletions(value: Any | None) -> bool:
     if value is None:
         return False
@@ -119,6 +503,37 @@ def _normalize_allow_deletions(value: Any | None) -> bool:
     raise TypeError("allow_deletions must be a boolean")
 
 
+def _normalize_concurrency(value: Any) -> ConcurrencyMode:
+    mode = str(value or "threads").lower()
+    if mode not in ("threads", "single"):
+        raise ValueError("concurrency must be either 'threads' or 'single'")
+    return mode  # type: ignore[return-value]
+
+
+def _normalize_int(value: Any, field: str, *, minimum: int) -> int:
+    if isinstance(value, bool):
+        raise TypeError(f"{field} must be an integer")
+    try:
+        number = int(value)
+    except (TypeError, ValueError) as exc:
+        raise TypeError(f"{field} must be an integer") from exc
+    if number < minimum:
+        raise ValueError(f"{field} must be at least {minimum}")
+    return number
+
+
+def _normalize_float(value: Any, field: str, *, minimum: float) -> float:
+    if isinstance(value, bool):
+        raise TypeError(f"{field} must be a number")
+    try:
+        number = float(value)
+    except (TypeError, ValueError) as exc:
+        raise TypeError(f"{field} must be a number") from exc
+    if number < minimum:
+        raise ValueError(f"{field} must be at least {minimum:g}")
+    return number
+
+
 def _merge(defaults: Mapping[str, Any], overrides: Mapping[str, Any] | None) -> dict[str, Any]:
     if overrides is None:
         return {key: _clone(value) for key, value in defaults.items()}
@@ -146,11 +561,85 @@ def _clone(value: Any) -> Any:
 
 
 def _load_yaml(path: Path) -> Mapping[str, Any] | None:
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except OSError:
         return None
-    loaded = yaml.safe_load(path.read_text())
+    loaded = _read_config_cache(path, stat)
     if loaded is None:
-        return None
-    if not isinstance(loaded, Mapping):
-        raise TypeError("Configuration file must contain a mapping at the top level")
+        # Imported here so a cached or missing configuration never loads it.
+        import yaml
+
+        loaded = yaml.safe_load(path.read_text())
+        if loaded is None:
+            loaded = {}
+        if not isinstance(loaded, Mapping):
+            raise TypeError("Configuration file must contain a mapping at the top level")
+        _write_config_cache(path, stat, loaded)
     return loaded
+
+
+CONFIG_CACHE_VERSION = 1
+
+# A file modified this recently could change again without its mtime or size
+# changing, so it is not cached until it has been left alone for a while.
+_CONFIG_CACHE_RACY_NS = 2_000_000_000
+
+
+def config_cache_path(path: Path) -> Path:
+    """Return where the parsed form of the configuration file *path* is kept."""
+
+    return path.with_name(f"{path.name}.cache")
+
+
+def _config_cache_key(path: Path, stat: os.stat_result) -> dict[str, Any]:
+    return {
+        "version": CONFIG_CACHE_VERSION,
+        "path": str(path.absolute()),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def _read_config_cache(path: Path, stat: os.stat_result) -> Mapping[str, Any] | None:
+    try:
+        with config_cache_path(path).open("rb") as handle:
+            cached = json.load(handle)
+        if cached.get("key") != _config_cache_key(path, stat):
+            return None
+        data = cached["data"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+    return data if isinstance(data, Mapping) else None
+
+
+def _write_config_cache(path: Path, stat: os.stat_result, loaded: Mapping[str, Any]) -> None:
+    """Store *loaded* as JSON when that round-trips it exactly.
+
+    YAML values without a JSON equivalent (dates, non-string keys) simply
+    leave the configuration uncached. Failures to write are ignored: the
+    cache only saves parsing time.
+    """
+
+    if time.time_ns() - stat.st_mtime_ns < _CONFIG_CACHE_RACY_NS:
+        return
+    try:
+        encoded = json.dumps({"key": _config_cache_key(path, stat), "data": loaded})
+    except (TypeError, ValueError):
+        return
+    if json.loads(encoded)["data"] != loaded:
+        return
+    cache_path = config_cache_path(path)
+    temporary = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        # The configuration holds the security token, so the cache is private
+        # from the moment it is created.
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(encoded)
+        os.replace(temporary, cache_path)
+    except OSError:
+        try:
+            temporary.unlink(missing_ok=True)
+        except OSError:
+            pass
@@ -1,42 +1,652 @@
 from __future__ import annotations
 
+import logging
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple
 
-from sqlalchemy import Column, DateTime, Integer, String, Text, create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    create_engine,
+    event,
+    text as text_clause,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker, Session
+
+from .digest import content_digest, encode_content
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# Characters of content kept in ``clipboard_blobs.preview``.
+PREVIEW_LENGTH = 80
+
+
+def content_preview(content: str) -> str:
+    return content[:PREVIEW_LENGTH]
+
+
+class ClipboardBlob(Base):
+    """Clipboard content stored once per distinct value.
+
+    ``content`` is the last column so reading the others never follows the
+    overflow pages that hold large values.
+    """
+
+    __tablename__ = "clipboard_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    preview = Column(Text, nullable=False, default="")
+    content = Column(Text, nullable=False)
+
+
 class ClipboardEvent(Base):
     __tablename__ = "clipboard_events"
+    __table_args__ = (
+        Index("ix_clipboard_events_action_timestamp", "action", "timestamp"),
+        Index("ix_clipboard_events_timestamp", "timestamp"),
+        Index("ix_clipboard_events_hostname_timestamp", "hostname", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True)
     timestamp = Column(DateTime(timezone=True), default=utc_now, nullable=False)
     hostname = Column(String(255), nullable=False)
     action = Column(String(32), nullable=False)
-    content = Column(Text, nullable=False)
+    content_hash = Column(
+        String(64), ForeignKey("clipboard_blobs.hash"), nullable=False, index=True
+    )
+
+    blob = relationship(ClipboardBlob, viewonly=True)
+
+    @property
+    def content(self) -> str:
+        pending = self.__dict__.get("_pending_content")
+        if pending is not None:
+            return pending
+        return self.blob.content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self.content_hash = content_digest(value)
+        self._pending_content = value
+
+
+# Full-text index over each distinct clipboard value, keyed by the rowid of
+# its ``clipboard_blobs`` row. It is an external-content FTS5 table, so
+# content is still stored once. A blob is indexed while at least one copy or
+# paste references it: the first such event tokenizes it and the removal of
+# the last one drops it again, so repeated pastes and the JSON payloads of
+# ``history`` events never reach the index. Searches join matches to the
+# events that reference them.
+SEARCH_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS clipboard_search USING fts5("
+    "content, content='clipboard_blobs', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS clipboard_search_event_insert "
+    "AFTER INSERT ON clipboard_events "
+    "WHEN new.action != 'history' AND NOT EXISTS ("
+    "SELECT 1 FROM clipboard_events WHERE content_hash = new.content_hash "
+    "AND action != 'history' AND id != new.id) BEGIN "
+    "INSERT INTO clipboard_search (rowid, content) "
+    "SELECT rowid, content FROM clipboard_blobs WHERE hash = new.content_hash; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS clipboard_search_event_delete "
+    "AFTER DELETE ON clipboard_events "
+    "WHEN old.action != 'history' AND NOT EXISTS ("
+    "SELECT 1 FROM clipboard_events WHERE content_hash = old.content_hash "
+    "AND action != 'history') BEGIN "
+    "INSERT INTO clipboard_search (clipboard_search, rowid, content) "
+    "SELECT 'delete', rowid, content FROM clipboard_blobs WHERE hash = old.content_hash; "
+    "END",
+)
+
+
+@event.listens_for(ClipboardEvent.__table__, "after_create")
+def _create_search_index(target: Any, connection: Connection, **kw: Any) -> None:
+    for statement in SEARCH_SCHEMA:
+        connection.exec_driver_sql(statement)
+
+
+def _reindex_search(connection: Connection) -> None:
+    """Rebuild the search index from the blobs that copies or pastes reference."""
+
+    connection.exec_driver_sql(
+        "INSERT INTO clipboard_search (clipboard_search) VALUES ('delete-all')"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO clipboard_search (rowid, content) "
+        "SELECT rowid, content FROM clipboard_blobs WHERE EXISTS ("
+        "SELECT 1 FROM clipboard_events "
+        "WHERE content_hash = clipboard_blobs.hash AND action != 'history')"
+    )
+
+
+class EventRecord(NamedTuple):
+    """Detached copy of a clipboard event that outlives its session."""
+
+    id: int
+    timestamp: datetime
+    hostname: str
+    action: str
+    content_hash: str
+    content: str
+
+    @classmethod
+    def from_event(cls, event: ClipboardEvent) -> EventRecord:
+        """Copy a flushed *event*, which must still be attached to its session."""
+
+        return cls(
+            event.id,
+            event.timestamp,
+            event.hostname,
+            event.action,
+            event.content_hash,
+            event.content,
+        )
+
+
+class ClipboardState(Base):
+    """Single row holding the current clipboard value and its version.
+
+    Kept up to date in the same transaction as every ``copy`` event so the
+    server can restore its state without scanning the history.
+    """
+
+    __tablename__ = "clipboard_state"
+
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), ForeignKey("clipboard_blobs.hash"), nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+    blob = relationship(ClipboardBlob, viewonly=True)
+
+
+CLIPBOARD_STATE_ID = 1
+
+
+@event.listens_for(Session, "before_flush")
+def _store_pending_blobs(session: Session, flush_context: Any, instances: Any) -> None:
+    """Insert the blobs referenced by new or changed events ahead of the flush.
+
+    New ``copy`` events also advance :class:`ClipboardState` here, which keeps
+    it in the same transaction as the events themselves.
+    """
+
+    pending: dict[str, str] = {}
+    copies: list[ClipboardEvent] = []
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, ClipboardEvent):
+            content = obj.__dict__.get("_pending_content")
+            if content is not None:
+                pending[obj.content_hash] = content
+            if obj in session.new and obj.action == "copy":
+                copies.append(obj)
+    if pending:
+        statement = sqlite_insert(ClipboardBlob).on_conflict_do_nothing(
+            index_elements=[ClipboardBlob.hash]
+        )
+        session.execute(
+            statement,
+            [
+                {
+                    "hash": digest,
+                    "size": len(encode_content(content)),
+                    "content": content,
+                    "preview": content_preview(content),
+                }
+                for digest, content in pending.items()
+            ],
+        )
+    if copies:
+        # ``session.new`` preserves the order in which events were added.
+        latest = copies[-1]
+        updated_at = latest.timestamp or utc_now()
+        statement = sqlite_insert(ClipboardState).values(
+            id=CLIPBOARD_STATE_ID,
+            content_hash=latest.content_hash,
+            version=len(copies),
+            updated_at=updated_at,
+        )
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[ClipboardState.id],
+                set_={
+                    "content_hash": latest.content_hash,
+                    "version": ClipboardState.version + len(copies),
+                    "updated_at": updated_at,
+                },
+            )
+        )
+
+
+def load_clipboard_state(session: Session) -> tuple[str, int]:
+    """Return the current clipboard ``(content, version)`` from one row."""
+
+    row = (
+        session.query(ClipboardBlob.content, ClipboardState.version)
+        .join(ClipboardState, ClipboardState.content_hash == ClipboardBlob.hash)
+        .filter(ClipboardState.id == CLIPBOARD_STATE_ID)
+        .one_or_none()
+    )
+    if row is None:
+        return "", 0
+    return row.content, row.version
+
+
+def _search_expression(text: str) -> str:
+    # Each whitespace-separated word becomes a quoted phrase, so input never
+    # trips over FTS5 query syntax and every word has to match. Prefix
+    # queries are left out: a short prefix expands to thousands of terms and
+    # turns a millisecond lookup into seconds on a large history.
+    terms = text.split()
+    if not terms:
+        raise ValueError("query must not be empty")
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_events(session: Session, text: str, *, limit: int, offset: int = 0) -> list[Any]:
+    """Return up to *limit* events whose content matches *text*.
+
+    Each matching value is listed once, as its newest non-history event.
+    Matches are ranked best first by FTS5's BM25 score. Rows carry the event
+    metadata with the content ``size`` and ``preview``.
+    """
+
+    return list(
+        session.execute(
+            text_clause(
+                "SELECT clipboard_events.id, clipboard_events.timestamp, "
+                "clipboard_events.hostname, clipboard_events.action, "
+                "clipboard_blobs.size, clipboard_blobs.preview "
+                "FROM clipboard_search "
+                "JOIN clipboard_blobs ON clipboard_blobs.rowid = clipboard_search.rowid "
+                "JOIN clipboard_events ON clipboard_events.id = ("
+                "SELECT max(id) FROM clipboard_events "
+                "WHERE content_hash = clipboard_blobs.hash AND action != 'history') "
+                "WHERE clipboard_search MATCH :expression "
+                "ORDER BY clipboard_search.rank, clipboard_events.id DESC "
+                "LIMIT :limit OFFSET :offset"
+            ).columns(timestamp=DateTime(timezone=True)),
+            {"expression": _search_expression(text), "limit": limit, "offset": offset},
+        )
+    )
+
+
+def delete_unreferenced_blobs(
+    session: Session, hashes: Iterable[str], *, keep_current: bool = False
+) -> int:
+    """Delete the blobs among *hashes* that no event references any more.
+
+    When the current clipboard state points at one of those blobs it moves
+    back to the newest remaining copy, so deleted content does not linger.
+    With *keep_current* the state and its blob are left alone instead, which
+    is what pruning old history wants.
+    """
+
+    candidates = set(hashes)
+    if not candidates:
+        return 0
+    session.flush()
+    referenced = session.query(ClipboardEvent.content_hash).filter(
+        ClipboardEvent.content_hash == ClipboardBlob.hash
+    )
+    state = None if keep_current else session.get(ClipboardState, CLIPBOARD_STATE_ID)
+    if state is not None and state.content_hash in candidates:
+        still_referenced = session.query(
+            session.query(ClipboardEvent.id)
+            .filter(ClipboardEvent.content_hash == state.content_hash)
+            .exists()
+        ).scalar()
+        if not still_referenced:
+            replacement = (
+                session.query(ClipboardEvent.content_hash)
+                .filter(ClipboardEvent.action == "copy")
+                .order_by(ClipboardEvent.timestamp.desc())
+                .limit(1)
+                .scalar()
+            )
+            if replacement is None:
+                session.delete(state)
+            else:
+                state.content_hash = replacement
+            session.flush()
+    current = session.query(ClipboardState.content_hash).filter(
+        ClipboardState.content_hash == ClipboardBlob.hash
+    )
+    return (
+        session.query(ClipboardBlob)
+        .filter(
+            ClipboardBlob.hash.in_(candidates),
+            ~referenced.exists(),
+            ~current.exists(),
+        )
+        .delete(synchronize_session=False)
+    )
 
 
 def ensure_directory(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def create_session_factory(db_path: Path):
+def _configure_connection(dbapi_connection: Any, connection_record: Any) -> None:
+    dbapi_connection.create_function(
+        "remoclip_sha256",
+        1,
+        lambda value: None if value is None else content_digest(value),
+        deterministic=True,
+    )
+    # Takes effect at once on a brand-new file, so it must run before any
+    # other PRAGMA writes the header. Existing databases switch over in
+    # _enable_incremental_vacuum.
+    dbapi_connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+
+def _column_names(connection: Connection, table: str) -> set[str]:
+    return {
+        row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")
+    }
+
+
+def _user_version(connection: Connection) -> int:
+    return int(connection.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+
+
+def _migrate_to_blob_storage(connection: Connection) -> bool:
+    """Move content stored inline on ``clipboard_events`` into ``clipboard_blobs``."""
+
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS clipboard_blobs ("
+        "hash VARCHAR(64) NOT NULL PRIMARY KEY, "
+        "size INTEGER NOT NULL, "
+        "content TEXT NOT NULL)"
+    )
+    if "content" not in _column_names(connection, "clipboard_events"):
+        return False
+    connection.exec_driver_sql(
+        "ALTER TABLE clipboard_events RENAME TO clipboard_events_inline"
+    )
+    connection.exec_driver_sql(
+        "CREATE TABLE clipboard_events ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "timestamp DATETIME NOT NULL, "
+        "hostname VARCHAR(255) NOT NULL, "
+        "action VARCHAR(32) NOT NULL, "
+        "content_hash VARCHAR(64) NOT NULL REFERENCES clipboard_blobs (hash))"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX ix_clipboard_events_content_hash "
+        "ON clipboard_events (content_hash)"
+    )
+    connection.exec_driver_sql(
+        "INSERT OR IGNORE INTO clipboard_blobs (hash, size, content) "
+        "SELECT remoclip_sha256(content), length(CAST(content AS BLOB)), content "
+        "FROM clipboard_events_inline"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO clipboard_events (id, timestamp, hostname, action, content_hash) "
+        "SELECT id, timestamp, hostname, action, remoclip_sha256(content) "
+        "FROM clipboard_events_inline"
+    )
+    connection.exec_driver_sql("DROP TABLE clipboard_events_inline")
+    return True
+
+
+def _add_history_indexes(connection: Connection) -> bool:
+    """Index the ``action``/``timestamp`` filters used by history lookups."""
+
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_clipboard_events_action_timestamp "
+        "ON clipboard_events (action, timestamp)"
+    )
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_clipboard_events_timestamp "
+        "ON clipboard_events (timestamp)"
+    )
+    return False
+
+
+def _add_clipboard_state(connection: Connection) -> bool:
+    """Create ``clipboard_state`` and seed it from the newest copy or paste."""
+
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS clipboard_state ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "content_hash VARCHAR(64) NOT NULL REFERENCES clipboard_blobs (hash), "
+        "version INTEGER NOT NULL, "
+        "updated_at DATETIME NOT NULL)"
+    )
+    latest = connection.exec_driver_sql(
+        "SELECT content_hash, timestamp FROM ("
+        "SELECT * FROM (SELECT content_hash, timestamp FROM clipboard_events "
+        "WHERE action = 'copy' ORDER BY timestamp DESC LIMIT 1) "
+        "UNION ALL "
+        "SELECT * FROM (SELECT content_hash, timestamp FROM clipboard_events "
+        "WHERE action = 'paste' ORDER BY timestamp DESC LIMIT 1)"
+        ") ORDER BY timestamp DESC LIMIT 1"
+    ).first()
+    if latest is not None:
+        copies = connection.exec_driver_sql(
+            "SELECT count(*) FROM clipboard_events WHERE action = 'copy'"
+        ).scalar()
+        connection.exec_driver_sql(
+            "INSERT OR REPLACE INTO clipboard_state "
+            "(id, content_hash, version, updated_at) VALUES (?, ?, ?, ?)",
+            (CLIPBOARD_STATE_ID, latest.content_hash, copies, latest.timestamp),
+        )
+    return False
+
+
+def _enable_incremental_vacuum(connection: Connection) -> bool:
+    """Switch the database to ``auto_vacuum = INCREMENTAL``.
+
+    The setting only takes effect on an existing file after a ``VACUUM``.
+    """
+
+    if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == 2:
+        return False
+    connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+    return True
+
+
+def _add_blob_previews(connection: Connection) -> bool:
+    """Add ``clipboard_blobs.preview``, stored ahead of ``content``.
+
+    ``ALTER TABLE`` can only append columns, so the table is rebuilt. The
+    old table is dropped before the new one takes its name, which leaves the
+    foreign keys that point at ``clipboard_blobs`` untouched.
+    """
+
+    if "preview" in _column_names(connection, "clipboard_blobs"):
+        return False
+    connection.exec_driver_sql(
+        "CREATE TABLE clipboard_blobs_preview ("
+        "hash VARCHAR(64) NOT NULL PRIMARY KEY, "
+        "size INTEGER NOT NULL, "
+        "preview TEXT NOT NULL, "
+        "content TEXT NOT NULL)"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO clipboard_blobs_preview (hash, size, preview, content) "
+        f"SELECT hash, size, substr(content, 1, {PREVIEW_LENGTH}), content "
+        "FROM clipboard_blobs"
+    )
+    connection.exec_driver_sql("DROP TABLE clipboard_blobs")
+    connection.exec_driver_sql(
+        "ALTER TABLE clipboard_blobs_preview RENAME TO clipboard_blobs"
+    )
+    return True
+
+
+def _add_search_index(connection: Connection) -> bool:
+    """Create the full-text search index and fill it from existing history."""
+
+    _create_search_index(None, connection)
+    _reindex_search(connection)
+    return False
+
+
+def _add_hostname_index(connection: Connection) -> bool:
+    """Index the ``hostname``/``timestamp`` filter of history listings."""
+
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_clipboard_events_hostname_timestamp "
+        "ON clipboard_events (hostname, timestamp)"
+    )
+    return False
+
+
+# Applied in order to databases whose ``PRAGMA user_version`` is older than
+# their position. Each step receives a connection inside the upgrade
+# transaction and returns ``True`` when it freed enough space to warrant a
+# ``VACUUM``. Steps must tolerate databases created by any earlier release,
+# and new steps are only ever appended.
+MIGRATIONS: tuple[Callable[[Connection], bool], ...] = (
+    _migrate_to_blob_storage,
+    _add_history_indexes,
+    _add_clipboard_state,
+    _enable_incremental_vacuum,
+    _add_blob_previews,
+    _add_search_index,
+    _add_hostname_index,
+)
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Create or upgrade the database schema to :data:`SCHEMA_VERSION`.
+
+    An up-to-date database costs a single ``PRAGMA`` read, so this is cheap
+    to run on every start.
+    """
+
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        if _user_version(connection) == SCHEMA_VERSION:
+            return
+        # Take the write lock up front so concurrent servers upgrade once.
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        reclaim_space = False
+        try:
+            version = _user_version(connection)
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"database schema version {version} is newer than this "
+                    f"remoclip release supports ({SCHEMA_VERSION})"
+                )
+            if version == 0 and not _column_names(connection, "clipboard_events"):
+                Base.metadata.create_all(connection)
+            else:
+                for number in range(version + 1, SCHEMA_VERSION + 1):
+                    logger.info("Upgrading database schema to version %d", number)
+                    reclaim_space |= MIGRATIONS[number - 1](connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.exec_driver_sql("COMMIT")
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        if reclaim_space:
+            connection.exec_driver_sql("VACUUM")
+            # VACUUM may renumber the rowids of clipboard_blobs, which key
+            # the search index.
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            _reindex_search(connection)
+            connection.exec_driver_sql("COMMIT")
+
+
+def _pragma_listener(pragmas: Mapping[str, Any]) -> Callable[[Any, Any], None]:
+    def _apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return _apply_pragmas
+
+
+def incremental_vacuum(session_factory, *, pages: int) -> int:
+    """Return up to *pages* free pages to the file system.
+
+    Returns the number of pages released, which is zero once the free list
+    is empty or when the database does not use incremental auto-vacuum.
+    """
+
+    engine: Engine = session_factory.kw["bind"]
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+            return 0
+        before = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if not before:
+            return 0
+        # sqlite3 steps a statement once on execute() and each step of this
+        # PRAGMA frees a single page; executescript() runs it to completion.
+        connection.connection.driver_connection.executescript(
+            f"PRAGMA incremental_vacuum({int(pages)})"
+        )
+        after = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+    return before - after
+
+
+def checkpoint_wal(session_factory, *, size_limit: int = 0) -> tuple[int, int, int] | None:
+    """Copy the write-ahead log back into the database file.
+
+    Runs a ``PASSIVE`` checkpoint, which never blocks readers or writers.
+    Once the log exceeds *size_limit* bytes a ``TRUNCATE`` checkpoint waits
+    for readers to finish and resets the log to zero bytes instead. Returns
+    SQLite's ``(busy, log frames, checkpointed frames)`` result, or ``None``
+    when the database has no write-ahead log.
+    """
+
+    engine: Engine = session_factory.kw["bind"]
+    wal_path = Path(f"{engine.url.database}-wal")
+    if not wal_path.exists():
+        return None
+    mode = "PASSIVE"
+    if size_limit and wal_path.stat().st_size > size_limit:
+        mode = "TRUNCATE"
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        busy, log_frames, checkpointed = connection.exec_driver_sql(
+            f"PRAGMA wal_checkpoint({mode})"
+        ).one()
+    return busy, log_frames, checkpointed
+
+
+def create_session_factory(db_path: Path, pragmas: Mapping[str, Any] | None = None):
+    """Open *db_path*, upgrading its schema, and return a session factory.
+
+    *pragmas* are applied to every new connection, in order.
+    """
+
     ensure_directory(db_path)
     engine = create_engine(
         f"sqlite:///{db_path}",
         connect_args={"check_same_thread": False},
         future=True,
     )
-    Base.metadata.create_all(engine)
+    event.listen(engine, "connect", _configure_connection)
+    if pragmas:
+        event.listen(engine, "connect", _pragma_listener(dict(pragmas)))
+    upgrade_schema(engine)
     return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
@@ -0,0 +1,21 @@
+"""Content hashing shared by the database and the clipboard backends.
+
+Kept free of third-party imports so the clipboard helper does not load
+SQLAlchemy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+
+def encode_content(content: str) -> bytes:
+    """Return *content* as stored and hashed: UTF-8, keeping lone surrogates."""
+
+    return content.encode("utf-8", errors="surrogatepass")
+
+
+def content_digest(content: str) -> str:
+    """Return the key under which *content* is stored in ``clipboard_blobs``."""
+
+    return hashlib.sha256(encode_content(content)).hexdigest()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Protocol
+
+from .db import ClipboardEvent, EventRecord, session_scope, utc_now
+
+logger = logging.getLogger(__name__)
+
+# Called with the events of each transaction, in id order, right after it
+# commits and while the write lock is still held.
+CommitListener = Callable[[list[EventRecord]], None]
+
+
+class EventLog(Protocol):
+    """Destination for clipboard audit events."""
+
+    def log(self, hostname: str, action: str, content: str) -> None:
+        """Record an event."""
+
+    def flush(self) -> None:
+        """Block until every recorded event has been committed."""
+
+    def start(self) -> None:
+        """Begin any background work."""
+
+    def stop(self) -> None:
+        """Commit outstanding events and release resources."""
+
+
+class SynchronousEventLog:
+    """Commit each event in its own transaction before returning."""
+
+    def __init__(
+        self,
+        session_factory,
+        write_lock: threading.Lock,
+        *,
+        on_commit: CommitListener | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._write_lock = write_lock
+        self._on_commit = on_commit
+
+    def log(self, hostname: str, action: str, content: str) -> None:
+        with self._write_lock:
+            with session_scope(self._session_factory) as session:
+                event = ClipboardEvent(hostname=hostname, action=action, content=content)
+                session.add(event)
+                session.flush()
+                record = EventRecord.from_event(event)
+            if self._on_commit is not None:
+                self._on_commit([record])
+
+    def flush(self) -> None:
+        return None
+
+    def start(self) -> None:
+        return None
+
+    def stop(self) -> None:
+        return None
+
+
+_PendingEvent = tuple[datetime, str, str, str]
+
+
+class AsyncEventLog:
+    """Queue events in memory and commit them in batches on a writer thread.
+
+    A batch is committed once ``batch_size`` events are waiting or
+    ``flush_interval`` seconds after its first event arrived, whichever comes
+    first. When ``queue_size`` events are already pending, :meth:`log` blocks
+    until the writer catches up.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        write_lock: threading.Lock,
+        *,
+        batch_size: int,
+        flush_interval: float,
+        queue_size: int,
+        on_commit: CommitListener | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._write_lock = write_lock
+        self._on_commit = on_commit
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: queue.Queue[_PendingEvent | None] = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+
+    def log(self, hostname: str, action: str, content: str) -> None:
+        self.start()
+        self._queue.put((utc_now(), hostname, action, content))
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def start(self) -> None:
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="remoclip-event-writer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._thread_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: list[_PendingEvent] = []
+            item = self._queue.get()
+            received = 1
+            deadline = time.monotonic() + self._flush_interval
+            while True:
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+                try:
+                    if stopping:
+                        # Drain whatever is left so shutdown loses nothing.
+                        item = self._queue.get_nowait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if len(batch) >= self._batch_size or remaining <= 0:
+                            break
+                        item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                received += 1
+            self._write(batch)
+            for _ in range(received):
+                self._queue.task_done()
+
+    def _write(self, batch: list[_PendingEvent]) -> None:
+        if not batch:
+            return
+        try:
+            with self._write_lock:
+                with session_scope(self._session_factory) as session:
+                    events = [
+                        ClipboardEvent(
+                            timestamp=timestamp,
+                            hostname=hostname,
+                            action=action,
+                            content=content,
+                        )
+                        for timestamp, hostname, action, content in batch
+                    ]
+                    session.add_all(events)
+                    session.flush()
+                    records = [EventRecord.from_event(event) for event in events]
+                if self._on_commit is not None:
+                    self._on_commit(records)
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("Failed to write %d clipboard events", len(batch))
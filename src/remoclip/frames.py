@@ -0,0 +1,77 @@
+"""Length-prefixed request/response frames.
+
+Spoken by the clipboard helper on its standard streams and by the client
+agent on its Unix socket. A frame is a one-byte code, a four-byte big-endian
+payload length and the payload:
+
+* requests: ``C`` with UTF-8 text to copy, or ``P`` with an empty payload to
+  paste;
+* responses: ``O`` with the pasted text (empty after a copy), or ``E`` with
+  an error message.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import BinaryIO, Callable
+
+COPY = b"C"
+PASTE = b"P"
+OK = b"O"
+ERROR = b"E"
+
+_HEADER = struct.Struct(">cI")
+
+
+def write_frame(stream: BinaryIO, code: bytes, payload: bytes = b"") -> None:
+    stream.write(_HEADER.pack(code, len(payload)) + payload)
+    stream.flush()
+
+
+def read_frame(stream: BinaryIO) -> tuple[bytes, bytes] | None:
+    """Read one frame, returning ``None`` at a clean end of stream."""
+
+    header = _read_exactly(stream, _HEADER.size)
+    if not header:
+        return None
+    code, size = _HEADER.unpack(header)
+    payload = _read_exactly(stream, size) if size else b""
+    if len(payload) != size:
+        raise EOFError("frame stream ended mid-frame")
+    return code, payload
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            if data:
+                raise EOFError("frame stream ended mid-frame")
+            break
+        data += chunk
+    return data
+
+
+def encode_text(text: str) -> bytes:
+    return text.encode("utf-8", errors="surrogatepass")
+
+
+def decode_text(payload: bytes) -> str:
+    return payload.decode("utf-8", errors="surrogatepass")
+
+
+def handle_request(
+    code: bytes, payload: bytes, copy: Callable[[str], None], paste: Callable[[], str]
+) -> tuple[bytes, bytes]:
+    """Apply one request and return the response frame."""
+
+    try:
+        if code == COPY:
+            copy(decode_text(payload))
+            return OK, b""
+        if code == PASTE:
+            return OK, encode_text(paste())
+        return ERROR, f"unknown request {code!r}".encode()
+    except Exception as exc:  # reported to the requester rather than crashing
+        return ERROR, str(exc).encode("utf-8", errors="replace")
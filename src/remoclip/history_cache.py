@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from .db import EventRecord
+
+
+def _record_size(record: EventRecord) -> int:
+    # Memory held by the content string, which dominates every other field.
+    return sys.getsizeof(record.content)
+
+
+class HistoryCache:
+    """Bounded in-memory copy of recent clipboard events.
+
+    Two areas share one byte budget:
+
+    * a *window* holding the newest non-``history`` events. Every such event
+      newer than the oldest one in the window is present, so history pages
+      that fall inside it are served without touching SQLite;
+    * an LRU of older events fetched by id, for repeated ``/paste?id=`` and
+      ``/history?id=`` lookups.
+
+    Callers keep it coherent by passing every committed event to :meth:`add`
+    and every deleted id to :meth:`discard`, in commit order. Events read
+    from the database are offered to :meth:`remember` with the
+    :attr:`generation` taken before the read, so a delete that lands in
+    between is not undone.
+    """
+
+    def __init__(self, *, entries: int, lookup_entries: int, max_bytes: int) -> None:
+        self.entries = entries
+        self.lookup_entries = lookup_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._window: OrderedDict[int, EventRecord] = OrderedDict()
+        self._lookups: OrderedDict[int, EventRecord] = OrderedDict()
+        self._bytes = 0
+        # True while the window holds every non-history event in the database.
+        self._exhaustive = False
+        # Bumped by every discard; see remember().
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.entries > 0
+
+    @property
+    def generation(self) -> int:
+        """Counter of :meth:`discard` calls, read before loading an event."""
+
+        with self._lock:
+            return self._generation
+
+    def warm(self, newest_first: list[EventRecord], *, exhaustive: bool | None = None) -> None:
+        """Seed the window from the newest rows in the database.
+
+        *newest_first* must hold the newest non-history events without gaps.
+        *exhaustive* says whether they are all of them; by default that is
+        assumed when there are fewer than ``entries``.
+        """
+
+        if not self.enabled:
+            return
+        if exhaustive is None:
+            exhaustive = len(newest_first) < self.entries
+        with self._lock:
+            self._window.clear()
+            self._lookups.clear()
+            self._bytes = 0
+            self._exhaustive = exhaustive
+            for record in reversed(newest_first):
+                self._insert_window(record)
+            self._shrink()
+
+    def add(self, records: Iterable[EventRecord]) -> None:
+        """Record newly committed events, oldest first."""
+
+        if not self.enabled:
+            return
+        with self._lock:
+            for record in records:
+                if record.action != "history":
+                    self._insert_window(record)
+            self._shrink()
+
+    def discard(self, event_ids: Iterable[int]) -> None:
+        """Forget deleted events."""
+
+        with self._lock:
+            self._generation += 1
+            for event_id in event_ids:
+                for area in (self._window, self._lookups):
+                    record = area.pop(event_id, None)
+                    if record is not None:
+                        self._bytes -= _record_size(record)
+
+    def get(self, event_id: int) -> EventRecord | None:
+        """Return the cached event *event_id*, counting a hit or a miss."""
+
+        if not self.enabled:
+            return None
+        with self._lock:
+            record = self._window.get(event_id)
+            if record is None:
+                record = self._lookups.get(event_id)
+                if record is not None:
+                    self._lookups.move_to_end(event_id)
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return record
+
+    def remember(self, record: EventRecord, generation: int) -> None:
+        """Keep an event loaded from the database for later lookups by id.
+
+        The event is dropped when anything was discarded since *generation*
+        was read, as it may have been deleted after it was loaded.
+        """
+
+        if not self.enabled or self.lookup_entries <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            if record.id in self._window or record.id in self._lookups:
+                return
+            self._lookups[record.id] = record
+            self._bytes += _record_size(record)
+            self._shrink()
+
+    def page(
+        self,
+        *,
+        limit: int | None,
+        before_id: int | None = None,
+        after_id: int | None = None,
+    ) -> list[EventRecord] | None:
+        """Return a history page newest first, or ``None`` when it is not cached.
+
+        Mirrors the ``/history`` listing: ``history`` events are excluded,
+        *after_id* selects the oldest *limit* events above it and *before_id*
+        the newest *limit* events below it.
+        """
+
+        if not self.enabled:
+            return None
+        with self._lock:
+            page = self._page(limit, before_id, after_id)
+            if page is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return page
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._window),
+                "lookup_entries": len(self._lookups),
+                "bytes": self._bytes,
+            }
+
+    def _page(
+        self, limit: int | None, before_id: int | None, after_id: int | None
+    ) -> list[EventRecord] | None:
+        ids = list(self._window)
+        if after_id is not None:
+            covered = self._exhaustive or (bool(ids) and after_id >= ids[0] - 1)
+            if not covered:
+                return None
+            newer = [event_id for event_id in ids if event_id > after_id]
+            if limit is not None:
+                newer = newer[:limit]
+            return [self._window[event_id] for event_id in reversed(newer)]
+        older = [
+            event_id for event_id in reversed(ids) if before_id is None or event_id < before_id
+        ]
+        if limit is not None and len(older) >= limit:
+            return [self._window[event_id] for event_id in older[:limit]]
+        if self._exhaustive:
+            return [self._window[event_id] for event_id in older]
+        return None
+
+    def _insert_window(self, record: EventRecord) -> None:
+        stale = self._lookups.pop(record.id, None) or self._window.pop(record.id, None)
+        if stale is not None:
+            self._bytes -= _record_size(stale)
+        self._window[record.id] = record
+        self._bytes += _record_size(record)
+
+    def _shrink(self) -> None:
+        while self._lookups and (
+            len(self._lookups) > self.lookup_entries or self._bytes > self.max_bytes
+        ):
+            _, record = self._lookups.popitem(last=False)
+            self._bytes -= _record_size(record)
+        while self._window and (
+            len(self._window) > self.entries or self._bytes > self.max_bytes
+        ):
+            _, record = self._window.popitem(last=False)
+            self._bytes -= _record_size(record)
+            self._exhaustive = False
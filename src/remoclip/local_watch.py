@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from .clipboard import ClipboardBackend
+
+logger = logging.getLogger(__name__)
+
+# Growth of the polling interval after each poll that finds no change.
+BACKOFF_FACTOR = 1.5
+
+
+class LocalClipboardWatcher:
+    """Poll a clipboard backend and report values copied outside remoclip.
+
+    Polling starts every *min_interval* seconds and backs off towards
+    *max_interval* while the clipboard stays unchanged. It also never spends
+    more than *cpu_budget* of the elapsed time inside the backend: a read that
+    takes 10 ms with a budget of ``0.02`` stretches the interval to at least
+    half a second.
+
+    *on_change* runs with *lock* held, which callers also hold while they
+    :meth:`observe` copies of their own, so a value remoclip wrote itself is
+    never reported back as a local copy. Instances follow the
+    ``start()``/``stop()`` protocol of ``BACKGROUND_SERVICES``.
+    """
+
+    name = "remoclip-local-watch"
+
+    def __init__(
+        self,
+        backend: ClipboardBackend,
+        on_change: Callable[[str], None],
+        lock: threading.Lock,
+        *,
+        initial_value: str = "",
+        min_interval: float = 0.5,
+        max_interval: float = 5.0,
+        cpu_budget: float = 0.02,
+    ) -> None:
+        self._backend = backend
+        self._on_change = on_change
+        self._lock = lock
+        self._last = initial_value
+        # Bumped by observe() so a poll that raced a remote copy is dropped.
+        self._generation = 0
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cpu_budget = cpu_budget
+        self.interval = min_interval
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def observe(self, value: str) -> None:
+        """Record *value* as written by remoclip. Call with the lock held."""
+
+        self._last = value
+        self._generation += 1
+
+    def poll_once(self) -> bool:
+        """Read the clipboard once, returning ``True`` when it changed."""
+
+        generation = self._generation
+        started = time.perf_counter()
+        try:
+            value = self._backend.paste()
+        except Exception:
+            logger.exception("Failed to read the local clipboard")
+            value = None
+        elapsed = time.perf_counter() - started
+
+        changed = False
+        if value is not None:
+            with self._lock:
+                # str comparison rejects different lengths before looking at
+                # any text and is otherwise a single memcmp, which is cheaper
+                # than hashing the new value.
+                if generation == self._generation and value != self._last:
+                    self._last = value
+                    self._on_change(value)
+                    changed = True
+
+        if changed:
+            interval = self.min_interval
+        else:
+            interval = min(self.interval * BACKOFF_FACTOR, self.max_interval)
+        self.interval = max(interval, elapsed / self.cpu_budget)
+        return changed
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopped.set()
+        thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Local clipboard watcher failed")
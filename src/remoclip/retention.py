@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import func
+
+from .config import RetentionConfig
+from .db import (
+    CLIPBOARD_STATE_ID,
+    ClipboardBlob,
+    ClipboardEvent,
+    ClipboardState,
+    delete_unreferenced_blobs,
+    incremental_vacuum,
+    session_scope,
+    utc_now,
+)
+
+logger = logging.getLogger(__name__)
+
+# Called with the ids removed by each batch, after it commits and while the
+# write lock is still held.
+DeleteListener = Callable[[list[int]], None]
+
+
+def enforce_retention(
+    session_factory,
+    write_lock: threading.Lock,
+    retention: RetentionConfig,
+    *,
+    now: datetime | None = None,
+    on_delete: DeleteListener | None = None,
+) -> int:
+    """Delete history that falls outside *retention* and reclaim the space.
+
+    Events are removed oldest first in transactions of at most
+    ``retention.batch_size`` rows, taking *write_lock* for one batch at a
+    time so clipboard requests interleave with a long prune. The current
+    clipboard content is always kept. Returns the number of events deleted.
+    """
+
+    def delete_batch(criteria: tuple[Any, ...], order_by: Any) -> tuple[int, int]:
+        return _delete_batch(
+            session_factory,
+            write_lock,
+            retention.batch_size,
+            criteria,
+            order_by=order_by,
+            on_delete=on_delete,
+        )
+
+    def delete_matching(*criteria: Any, order_by: Any) -> int:
+        deleted = 0
+        while True:
+            removed, _ = delete_batch(criteria, order_by)
+            deleted += removed
+            if removed < retention.batch_size:
+                return deleted
+
+    now = now or utc_now()
+    deleted = 0
+
+    for action, days in retention.actions.items():
+        deleted += delete_matching(
+            ClipboardEvent.action == action,
+            ClipboardEvent.timestamp < now - timedelta(days=days),
+            order_by=ClipboardEvent.timestamp,
+        )
+
+    if retention.max_age_days is not None:
+        deleted += delete_matching(
+            ClipboardEvent.timestamp < now - timedelta(days=retention.max_age_days),
+            order_by=ClipboardEvent.timestamp,
+        )
+
+    if retention.max_events is not None:
+        with session_scope(session_factory) as session:
+            boundary = (
+                session.query(ClipboardEvent.id)
+                .order_by(ClipboardEvent.id.desc())
+                .offset(retention.max_events)
+                .limit(1)
+                .scalar()
+            )
+        if boundary is not None:
+            deleted += delete_matching(
+                ClipboardEvent.id <= boundary,
+                order_by=ClipboardEvent.id,
+            )
+
+    if retention.max_bytes is not None:
+        stored, current = _stored_bytes(session_factory)
+        # The current clipboard blob is never freed, so stop once it is all
+        # that is left even when it alone exceeds the limit.
+        while stored > max(retention.max_bytes, current):
+            removed, freed = delete_batch((), ClipboardEvent.id)
+            if not removed:
+                break
+            deleted += removed
+            stored -= freed
+
+    while True:
+        with write_lock:
+            if not incremental_vacuum(session_factory, pages=retention.vacuum_pages):
+                break
+
+    if deleted:
+        logger.info("Retention removed %d clipboard events", deleted)
+    return deleted
+
+
+def _stored_bytes(session_factory) -> tuple[int, int]:
+    """Return the size of all stored content and of the current clipboard blob."""
+
+    with session_scope(session_factory) as session:
+        stored = session.query(func.coalesce(func.sum(ClipboardBlob.size), 0)).scalar()
+        current = (
+            session.query(ClipboardBlob.size)
+            .join(ClipboardState, ClipboardState.content_hash == ClipboardBlob.hash)
+            .filter(ClipboardState.id == CLIPBOARD_STATE_ID)
+            .scalar()
+        )
+        return int(stored), int(current or 0)
+
+
+def _delete_batch(
+    session_factory,
+    write_lock: threading.Lock,
+    batch_size: int,
+    criteria: tuple[Any, ...],
+    *,
+    order_by: Any,
+    on_delete: DeleteListener | None,
+) -> tuple[int, int]:
+    """Delete one batch and return the events removed and content bytes freed."""
+
+    with write_lock:
+        with session_scope(session_factory) as session:
+            rows = (
+                session.query(ClipboardEvent.id, ClipboardEvent.content_hash)
+                .filter(*criteria)
+                .order_by(order_by)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return 0, 0
+            event_ids = [row.id for row in rows]
+            hashes = {row.content_hash for row in rows}
+            sizes = dict(
+                session.query(ClipboardBlob.hash, ClipboardBlob.size).filter(
+                    ClipboardBlob.hash.in_(hashes)
+                )
+            )
+            session.query(ClipboardEvent).filter(ClipboardEvent.id.in_(event_ids)).delete(
+                synchronize_session=False
+            )
+            freed = 0
+            if delete_unreferenced_blobs(session, hashes, keep_current=True):
+                kept = {
+                    blob_hash
+                    for (blob_hash,) in session.query(ClipboardBlob.hash).filter(
+                        ClipboardBlob.hash.in_(hashes)
+                    )
+                }
+                freed = sum(size for blob_hash, size in sizes.items() if blob_hash not in kept)
+        if on_delete is not None:
+            on_delete(event_ids)
+        return len(event_ids), freed
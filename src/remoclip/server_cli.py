@@ -1,32 +1,95 @@
 from __future__ import annotations
 
 import argparse
+import codecs
 import json
 import logging
-from typing import Any
+import selectors
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
 from datetime import datetime, timezone
-from werkzeug.serving import WSGIRequestHandler, make_server
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler, make_server
+from werkzeug.wsgi import ClosingIterator, LimitedStream, get_input_stream
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 
 from .config import (
     DEFAULT_CONFIG_PATH,
+    FEED_COMPLETE_HEADER,
     SECURITY_TOKEN_HEADER,
     RemoClipConfig,
+    ServerConfig,
     load_config,
 )
 from .clipboard import (
+    DEFAULT_HELPER_COMMAND,
     ClipboardBackend,
+    ClipboardFeed,
+    HelperClipboardBackend,
     PrivateClipboardBackend,
     SystemClipboardBackend,
+    TimeoutClipboardBackend,
     is_system_clipboard_available,
     warn_if_unavailable,
 )
-from .db import ClipboardEvent, create_session_factory, session_scope
+from .background import PeriodicTask
+from .compression import (
+    available_codecs,
+    compress,
+    is_codec_available,
+    iter_compressed,
+    open_decompressed,
+)
+from .db import (
+    ClipboardBlob,
+    ClipboardEvent,
+    EventRecord,
+    checkpoint_wal,
+    create_session_factory,
+    delete_unreferenced_blobs,
+    load_clipboard_state,
+    search_events,
+    session_scope,
+)
+from .eventlog import AsyncEventLog, EventLog, SynchronousEventLog
+from .history_cache import HistoryCache
+from .local_watch import LocalClipboardWatcher
+from .retention import enforce_retention
+
+# Idle ``/watch`` streams send a comment this often so proxies keep the
+# connection open and dropped clients are noticed.
+WATCH_HEARTBEAT_INTERVAL = 15.0
+
+# Rows fetched per transaction by ``/history/export``.
+EXPORT_BATCH_SIZE = 500
+
+# Actions ``/history`` can be filtered on; ``history`` events are never listed.
+HISTORY_FILTER_ACTIONS = ("copy", "paste")
+
+# Results returned by ``/history/search`` when the request sets no ``limit``.
+SEARCH_PAGE_SIZE = 20
+
+# Bodies of these types are clipboard content as-is rather than JSON.
+RAW_CONTENT_TYPES = ("text/plain", "application/octet-stream")
+# Bytes read from, or written to, the socket at a time for raw transfers.
+RAW_CHUNK_SIZE = 64 * 1024
 
 
 class LoggingWSGIRequestHandler(WSGIRequestHandler):
-    """WSGI request handler that forwards access logs to :mod:`logging`."""
+    """WSGI request handler that forwards access logs to :mod:`logging`.
+
+    Werkzeug closes the connection after every response. On a server with a
+    positive ``keep_alive_timeout`` this handler leaves HTTP/1.1 connections
+    open instead and, once no further request is waiting, hands them back to
+    the server with :attr:`keep_connection` set.
+    """
+
+    protocol_version = "HTTP/1.1"
 
     level_map = {
         "info": logging.INFO,
@@ -34,6 +97,11 @@ class LoggingWSGIRequestHandler(WSGIRequestHandler):
         "error": logging.ERROR,
     }
 
+    # Set when the server should keep the connection after this handler.
+    keep_connection = False
+    _requests_handled = 0
+    _keep_alive_response = False
+
     def log(self, type: str, message: str, *args: Any) -> None:  # pragma: no cover - IO heavy
         logger = logging.getLogger("werkzeug.server")
         level = self.level_map.get(type, logging.INFO)
@@ -51,54 +119,479 @@ class LoggingWSGIRequestHandler(WSGIRequestHandler):
     ) -> None:  # pragma: no cover - IO heavy
         super().log_request(code, size)
 
+    def setup(self) -> None:
+        super().setup()
+        if self.connection.family in (socket.AF_INET, socket.AF_INET6):
+            # Headers and body are separate writes. On a connection that
+            # stays open, Nagle's algorithm would hold the body back until
+            # the client's delayed ACK, adding ~40 ms to every response.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle_one_request(self) -> None:
+        if self._requests_handled:
+            # Only a ThreadPoolWSGIServer keeps connections open past a
+            # request; it waits for the next one without holding a worker.
+            if getattr(self.server, "keep_alive_timeout", 0) <= 0:
+                self.close_connection = True
+                return
+            if not self._request_waiting():
+                self.keep_connection = True
+                self.close_connection = True
+                return
+        super().handle_one_request()
+        self._requests_handled += 1
+
+    def _request_waiting(self) -> bool:
+        # A pipelined request may already sit in rfile's buffer, where the
+        # server's selector cannot see it, so it is served by this worker.
+        self.connection.settimeout(0.0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def run_wsgi(self) -> None:
+        content_length = self.headers.get("Content-Length", "0")
+        if (
+            self.close_connection
+            or self.request_version != "HTTP/1.1"
+            or getattr(self.server, "keep_alive_timeout", 0) <= 0
+            # A chunked request body cannot be skipped without decoding it.
+            or "chunked" in self.headers.get("Transfer-Encoding", "").lower()
+            or not content_length.isdigit()
+        ):
+            super().run_wsgi()
+            return
+        # Werkzeug reads the body from rfile and afterwards drains whatever
+        # else the client sent, which on a kept-alive connection would
+        # swallow the next request. Limiting rfile to this request's body
+        # leaves the next request unread.
+        rfile = self.rfile
+        self.rfile = body = LimitedStream(rfile, int(content_length))
+        self._keep_alive_response = True
+        try:
+            super().run_wsgi()
+            # Werkzeug's drain only sees bytes still in the socket; the
+            # rest of an unread body may already sit in rfile's buffer.
+            if not self.close_connection:
+                try:
+                    body.exhaust()
+                except ClientDisconnected:
+                    self.close_connection = True
+        finally:
+            self.rfile = rfile
+            self._keep_alive_response = False
+
+    def send_header(self, keyword: str, value: str) -> None:
+        # Werkzeug marks every response with "Connection: close".
+        if (
+            self._keep_alive_response
+            and keyword.lower() == "connection"
+            and value.lower() == "close"
+        ):
+            return
+        super().send_header(keyword, value)
+
+
+class ThreadPoolWSGIServer(BaseWSGIServer):
+    """WSGI server that hands requests to a bounded pool of worker threads.
+
+    At most ``max_workers`` requests run at once and at most ``queue_size``
+    accepted connections wait for a free worker. Once both are exhausted the
+    accept loop pauses, leaving further clients in the listen backlog.
+
+    Between requests, kept-alive connections wait in a selector on one
+    ``remoclip-keepalive`` thread rather than on a worker, and go back to
+    the pool once they become readable. Connections idle for longer than
+    ``keep_alive_timeout`` seconds are closed.
+    """
+
+    multithread = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        app: Flask,
+        *,
+        max_workers: int,
+        queue_size: int,
+        keep_alive_timeout: float = 0.0,
+        handler: type[WSGIRequestHandler] | None = None,
+    ) -> None:
+        self._executor: ThreadPoolExecutor | None = None
+        self.keep_alive_timeout = keep_alive_timeout
+        super().__init__(host, port, app, handler=handler)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="remoclip-worker"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._idle_lock = threading.Lock()
+        self._returned: list[tuple[socket.socket, Any]] = []
+        self._closing = False
+        self._idle_selector = selectors.DefaultSelector()
+        self._wakeup, self._wakeup_signal = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._idle_selector.register(self._wakeup, selectors.EVENT_READ)
+        self._keep_alive_thread: threading.Thread | None = None
+        if keep_alive_timeout > 0:
+            self._keep_alive_thread = threading.Thread(
+                target=self._watch_idle_connections, name="remoclip-keepalive", daemon=True
+            )
+            self._keep_alive_thread.start()
+
+    def finish_request(self, request: Any, client_address: Any) -> Any:
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        assert self._executor is not None
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._process_request_worker, request, client_address)
+        except BaseException:
+            self._slots.release()
+            self.shutdown_request(request)
+            raise
+
+    def _process_request_worker(self, request: Any, client_address: Any) -> None:
+        keep = False
+        try:
+            handler = self.finish_request(request, client_address)
+            keep = getattr(handler, "keep_connection", False)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            if keep:
+                self._return_idle(request, client_address)
+            else:
+                self.shutdown_request(request)
+            self._slots.release()
+
+    def _return_idle(self, connection: socket.socket, client_address: Any) -> None:
+        with self._idle_lock:
+            if not self._closing:
+                self._returned.append((connection, client_address))
+                self._wake()
+                return
+        self.shutdown_request(connection)
+
+    def _wake(self) -> None:
+        try:
+            self._wakeup_signal.send(b"\0")
+        except BlockingIOError:  # pragma: no cover - already awake
+            pass
 
-def serve(app: Flask, host: str, port: int) -> None:
-    """Run *app* on *host*:*port* with structured logging."""
+    def _watch_idle_connections(self) -> None:
+        selector = self._idle_selector
+        while True:
+            deadlines = [
+                key.data[1] for key in selector.get_map().values() if key.data is not None
+            ]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            ready = selector.select(timeout)
+            now = time.monotonic()
+            with self._idle_lock:
+                closing = self._closing
+                returned, self._returned = self._returned, []
+            for connection, client_address in returned:
+                selector.register(
+                    connection,
+                    selectors.EVENT_READ,
+                    (client_address, now + self.keep_alive_timeout),
+                )
+            for key, _ in ready:
+                if key.fileobj is self._wakeup:
+                    try:
+                        while self._wakeup.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                selector.unregister(key.fileobj)
+                connection = key.fileobj
+                if closing or not _peek_open(connection):
+                    self.shutdown_request(connection)
+                else:
+                    self.process_request(connection, key.data[0])
+            for key in list(selector.get_map().values()):
+                if key.data is not None and (closing or key.data[1] <= now):
+                    selector.unregister(key.fileobj)
+                    self.shutdown_request(key.fileobj)
+            if closing:
+                return
+
+    def server_close(self) -> None:
+        with self._idle_lock:
+            already_closing, self._closing = self._closing, True
+        if not already_closing:
+            # The keep-alive thread closes the idle connections and exits.
+            self._wake()
+            if self._keep_alive_thread is not None:
+                self._keep_alive_thread.join()
+            self._idle_selector.close()
+            self._wakeup.close()
+            self._wakeup_signal.close()
+        super().server_close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+def _peek_open(connection: socket.socket) -> bool:
+    """Return whether a readable idle *connection* carries data, not an end of stream."""
+
+    try:
+        return bool(connection.recv(1, socket.MSG_PEEK))
+    except OSError:
+        return False
+
+
+def create_server(app: Flask, server_config: ServerConfig) -> BaseWSGIServer:
+    """Build the WSGI server for *app* according to *server_config*."""
+
+    if server_config.concurrency == "single":
+        return make_server(
+            server_config.host,
+            server_config.port,
+            app,
+            request_handler=LoggingWSGIRequestHandler,
+        )
+    return ThreadPoolWSGIServer(
+        server_config.host,
+        server_config.port,
+        app,
+        max_workers=server_config.max_workers,
+        queue_size=server_config.queue_size,
+        keep_alive_timeout=server_config.keep_alive_timeout,
+        handler=LoggingWSGIRequestHandler,
+    )
+
+
+def serve(app: Flask, server_config: ServerConfig) -> None:
+    """Run *app* as configured by *server_config* with structured logging."""
 
     logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     logging.getLogger().setLevel(logging.INFO)
-    logging.info("Listening on http://%s:%s", host, port)
+    logging.info(
+        "Listening on http://%s:%s", server_config.host, server_config.port
+    )
+
+    server = create_server(app, server_config)
+    services = app.config.get("BACKGROUND_SERVICES", [])
+    for service in services:
+        service.start()
 
-    server = make_server(host, port, app, request_handler=LoggingWSGIRequestHandler)
+    def _terminate(signum: int, frame: Any) -> None:
+        logging.info("Received signal %d", signum)
+        # shutdown() waits for serve_forever() to return, which cannot happen
+        # while this handler runs on the thread serving requests.
+        threading.Thread(target=server.shutdown, daemon=True).start()
 
+    # SIGTERM, sent by systemd and docker, would otherwise end the process
+    # without running the cleanup below, losing queued events.
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread():
+        previous_handler = signal.signal(signal.SIGTERM, _terminate)
     try:
         server.serve_forever()
     except KeyboardInterrupt:  # pragma: no cover - manual interrupt
-        logging.info("Shutting down")
+        pass
     finally:
+        logging.info("Shutting down")
+        # Ends open /watch streams, which would otherwise keep their workers
+        # busy for as long as their clients stay connected.
+        app.config["CLIPBOARD_FEED"].close()
         server.server_close()
+        for service in reversed(services):
+            service.stop()
+        if previous_handler is not None:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+
+def _event_record_query(session: Any) -> Any:
+    """Query the columns of :class:`EventRecord`, in order."""
+
+    return session.query(
+        ClipboardEvent.id,
+        ClipboardEvent.timestamp,
+        ClipboardEvent.hostname,
+        ClipboardEvent.action,
+        ClipboardEvent.content_hash,
+        ClipboardBlob.content,
+    ).join(ClipboardBlob, ClipboardEvent.content_hash == ClipboardBlob.hash)
+
+
+def _event_summary_query(session: Any) -> Any:
+    """Query event metadata with the content size and preview, but no content."""
+
+    return session.query(
+        ClipboardEvent.id,
+        ClipboardEvent.timestamp,
+        ClipboardEvent.hostname,
+        ClipboardEvent.action,
+        ClipboardBlob.size,
+        ClipboardBlob.preview,
+    ).join(ClipboardBlob, ClipboardEvent.content_hash == ClipboardBlob.hash)
 
 
 def create_app(config: RemoClipConfig) -> Flask:
     app = Flask(__name__)
-    session_factory = create_session_factory(config.server.db_path)
+    storage = config.server.storage
+    session_factory = create_session_factory(
+        config.server.db_path, pragmas=storage.pragmas()
+    )
     app.config["SESSION_FACTORY"] = session_factory
 
     logger = logging.getLogger(__name__)
     allow_deletions = config.server.allow_deletions
+    # Serialises clipboard updates with their ``copy`` events so the newest
+    # logged copy always matches the backend, and keeps SQLite writers from
+    # contending for the database lock.
+    clipboard_lock = threading.Lock()
+    db_write_lock = threading.Lock()
 
-    def _seed_clipboard_value() -> str:
+    cache_config = config.server.history_cache
+    history_cache = HistoryCache(
+        entries=cache_config.entries,
+        lookup_entries=cache_config.lookup_entries,
+        max_bytes=cache_config.max_bytes,
+    )
+    if history_cache.enabled:
         with session_scope(session_factory) as session:
-            event = (
-                session.query(ClipboardEvent)
-                .filter(ClipboardEvent.action.in_(["copy", "paste"]))
-                .order_by(ClipboardEvent.timestamp.desc())
-                .first()
+            # Sizes come first, so startup reads no more content than the
+            # byte budget can hold, however large recent values are.
+            newest = (
+                session.query(ClipboardEvent.id, ClipboardBlob.size)
+                .join(ClipboardBlob, ClipboardEvent.content_hash == ClipboardBlob.hash)
+                .filter(ClipboardEvent.action != "history")
+                .order_by(ClipboardEvent.id.desc())
+                .limit(cache_config.entries)
+                .all()
+            )
+            budget = cache_config.max_bytes
+            warm_ids: list[int] = []
+            for event_id, size in newest:
+                budget -= size
+                if budget < 0:
+                    break
+                warm_ids.append(event_id)
+            records: list[EventRecord] = []
+            if warm_ids:
+                records = [
+                    EventRecord(*row)
+                    for row in _event_record_query(session)
+                    .filter(
+                        ClipboardEvent.action != "history",
+                        ClipboardEvent.id >= warm_ids[-1],
+                    )
+                    .order_by(ClipboardEvent.id.desc())
+                ]
+            history_cache.warm(
+                records,
+                exhaustive=len(warm_ids) == len(newest) < cache_config.entries,
             )
-            if event is not None:
-                return event.content
-        return ""
-
-    def _create_clipboard_backend() -> ClipboardBackend:
-        initial_value = _seed_clipboard_value()
-        if config.server.clipboard_backend == "system":
-            if is_system_clipboard_available():
-                return SystemClipboardBackend()
-            warn_if_unavailable(logger, "system")
-        return PrivateClipboardBackend(_value=initial_value)
-
-    clipboard_backend = _create_clipboard_backend()
+    app.config["HISTORY_CACHE"] = history_cache
+
+    event_log_config = config.server.event_log
+    event_log: EventLog
+    if event_log_config.mode == "async":
+        event_log = AsyncEventLog(
+            session_factory,
+            db_write_lock,
+            batch_size=event_log_config.batch_size,
+            flush_interval=event_log_config.flush_interval,
+            queue_size=event_log_config.queue_size,
+            on_commit=history_cache.add,
+        )
+    else:
+        event_log = SynchronousEventLog(
+            session_factory, db_write_lock, on_commit=history_cache.add
+        )
+    app.config["EVENT_LOG"] = event_log
+    # Objects with ``start()``/``stop()`` methods that ``serve`` runs alongside
+    # the HTTP server.
+    app.config["BACKGROUND_SERVICES"] = [event_log]
+    if storage.journal_mode == "wal" and storage.checkpoint_interval > 0:
+        app.config["BACKGROUND_SERVICES"].append(
+            PeriodicTask(
+                "remoclip-wal-checkpoint",
+                storage.checkpoint_interval,
+                lambda: checkpoint_wal(session_factory, size_limit=storage.wal_size_limit),
+            )
+        )
+    retention = config.server.retention
+    if retention.enabled:
+        app.config["BACKGROUND_SERVICES"].append(
+            PeriodicTask(
+                "remoclip-retention",
+                retention.interval,
+                lambda: enforce_retention(
+                    session_factory,
+                    db_write_lock,
+                    retention,
+                    on_delete=history_cache.discard,
+                ),
+            )
+        )
+
+    def _create_clipboard_backend(initial_value: str) -> ClipboardBackend:
+        backend: ClipboardBackend
+        if config.server.clipboard_backend == "helper":
+            backend = HelperClipboardBackend(
+                config.server.clipboard_helper or DEFAULT_HELPER_COMMAND
+            )
+        elif config.server.clipboard_backend == "system" and is_system_clipboard_available():
+            backend = SystemClipboardBackend()
+        else:
+            if config.server.clipboard_backend == "system":
+                warn_if_unavailable(logger, "system")
+            return PrivateClipboardBackend(_value=initial_value)
+        if not config.server.clipboard_timeout:
+            return backend
+        return TimeoutClipboardBackend(
+            backend, timeout=config.server.clipboard_timeout, fallback=initial_value
+        )
+
+    with session_scope(session_factory) as session:
+        initial_value, initial_version = load_clipboard_state(session)
+    clipboard_backend = _create_clipboard_backend(initial_value)
     app.config["CLIPBOARD_BACKEND"] = clipboard_backend
+    clipboard_feed = ClipboardFeed(initial_value, version=initial_version)
+    app.config["CLIPBOARD_FEED"] = clipboard_feed
+    watcher_slots = threading.BoundedSemaphore(max(config.server.max_watchers, 1))
+
+    local_hostname = socket.gethostname()
+
+    def _record_local_copy(content: str) -> None:
+        # Runs with clipboard_lock held, like the /copy handler.
+        _log_event(local_hostname, "copy", content)
+        clipboard_feed.publish(content)
+
+    local_watch = config.server.local_watch
+    local_watcher: LocalClipboardWatcher | None = None
+    if local_watch.enabled:
+        if isinstance(clipboard_backend, PrivateClipboardBackend):
+            logger.warning(
+                "local_watch is enabled but the private clipboard backend has no "
+                "local clipboard to watch"
+            )
+        else:
+            local_watcher = LocalClipboardWatcher(
+                clipboard_backend,
+                _record_local_copy,
+                clipboard_lock,
+                initial_value=initial_value,
+                min_interval=local_watch.min_interval,
+                max_interval=local_watch.max_interval,
+                cpu_budget=local_watch.cpu_budget,
+            )
+            app.config["BACKGROUND_SERVICES"].append(local_watcher)
+    # Without a watcher, copies made directly on this machine's clipboard
+    # never reach the feed.
+    feed_complete = local_watcher is not None or isinstance(
+        clipboard_backend, PrivateClipboardBackend
+    )
 
     def _format_timestamp(value: datetime) -> str:
         if value.tzinfo is None:
@@ -119,15 +612,79 @@ def create_app(config: RemoClipConfig) -> Flask:
     def _enforce_token() -> Any | None:
         return _verify_token()
 
-    def _log_event(hostname: str, action: str, content: str) -> None:
-        with session_scope(session_factory) as session:
-            session.add(
-                ClipboardEvent(
-                    hostname=hostname,
-                    action=action,
-                    content=content,
-                )
+    compression = config.server.compression
+    # Response encodings in order of preference; gzip is the fallback every
+    # client understands.
+    response_codecs: tuple[str, ...] = ()
+    if compression.enabled:
+        if not is_codec_available(compression.codec):
+            logger.warning(
+                "%s compression is unavailable; install the 'zstandard' package. "
+                "Falling back to gzip.",
+                compression.codec,
             )
+        response_codecs = tuple(
+            codec
+            for codec in dict.fromkeys((compression.codec, "gzip"))
+            if is_codec_available(codec)
+        )
+
+    @app.before_request
+    def _decode_request_body() -> Any | None:
+        encoding = request.headers.get("Content-Encoding", "").strip().lower()
+        if encoding in ("", "identity"):
+            return None
+        if not is_codec_available(encoding):
+            return jsonify({"error": f"unsupported content encoding: {encoding}"}), 415
+        # Swap in a stream that inflates the body as it is read, so views see
+        # plain JSON or text whatever the client sent.
+        environ = request.environ
+        environ["wsgi.input"] = open_decompressed(get_input_stream(environ), encoding)
+        environ["wsgi.input_terminated"] = True
+        environ.pop("CONTENT_LENGTH", None)
+        return None
+
+    # Advertised on every response (RFC 7694) so clients only compress
+    # request bodies with an encoding this server can decode.
+    request_codecs = ", ".join(available_codecs())
+
+    @app.after_request
+    def _compress_response(response: Response) -> Response:
+        response.headers.setdefault("Accept-Encoding", request_codecs)
+        if (
+            not response_codecs
+            or response.status_code in (204, 304)
+            or response.mimetype == "text/event-stream"
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        codec = next(
+            (codec for codec in response_codecs if request.accept_encodings[codec]), None
+        )
+        if codec is None:
+            return response
+        if response.is_streamed:
+            # Streamed bodies are assumed to be large unless they say otherwise.
+            length = response.content_length
+            if length is not None and length < compression.min_size:
+                return response
+            original = response.response
+            response.response = ClosingIterator(
+                iter_compressed(response.iter_encoded(), codec),
+                getattr(original, "close", None),
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < compression.min_size:
+                return response
+            response.set_data(compress(data, codec))
+        response.headers["Content-Encoding"] = codec
+        return response
+
+    def _log_event(hostname: str, action: str, content: str) -> None:
+        event_log.log(hostname, action, content)
 
     def _parse_optional_positive_int(value: Any, field: str) -> int | None:
         if value is None:
@@ -146,6 +703,63 @@ def create_app(config: RemoClipConfig) -> Flask:
             raise ValueError(f"{field} must be provided")
         return number
 
+    def _parse_optional_timestamp(value: Any, field: str) -> datetime | None:
+        if value is None:
+            return None
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be an ISO 8601 timestamp")
+        if value.endswith(("Z", "z")):
+            # Python 3.10's fromisoformat does not accept the UTC designator.
+            value = value[:-1] + "+00:00"
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError as exc:
+            raise ValueError(f"{field} must be an ISO 8601 timestamp") from exc
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        return parsed.astimezone(timezone.utc)
+
+    def _parse_history_filters(data: dict[str, Any]) -> dict[str, Any]:
+        """Return the history filters in *data*, keyed like the request."""
+
+        filters: dict[str, Any] = {}
+        from_hostname = data.get("from_hostname")
+        if from_hostname is not None:
+            if not isinstance(from_hostname, str) or not from_hostname:
+                raise ValueError("from_hostname must be a non-empty string")
+            filters["from_hostname"] = from_hostname
+        actions = data.get("actions")
+        if actions is not None:
+            if (
+                not isinstance(actions, list)
+                or not actions
+                or not all(action in HISTORY_FILTER_ACTIONS for action in actions)
+            ):
+                raise ValueError(
+                    "actions must be a non-empty list of: "
+                    + ", ".join(HISTORY_FILTER_ACTIONS)
+                )
+            filters["actions"] = sorted(set(actions))
+        for field in ("since", "until"):
+            value = _parse_optional_timestamp(data.get(field), field)
+            if value is not None:
+                filters[field] = value
+        if "since" in filters and "until" in filters and filters["since"] >= filters["until"]:
+            raise ValueError("since must be earlier than until")
+        return filters
+
+    def _history_filter_criteria(filters: dict[str, Any]) -> list[Any]:
+        criteria: list[Any] = []
+        if "from_hostname" in filters:
+            criteria.append(ClipboardEvent.hostname == filters["from_hostname"])
+        if "actions" in filters:
+            criteria.append(ClipboardEvent.action.in_(filters["actions"]))
+        if "since" in filters:
+            criteria.append(ClipboardEvent.timestamp >= filters["since"])
+        if "until" in filters:
+            criteria.append(ClipboardEvent.timestamp < filters["until"])
+        return criteria
+
     def _validate_payload(data: dict[str, Any], expect_content: bool) -> dict[str, Any]:
         if not data or "hostname" not in data:
             raise ValueError("JSON payload must include 'hostname'")
@@ -153,47 +767,139 @@ def create_app(config: RemoClipConfig) -> Flask:
             raise ValueError("JSON payload must include 'content'")
         return data
 
+    def _read_raw_body() -> str:
+        # Decode as the body arrives so only the text, not the request bytes
+        # as well, is held in full.
+        charset = request.mimetype_params.get("charset", "utf-8")
+        try:
+            decoder = codecs.getincrementaldecoder(charset)()
+        except LookupError as exc:
+            raise ValueError(f"unsupported charset: {charset}") from exc
+        parts: list[str] = []
+        try:
+            while True:
+                chunk = request.stream.read(RAW_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b"", final=True))
+        except UnicodeDecodeError as exc:
+            raise ValueError(f"request body is not valid {charset} text") from exc
+        return "".join(parts)
+
+    def _iter_raw_content(content: str) -> Iterator[bytes]:
+        for start in range(0, len(content), RAW_CHUNK_SIZE):
+            yield content[start : start + RAW_CHUNK_SIZE].encode("utf-8", "surrogatepass")
+
+    def _wants_raw_content() -> bool:
+        best = request.accept_mimetypes.best_match(("application/json", *RAW_CONTENT_TYPES))
+        return best in RAW_CONTENT_TYPES
+
     @app.post("/copy")
     def copy_content():
         try:
-            data = request.get_json(force=True, silent=False)
-            payload = _validate_payload(data, expect_content=True)
-            content = str(payload["content"])
-            clipboard_backend.copy(content)
-            _log_event(str(payload["hostname"]), "copy", content)
-            return jsonify({"status": "ok"})
+            if request.mimetype in RAW_CONTENT_TYPES:
+                payload = _validate_payload(request.args.to_dict(), expect_content=False)
+                content = _read_raw_body()
+            else:
+                data = request.get_json(force=True, silent=False)
+                payload = _validate_payload(data, expect_content=True)
+                content = str(payload["content"])
+            with clipboard_lock:
+                clipboard_backend.copy(content)
+                if local_watcher is not None:
+                    local_watcher.observe(content)
+                _log_event(str(payload["hostname"]), "copy", content)
+                version = clipboard_feed.publish(content)
+            return jsonify({"status": "ok", "version": version})
         except Exception as exc:  # pragma: no cover - defensive
             logging.exception("Failed to handle /copy request")
             return jsonify({"error": str(exc)}), 400
 
+    def _load_event(event_id: int) -> EventRecord | None:
+        record = history_cache.get(event_id)
+        if record is not None:
+            return record
+        return _fetch_event(event_id)
+
+    def _fetch_event(event_id: int) -> EventRecord | None:
+        generation = history_cache.generation
+        with session_scope(session_factory) as session:
+            row = (
+                _event_record_query(session)
+                .filter(ClipboardEvent.id == event_id)
+                .one_or_none()
+            )
+        if row is None:
+            return None
+        record = EventRecord(*row)
+        history_cache.remember(record, generation)
+        return record
+
+    def _not_modified(digest: str) -> Response:
+        # The client already holds this content, so nothing is transferred
+        # and no paste event is recorded.
+        response = Response(status=304)
+        response.set_etag(digest, weak=True)
+        return response
+
     @app.get("/paste")
     def paste_content():
         try:
-            data = request.get_json(silent=True) or {}
+            data = request.get_json(silent=True) or request.args.to_dict()
             payload = _validate_payload(data, expect_content=False)
             event_id = _parse_optional_positive_int(data.get("id"), "id")
 
             if event_id is not None:
-                with session_scope(session_factory) as session:
-                    event = (
-                        session.query(ClipboardEvent)
-                        .filter(
-                            ClipboardEvent.id == event_id,
-                            ClipboardEvent.action != "history",
+                record = history_cache.get(event_id)
+                if record is None and request.if_none_match:
+                    # The tag is the stored digest, so a conditional request
+                    # is answered before the content is loaded.
+                    with session_scope(session_factory) as session:
+                        stored = (
+                            session.query(ClipboardEvent.action, ClipboardEvent.content_hash)
+                            .filter(ClipboardEvent.id == event_id)
+                            .one_or_none()
                         )
-                        .one_or_none()
-                    )
-                    if event is None:
+                    if stored is None or stored.action == "history":
                         return jsonify({"error": "history entry not found"}), 404
-                    content = event.content
+                    if request.if_none_match.contains_weak(stored.content_hash):
+                        return _not_modified(stored.content_hash)
+                if record is None:
+                    record = _fetch_event(event_id)
+                if record is None or record.action == "history":
+                    return jsonify({"error": "history entry not found"}), 404
+                content, digest = record.content, record.content_hash
             else:
-                content = clipboard_backend.paste()
+                content, digest = clipboard_backend.snapshot()
+            if request.if_none_match.contains_weak(digest):
+                return _not_modified(digest)
             _log_event(str(payload["hostname"]), "paste", content)
-            return jsonify({"content": content})
+            if _wants_raw_content():
+                response = Response(_iter_raw_content(content), mimetype="text/plain")
+            else:
+                response = jsonify({"content": content})
+            # The tag names the content, not this encoding of it, so it is weak.
+            response.set_etag(digest, weak=True)
+            return response
         except Exception as exc:  # pragma: no cover - defensive
             logging.exception("Failed to handle /paste request")
             return jsonify({"error": str(exc)}), 400
 
+    def _format_history_row(row: Any, *, brief: bool) -> dict[str, Any]:
+        item = {
+            "id": row.id,
+            "timestamp": _format_timestamp(row.timestamp),
+            "hostname": row.hostname,
+            "action": row.action,
+        }
+        if brief:
+            item["size"] = row.size
+            item["preview"] = row.preview
+        else:
+            item["content"] = row.content
+        return item
+
     @app.get("/history")
     def history():
         try:
@@ -201,39 +907,72 @@ def create_app(config: RemoClipConfig) -> Flask:
             payload = _validate_payload(data, expect_content=False)
             limit = _parse_optional_positive_int(data.get("limit"), "limit")
             event_id = _parse_optional_positive_int(data.get("id"), "id")
+            before_id = _parse_optional_positive_int(data.get("before_id"), "before_id")
+            after_id = _parse_optional_positive_int(data.get("after_id"), "after_id")
+            if before_id is not None and after_id is not None:
+                raise ValueError("before_id and after_id cannot be combined")
+            if event_id is not None and (before_id is not None or after_id is not None):
+                raise ValueError("id cannot be combined with before_id or after_id")
+            brief = data.get("brief", False)
+            if not isinstance(brief, bool):
+                raise ValueError("brief must be a boolean")
+            filters = _parse_history_filters(data)
+            if event_id is not None and filters:
+                raise ValueError("id cannot be combined with history filters")
+            # Brief listings read only the blob summary columns, which is
+            # cheap enough that they bypass the history cache.
+            row_query = _event_summary_query if brief else _event_record_query
 
-            with session_scope(session_factory) as session:
-                if event_id is not None:
-                    event = session.get(ClipboardEvent, event_id)
-                    if event is None:
-                        return jsonify({"error": "history entry not found"}), 404
-                    events = [
-                        {
-                            "id": event.id,
-                            "timestamp": _format_timestamp(event.timestamp),
-                            "hostname": event.hostname,
-                            "action": event.action,
-                            "content": event.content,
-                        }
-                    ]
+            cursor: dict[str, int | None] = {}
+            rows: list[Any] | None
+            if event_id is not None:
+                if brief:
+                    with session_scope(session_factory) as session:
+                        row = (
+                            row_query(session)
+                            .filter(ClipboardEvent.id == event_id)
+                            .one_or_none()
+                        )
                 else:
-                    query = (
-                        session.query(ClipboardEvent)
-                        .filter(ClipboardEvent.action != "history")
-                        .order_by(ClipboardEvent.timestamp.desc())
+                    row = _load_event(event_id)
+                if row is None:
+                    return jsonify({"error": "history entry not found"}), 404
+                rows = [row]
+            else:
+                rows = None
+                if not brief and not filters:
+                    rows = history_cache.page(
+                        limit=limit, before_id=before_id, after_id=after_id
                     )
-                    if limit is not None:
-                        query = query.limit(limit)
-                    events = [
-                        {
-                            "id": item.id,
-                            "timestamp": _format_timestamp(item.timestamp),
-                            "hostname": item.hostname,
-                            "action": item.action,
-                            "content": item.content,
-                        }
-                        for item in query.all()
-                    ]
+                if rows is None:
+                    with session_scope(session_factory) as session:
+                        # Pages are keyed on the primary key so each one is a
+                        # range scan of the rowid index, however deep into
+                        # history it is.
+                        query = row_query(session).filter(
+                            ClipboardEvent.action != "history",
+                            *_history_filter_criteria(filters),
+                        )
+                        if after_id is not None:
+                            query = query.filter(ClipboardEvent.id > after_id).order_by(
+                                ClipboardEvent.id.asc()
+                            )
+                        else:
+                            if before_id is not None:
+                                query = query.filter(ClipboardEvent.id < before_id)
+                            query = query.order_by(ClipboardEvent.id.desc())
+                        if limit is not None:
+                            query = query.limit(limit)
+                        rows = query.all()
+                    if after_id is not None:
+                        rows.reverse()
+                if limit is not None:
+                    full_page = len(rows) == limit
+                    if after_id is not None:
+                        cursor["next_after_id"] = rows[0].id if full_page else None
+                    else:
+                        cursor["next_before_id"] = rows[-1].id if full_page else None
+            events = [_format_history_row(row, brief=brief) for row in rows]
             log_payload: dict[str, Any] = {
                 "event_ids": [item["id"] for item in events],
             }
@@ -241,16 +980,188 @@ def create_app(config: RemoClipConfig) -> Flask:
                 log_payload["limit"] = limit
             if event_id is not None:
                 log_payload["id"] = event_id
+            if before_id is not None:
+                log_payload["before_id"] = before_id
+            if after_id is not None:
+                log_payload["after_id"] = after_id
+            if brief:
+                log_payload["brief"] = True
+            for field, value in filters.items():
+                log_payload[field] = (
+                    _format_timestamp(value) if isinstance(value, datetime) else value
+                )
             _log_event(
                 str(payload["hostname"]),
                 "history",
                 json.dumps(log_payload),
             )
-            return jsonify({"history": events})
+            return jsonify({"history": events, **cursor})
         except Exception as exc:  # pragma: no cover - defensive
             logging.exception("Failed to handle /history request")
             return jsonify({"error": str(exc)}), 400
 
+    @app.get("/history/search")
+    def search_history():
+        try:
+            data = request.get_json(silent=True) or {}
+            payload = _validate_payload(data, expect_content=False)
+            query = data.get("query")
+            if not isinstance(query, str):
+                raise ValueError("JSON payload must include a 'query' string")
+            limit = _parse_optional_positive_int(data.get("limit"), "limit")
+            if limit is None:
+                limit = SEARCH_PAGE_SIZE
+            offset = data.get("offset", 0)
+            if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+                raise ValueError("offset must be a non-negative integer")
+            with session_scope(session_factory) as session:
+                rows = search_events(session, query, limit=limit, offset=offset)
+            events = [_format_history_row(row, brief=True) for row in rows]
+            _log_event(
+                str(payload["hostname"]),
+                "history",
+                json.dumps(
+                    {
+                        "search": query,
+                        "offset": offset,
+                        "event_ids": [item["id"] for item in events],
+                    }
+                ),
+            )
+            next_offset = offset + limit if len(events) == limit else None
+            return jsonify({"history": events, "next_offset": next_offset})
+        except Exception as exc:  # pragma: no cover - defensive
+            logging.exception("Failed to handle /history/search request")
+            return jsonify({"error": str(exc)}), 400
+
+    @app.get("/history/export")
+    def export_history():
+        try:
+            data = request.get_json(silent=True) or request.args.to_dict()
+            payload = _validate_payload(data, expect_content=False)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        hostname = str(payload["hostname"])
+
+        def _stream() -> Iterator[str]:
+            exported = 0
+            first_id: int | None = None
+            last_id = 0
+            try:
+                while True:
+                    # Each batch is its own short read transaction so a long
+                    # export never holds the database lock against writers.
+                    with session_scope(session_factory) as session:
+                        rows = (
+                            session.query(
+                                ClipboardEvent.id,
+                                ClipboardEvent.timestamp,
+                                ClipboardEvent.hostname,
+                                ClipboardEvent.action,
+                                ClipboardBlob.content,
+                            )
+                            .join(
+                                ClipboardBlob,
+                                ClipboardEvent.content_hash == ClipboardBlob.hash,
+                            )
+                            .filter(
+                                ClipboardEvent.action != "history",
+                                ClipboardEvent.id > last_id,
+                            )
+                            .order_by(ClipboardEvent.id.asc())
+                            .limit(EXPORT_BATCH_SIZE)
+                            .yield_per(EXPORT_BATCH_SIZE)
+                        )
+                        batch_size = 0
+                        for row in rows:
+                            batch_size += 1
+                            last_id = row.id
+                            if first_id is None:
+                                first_id = row.id
+                            yield json.dumps(
+                                {
+                                    "id": row.id,
+                                    "timestamp": _format_timestamp(row.timestamp),
+                                    "hostname": row.hostname,
+                                    "action": row.action,
+                                    "content": row.content,
+                                }
+                            ) + "\n"
+                            exported += 1
+                    if batch_size < EXPORT_BATCH_SIZE:
+                        break
+            finally:
+                log_payload: dict[str, Any] = {"export": True, "count": exported}
+                if first_id is not None:
+                    log_payload["first_id"] = first_id
+                    log_payload["last_id"] = last_id
+                _log_event(hostname, "history", json.dumps(log_payload))
+
+        return Response(_stream(), mimetype="application/x-ndjson")
+
+    def _format_watch_event(version: int, content: str) -> str:
+        data = json.dumps({"version": version, "content": content})
+        return f"id: {version}\nevent: clipboard\ndata: {data}\n\n"
+
+    @app.get("/watch")
+    def watch():
+        try:
+            data = request.get_json(silent=True) or request.args.to_dict()
+            _validate_payload(data, expect_content=False)
+            since_value = data.get("since", request.headers.get("Last-Event-ID"))
+            since: int | None = None
+            if since_value is not None:
+                try:
+                    since = int(since_value)
+                except (TypeError, ValueError) as exc:
+                    raise ValueError("since must be an integer") from exc
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        if config.server.concurrency != "threads" or config.server.max_watchers == 0:
+            return jsonify({"error": "watching is disabled"}), 503
+        if not watcher_slots.acquire(blocking=False):
+            return jsonify({"error": "too many watchers"}), 503
+
+        start = clipboard_feed.version if since is None else since
+
+        def _stream() -> Iterator[str]:
+            cursor = start
+            # Flush the headers right away so clients know the stream is live.
+            yield ": connected\n\n"
+            while True:
+                change = clipboard_feed.wait_for_change(
+                    cursor, timeout=WATCH_HEARTBEAT_INTERVAL
+                )
+                if clipboard_feed.closed:
+                    return
+                if change is None:
+                    yield ": keepalive\n\n"
+                    continue
+                cursor, content = change
+                yield _format_watch_event(cursor, content)
+
+        response = Response(
+            _stream(),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+                FEED_COMPLETE_HEADER: "1" if feed_complete else "0",
+            },
+        )
+        response.call_on_close(watcher_slots.release)
+        return response
+
+    @app.get("/stats")
+    def stats():
+        backend_stats = None
+        if isinstance(clipboard_backend, TimeoutClipboardBackend):
+            backend_stats = clipboard_backend.stats()
+        return jsonify(
+            {"history_cache": history_cache.stats(), "clipboard_backend": backend_stats}
+        )
+
     @app.delete("/history")
     def delete_history():
         try:
@@ -261,11 +1172,15 @@ def create_app(config: RemoClipConfig) -> Flask:
             if not allow_deletions:
                 return jsonify({"error": "history deletions are disabled"}), 403
 
-            with session_scope(session_factory) as session:
-                event = session.get(ClipboardEvent, event_id)
-                if event is None or event.action == "history":
-                    return jsonify({"error": "history entry not found"}), 404
-                session.delete(event)
+            with db_write_lock:
+                with session_scope(session_factory) as session:
+                    event = session.get(ClipboardEvent, event_id)
+                    if event is None or event.action == "history":
+                        return jsonify({"error": "history entry not found"}), 404
+                    session.delete(event)
+                    # Drop the content too unless another event still refers to it.
+                    delete_unreferenced_blobs(session, [event.content_hash])
+                history_cache.discard([event_id])
             return jsonify({"status": "deleted"})
         except ValueError as exc:
             return jsonify({"error": str(exc)}), 400
@@ -281,7 +1196,7 @@ def main() -> None:
         description="Run remoclip HTTP server.",
         epilog=(
             "Configure the clipboard backend in the YAML config file via the "
-            "'clipboard_backend' option (system|private)."
+            "'clipboard_backend' option (system|helper|private)."
         ),
     )
     parser.add_argument(
@@ -294,7 +1209,7 @@ def main() -> None:
     config = load_config(args.config)
     app = create_app(config)
 
-    serve(app, config.server.host, config.server.port)
+    serve(app, config.server)
 
 
 if __name__ == "__main__":  # pragma: no cover
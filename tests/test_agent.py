@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from remoclip import client_cli
+from remoclip.agent import AgentServer, ClipboardAgent, MemoryPasteCache
+from remoclip.client_cli import RemoClipClient
+from remoclip.config import (
+    FEED_COMPLETE_HEADER,
+    ClientConfig,
+    RemoClipConfig,
+    ServerConfig,
+)
+from remoclip.frames import COPY, PASTE, decode_text, encode_text
+from remoclip.server_cli import create_app, create_server
+
+
+class FeedClient:
+    """Client double whose feed delivers *changes* and then stays open."""
+
+    def __init__(self, changes: list[dict[str, Any]], complete: bool) -> None:
+        self.changes = changes
+        self.complete = complete
+        self.pastes = 0
+        self.copies: list[str] = []
+        self.version = 10
+        self.closed = threading.Event()
+
+    def watch(self, since: int | None = None, timeout: float = 60.0, *, on_connect=None) -> Iterator[dict[str, Any]]:
+        assert since == -1
+        on_connect({FEED_COMPLETE_HEADER: "1" if self.complete else "0"})
+        yield from self.changes
+        self.closed.wait()
+
+    def paste(self) -> str:
+        self.pastes += 1
+        return "from server"
+
+    def copy(self, content: str) -> dict[str, Any]:
+        self.copies.append(content)
+        self.version += 1
+        return {"status": "ok", "version": self.version}
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_agent_answers_pastes_from_a_complete_feed():
+    client = FeedClient([{"version": 4, "content": "fed"}], complete=True)
+    agent = ClipboardAgent(client)  # type: ignore[arg-type]
+    agent.start()
+    try:
+        _wait_for(lambda: agent._current is not None)
+        assert agent.paste() == "fed"
+        assert client.pastes == 0
+
+        agent.copy("copied")
+        assert client.copies == ["copied"]
+        assert agent.paste() == "copied"
+        assert client.pastes == 0
+    finally:
+        agent.stop()
+        client.closed.set()
+
+
+def test_agent_forwards_pastes_when_the_feed_misses_local_copies():
+    client = FeedClient([{"version": 4, "content": "fed"}], complete=False)
+    agent = ClipboardAgent(client)  # type: ignore[arg-type]
+    agent.start()
+    try:
+        time.sleep(0.05)
+        assert agent.paste() == "from server"
+        agent.copy("copied")
+        assert agent.paste() == "from server"
+        assert client.pastes == 2
+    finally:
+        agent.stop()
+        client.closed.set()
+
+
+def test_agent_serves_the_cli_over_its_socket(tmp_path, monkeypatch):
+    for name in client_cli._PROXY_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    server_config = ServerConfig(
+        host="127.0.0.1",
+        port=0,
+        db=tmp_path / "db.sqlite",
+        clipboard_backend="private",
+        max_workers=4,
+    )
+    config = RemoClipConfig(
+        security_token=None,
+        server=server_config,
+        client=ClientConfig(url="http://unused"),
+    )
+    app = create_app(config)
+    http_server = create_server(app, server_config)
+    http_thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    http_thread.start()
+    socket_path = tmp_path / "agent.sock"
+    config = RemoClipConfig(
+        security_token=None,
+        server=server_config,
+        client=ClientConfig(
+            url=f"http://127.0.0.1:{http_server.port}", agent_socket=socket_path
+        ),
+    )
+    client = RemoClipClient(config, paste_cache=MemoryPasteCache())
+    agent = ClipboardAgent(client)
+    agent_server = AgentServer(socket_path, agent)
+    agent_thread = threading.Thread(target=agent_server.serve_forever, daemon=True)
+    agent_thread.start()
+    agent.start()
+    try:
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+        assert client_cli._ask_agent(socket_path, COPY, encode_text("via agent")) == b""
+        assert RemoClipClient(config).paste() == "via agent"
+        assert decode_text(client_cli._ask_agent(socket_path, PASTE)) == "via agent"
+
+        _wait_for(lambda: agent._current is not None)
+        monkeypatch.setattr(client, "paste", lambda: pytest.fail("paste reached the server"))
+        RemoClipClient(config).copy("direct")
+        _wait_for(lambda: agent.paste() == "direct")
+        assert decode_text(client_cli._ask_agent(socket_path, PASTE)) == "direct"
+
+        with pytest.raises(ValueError, match="already listening"):
+            AgentServer(socket_path, agent)
+    finally:
+        agent.stop()
+        agent_server.shutdown()
+        agent_server.server_close()
+        client.close()
+        app.config["CLIPBOARD_FEED"].close()
+        http_server.shutdown()
+        http_server.server_close()
+        http_thread.join(timeout=5)
+
+
+def test_stale_agent_socket_is_replaced(tmp_path):
+    socket_path = tmp_path / "agent.sock"
+    first = AgentServer(socket_path, ClipboardAgent(FeedClient([], complete=True)))  # type: ignore[arg-type]
+    first.server_close()
+    assert socket_path.exists()
+
+    second = AgentServer(socket_path, ClipboardAgent(FeedClient([], complete=True)))  # type: ignore[arg-type]
+    second.server_close()
+
+
+def test_cli_falls_back_to_the_server_without_an_agent(tmp_path):
+    assert client_cli._ask_agent(None, PASTE) is None
+    assert client_cli._ask_agent(tmp_path / "missing.sock", PASTE) is None
+    Path(tmp_path / "not-a-socket").write_text("")
+    assert client_cli._ask_agent(tmp_path / "not-a-socket", PASTE) is None
@@ -0,0 +1,33 @@
+import threading
+
+from remoclip.background import PeriodicTask
+
+
+def test_periodic_task_runs_until_stopped():
+    ran = threading.Event()
+    calls = []
+
+    def action():
+        calls.append(1)
+        ran.set()
+
+    task = PeriodicTask("test-task", 0.01, action)
+    task.start()
+    assert ran.wait(1)
+    task.stop()
+    count = len(calls)
+
+    assert not any(thread.name == "test-task" for thread in threading.enumerate())
+    assert len(calls) == count
+
+
+def test_periodic_task_survives_failures_and_skips_disabled_interval():
+    def action():
+        raise RuntimeError("boom")
+
+    task = PeriodicTask("failing-task", 0, action)
+    task.run_once()
+    task.start()
+
+    assert not any(thread.name == "failing-task" for thread in threading.enumerate())
+    task.stop()
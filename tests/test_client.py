@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import io
+import json
+import os
 import sys
 from pathlib import Path
 from typing import Any
@@ -14,6 +16,7 @@ import remoclip.config as config_module
 import remoclip.client_cli as client_cli
 
 from remoclip.client_cli import RemoClipClient
+from remoclip.compression import compress, decompress
 
 ClientConfig = config_module.ClientConfig
 RemoClipConfig = config_module.RemoClipConfig
@@ -22,9 +25,24 @@ SECURITY_TOKEN_HEADER = getattr(config_module, "SECURITY_TOKEN_HEADER", None)
 assert SECURITY_TOKEN_HEADER is not None
 
 
+# Returned by a patched load_config in CLI tests, which replace the client.
+CLI_CONFIG = RemoClipConfig(
+    security_token=None,
+    server=ServerConfig(host="example.com", port=1234, db=Path("/tmp/db.sqlite")),
+    client=ClientConfig(url="http://example.com:1234"),
+)
+
+
+@pytest.fixture(autouse=True)
+def no_proxy_environment(monkeypatch):
+    for name in client_cli._PROXY_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+
+
 class DummyResponse:
-    def __init__(self, payload: dict[str, Any]):
+    def __init__(self, payload: dict[str, Any], headers: dict[str, str] | None = None):
         self._payload = payload
+        self.headers = headers or {}
 
     def raise_for_status(self) -> None:
         return None
@@ -77,7 +95,7 @@ class RecordingSession:
 
 def test_client_includes_security_token(monkeypatch):
     session = RecordingSession()
-    monkeypatch.setattr("remoclip.client_cli.RequestsSession", lambda: session)
+    monkeypatch.setattr("remoclip.client_cli.HTTPSession", lambda: session)
 
     config = RemoClipConfig(
         security_token="secret",
@@ -116,7 +134,7 @@ def test_client_includes_security_token(monkeypatch):
 
 def test_client_without_token_uses_empty_headers(monkeypatch):
     session = RecordingSession()
-    monkeypatch.setattr("remoclip.client_cli.RequestsSession", lambda: session)
+    monkeypatch.setattr("remoclip.client_cli.HTTPSession", lambda: session)
 
     config = RemoClipConfig(
         security_token=None,
@@ -135,7 +153,7 @@ def test_client_without_token_uses_empty_headers(monkeypatch):
 
 def test_client_uses_configured_url(monkeypatch):
     session = RecordingSession()
-    monkeypatch.setattr("remoclip.client_cli.RequestsSession", lambda: session)
+    monkeypatch.setattr("remoclip.client_cli._create_requests_session", lambda: session)
 
     config = RemoClipConfig(
         security_token=None,
@@ -167,7 +185,7 @@ def test_client_prefers_unix_socket_when_configured(monkeypatch, tmp_path):
 
     monkeypatch.setattr("remoclip.client_cli.UnixSocketSession", fake_unix_session)
     monkeypatch.setattr(
-        "remoclip.client_cli.RequestsSession",
+        "remoclip.client_cli.HTTPSession",
         lambda: (_ for _ in ()).throw(AssertionError("HTTP session should not be created")),
     )
 
@@ -191,10 +209,71 @@ def test_client_prefers_unix_socket_when_configured(monkeypatch, tmp_path):
     assert captured_path["path"] == socket_path
 
 
+def test_plain_http_uses_requests_only_behind_a_proxy(monkeypatch):
+    session = RecordingSession()
+    monkeypatch.setattr("remoclip.client_cli._create_requests_session", lambda: session)
+    config = RemoClipConfig(
+        security_token=None,
+        server=ServerConfig(host="example.com", port=1234, db=Path("/tmp/db.sqlite")),
+        client=ClientConfig(url="http://example.com:1234"),
+    )
+
+    assert isinstance(RemoClipClient(config)._session, client_cli.HTTPSession)
+
+    monkeypatch.setenv("HTTP_PROXY", "http://proxy.example.com:3128")
+    assert RemoClipClient(config)._session is session
+
+
+# Generous enough for a slow machine; importing requests and yaml on the
+# copy/paste path alone used to take about as long again.
+IMPORT_BUDGET_SECONDS = 0.15
+
+_STARTUP_SCRIPT = """
+import sys
+
+from remoclip.client_cli import RemoClipClient
+from remoclip.config import load_config
+
+RemoClipClient(load_config(sys.argv[1]))
+print(" ".join(sorted(sys.modules)))
+"""
+
+
+def test_client_startup_avoids_heavy_imports(tmp_path):
+    import subprocess
+
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in client_cli._PROXY_VARIABLES
+    }
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(Path(client_cli.__file__).parents[1]), env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPT, str(tmp_path / "missing.yaml")],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    loaded = {name.split(".")[0] for name in result.stdout.split()}
+    assert not loaded & {"requests", "urllib3", "yaml", "idna", "charset_normalizer"}
+
+    # -X importtime reports "self | cumulative | name" in microseconds.
+    cumulative = {
+        fields[2].strip(): int(fields[1])
+        for fields in (line.split("|") for line in result.stderr.splitlines())
+        if len(fields) == 3 and fields[1].strip().isdigit()
+    }
+    assert cumulative["remoclip.client_cli"] / 1e6 < IMPORT_BUDGET_SECONDS
+
+
 def test_copy_command_preserves_newlines_by_default(monkeypatch, capsys):
     recorded: dict[str, Any] = {}
 
-    monkeypatch.setattr(client_cli, "load_config", lambda path: object())
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
 
     class DummyClient:
         def __init__(self, config: Any) -> None:
@@ -218,7 +297,7 @@ def test_copy_command_preserves_newlines_by_default(monkeypatch, capsys):
 def test_copy_command_strips_newlines_when_requested(monkeypatch, capsys):
     recorded: dict[str, Any] = {}
 
-    monkeypatch.setattr(client_cli, "load_config", lambda path: object())
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
 
     class DummyClient:
         def __init__(self, config: Any) -> None:
@@ -240,7 +319,7 @@ def test_copy_command_strips_newlines_when_requested(monkeypatch, capsys):
 
 
 def test_strip_option_rejected_for_non_copy_commands(monkeypatch, capsys):
-    monkeypatch.setattr(client_cli, "load_config", lambda path: object())
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
 
     class DummyClient:
         def __init__(self, config: Any) -> None:
@@ -255,3 +334,441 @@ def test_strip_option_rejected_for_non_copy_commands(monkeypatch, capsys):
     assert excinfo.value.code == 2
     captured = capsys.readouterr()
     assert "--strip can only be used with the copy command" in captured.err
+
+
+def test_iter_sse_events_parses_fields_and_skips_comments():
+    lines = [
+        ": keepalive",
+        "",
+        "id: 3",
+        "event: clipboard",
+        'data: {"version": 3,',
+        'data:  "content": "x"}',
+        "",
+        "data: plain",
+        "",
+    ]
+
+    events = list(client_cli._iter_sse_events(lines))
+
+    assert events == [
+        ("clipboard", '{"version": 3,\n "content": "x"}'),
+        ("message", "plain"),
+    ]
+
+
+def test_client_watch_yields_clipboard_events(monkeypatch):
+    class StreamingResponse:
+        closed = False
+
+        def raise_for_status(self) -> None:
+            return None
+
+        def iter_lines(self, decode_unicode: bool = False):
+            yield "event: clipboard"
+            yield 'data: {"version": 4, "content": "hi"}'
+            yield ""
+
+        def close(self) -> None:
+            StreamingResponse.closed = True
+
+    recorded: dict[str, Any] = {}
+
+    class StreamingSession:
+        def get(self, url: str, **kwargs: Any) -> StreamingResponse:
+            recorded["url"] = url
+            recorded.update(kwargs)
+            return StreamingResponse()
+
+    monkeypatch.setattr("remoclip.client_cli.HTTPSession", StreamingSession)
+    config = RemoClipConfig(
+        security_token=None,
+        server=ServerConfig(host="example.com", port=1234, db=Path("/tmp/db.sqlite")),
+        client=ClientConfig(url="http://example.com:1234"),
+    )
+
+    changes = list(RemoClipClient(config).watch(since=3))
+
+    assert changes == [{"version": 4, "content": "hi"}]
+    assert recorded["url"] == "http://example.com:1234/watch"
+    assert recorded["json"]["since"] == 3
+    assert recorded["stream"] is True
+    assert StreamingResponse.closed is True
+
+
+def test_history_all_pages_lazily_and_matches_json_layout(monkeypatch, capsys):
+    pages = {
+        None: {"history": [{"id": 3}, {"id": 2}], "next_before_id": 2},
+        2: {"history": [{"id": 1}], "next_before_id": None},
+    }
+    requested: list[int | None] = []
+
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+
+    class DummyClient(RemoClipClient):
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def history(
+            self, limit=None, event_id=None, timeout=5.0, *, before_id=None, after_id=None, brief=False
+        ):
+            assert limit == client_cli.HISTORY_PAGE_SIZE
+            assert brief is False
+            requested.append(before_id)
+            return pages[before_id]
+
+    monkeypatch.setattr(client_cli, "RemoClipClient", DummyClient)
+    monkeypatch.setattr(client_cli.sys, "argv", ["remoclip", "history", "--all"])
+
+    client_cli.main()
+
+    captured = capsys.readouterr()
+    expected = {"history": [{"id": 3}, {"id": 2}, {"id": 1}]}
+    assert captured.out == json.dumps(expected, indent=2) + "\n"
+    assert requested == [None, 2]
+
+
+def test_history_all_rejects_limit(monkeypatch, capsys):
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+    monkeypatch.setattr(client_cli, "RemoClipClient", lambda config: object())
+    monkeypatch.setattr(
+        client_cli.sys, "argv", ["remoclip", "history", "--all", "--limit", "3"]
+    )
+
+    with pytest.raises(SystemExit) as excinfo:
+        client_cli.main()
+
+    assert excinfo.value.code == 2
+    assert "--all cannot be combined" in capsys.readouterr().err
+
+
+def test_history_brief_requests_summaries(monkeypatch, capsys):
+    recorded: dict[str, Any] = {}
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+
+    class DummyClient:
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def history(self, **kwargs: Any) -> dict[str, Any]:
+            recorded.update(kwargs)
+            return {"history": [{"id": 1, "size": 3, "preview": "abc"}]}
+
+    monkeypatch.setattr(client_cli, "RemoClipClient", DummyClient)
+    monkeypatch.setattr(
+        client_cli.sys, "argv", ["remoclip", "history", "--brief", "--limit", "5"]
+    )
+
+    client_cli.main()
+
+    assert recorded["brief"] is True
+    assert recorded["limit"] == 5
+    assert json.loads(capsys.readouterr().out)["history"][0]["preview"] == "abc"
+
+
+def test_history_filters_are_sent_with_every_page(monkeypatch, capsys):
+    requests_made: list[dict[str, Any]] = []
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+
+    class DummyClient(RemoClipClient):
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def history(self, **kwargs: Any) -> dict[str, Any]:
+            requests_made.append(kwargs)
+            if kwargs["before_id"] is None:
+                return {"history": [{"id": 5}], "next_before_id": 5}
+            return {"history": [], "next_before_id": None}
+
+    monkeypatch.setattr(client_cli, "RemoClipClient", DummyClient)
+    monkeypatch.setattr(
+        client_cli.sys,
+        "argv",
+        [
+            "remoclip",
+            "history",
+            "--all",
+            "--from-host",
+            "buildhost-3",
+            "--action",
+            "copy",
+            "--since",
+            "2025-01-15",
+        ],
+    )
+
+    client_cli.main()
+
+    assert [request["before_id"] for request in requests_made] == [None, 5]
+    for request in requests_made:
+        assert request["from_hostname"] == "buildhost-3"
+        assert request["actions"] == ["copy"]
+        assert request["since"] == "2025-01-15"
+        assert "until" not in request
+    assert json.loads(capsys.readouterr().out) == {"history": [{"id": 5}]}
+
+
+def test_history_brief_rejects_export(monkeypatch, capsys):
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+    monkeypatch.setattr(client_cli, "RemoClipClient", lambda config: object())
+    monkeypatch.setattr(
+        client_cli.sys, "argv", ["remoclip", "history", "--export", "--brief"]
+    )
+
+    with pytest.raises(SystemExit) as excinfo:
+        client_cli.main()
+
+    assert excinfo.value.code == 2
+    assert "--export cannot be combined" in capsys.readouterr().err
+
+
+def test_search_command_joins_terms(monkeypatch, capsys):
+    recorded: dict[str, Any] = {}
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+
+    class DummyClient:
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def search(self, query: str, limit=None, offset=0) -> dict[str, Any]:
+            recorded.update(query=query, limit=limit, offset=offset)
+            return {"history": [{"id": 4}], "next_offset": None}
+
+    monkeypatch.setattr(client_cli, "RemoClipClient", DummyClient)
+    monkeypatch.setattr(
+        client_cli.sys,
+        "argv",
+        ["remoclip", "search", "deploy", "key", "--limit", "5", "--offset", "10"],
+    )
+
+    client_cli.main()
+
+    assert recorded == {"query": "deploy key", "limit": 5, "offset": 10}
+    assert json.loads(capsys.readouterr().out)["history"] == [{"id": 4}]
+
+
+def test_search_terms_are_rejected_for_other_commands(monkeypatch, capsys):
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+    monkeypatch.setattr(client_cli, "RemoClipClient", lambda config: object())
+    monkeypatch.setattr(client_cli.sys, "argv", ["remoclip", "history", "deploy"])
+
+    with pytest.raises(SystemExit) as excinfo:
+        client_cli.main()
+
+    assert excinfo.value.code == 2
+    assert "search terms can only be used" in capsys.readouterr().err
+
+
+def test_history_export_writes_raw_stream(monkeypatch, capsysbinary):
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+
+    class DummyClient:
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def export_history(self):
+            yield b'{"id": 1}\n{"id"'
+            yield b': 2}\n'
+
+    monkeypatch.setattr(client_cli, "RemoClipClient", DummyClient)
+    monkeypatch.setattr(client_cli.sys, "argv", ["remoclip", "history", "--export"])
+
+    client_cli.main()
+
+    assert capsysbinary.readouterr().out == b'{"id": 1}\n{"id": 2}\n'
+
+
+def test_raw_copy_streams_stdin_and_strips_trailing_newlines(monkeypatch, capsysbinary):
+    recorded: dict[str, Any] = {}
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+    monkeypatch.setattr(client_cli, "RAW_CHUNK_SIZE", 4)
+
+    class DummyClient:
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def copy_stream(self, chunks):
+            recorded["chunks"] = list(chunks)
+
+    monkeypatch.setattr(client_cli, "RemoClipClient", DummyClient)
+    monkeypatch.setattr(
+        client_cli.sys, "stdin", io.TextIOWrapper(io.BytesIO(b"ab\n\n\ncd\n\n"))
+    )
+    monkeypatch.setattr(client_cli.sys, "argv", ["remoclip", "copy", "--raw", "--strip"])
+
+    client_cli.main()
+
+    assert b"".join(recorded["chunks"]) == b"ab\n\n\ncd"
+    assert max(len(chunk) for chunk in recorded["chunks"]) <= 7
+    assert capsysbinary.readouterr().out == b"ab\n\n\ncd"
+
+
+def test_raw_paste_writes_chunks(monkeypatch, capsysbinary):
+    monkeypatch.setattr(client_cli, "load_config", lambda path: CLI_CONFIG)
+
+    class DummyClient:
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def paste_stream(self, event_id=None):
+            assert event_id == 3
+            yield b"caf\xc3"
+            yield b"\xa9\n"
+
+    monkeypatch.setattr(client_cli, "RemoClipClient", DummyClient)
+    monkeypatch.setattr(client_cli.sys, "argv", ["remoclip", "paste", "--raw", "--id", "3"])
+
+    client_cli.main()
+
+    assert capsysbinary.readouterr().out == "café\n".encode("utf-8")
+
+
+def test_client_copy_stream_sends_raw_body(monkeypatch):
+    calls: list[dict[str, Any]] = []
+
+    class StreamingSession:
+        def post(self, url, *, data, headers, timeout):
+            calls.append({"url": url, "body": b"".join(data), "headers": headers})
+            return DummyResponse({"status": "ok"})
+
+    monkeypatch.setattr(client_cli, "HTTPSession", StreamingSession)
+    monkeypatch.setattr(client_cli.socket, "gethostname", lambda: "my host")
+    config = RemoClipConfig(
+        security_token=None,
+        server=ServerConfig(host="127.0.0.1", port=5000, db=Path("/tmp/db")),
+        client=ClientConfig(url="http://127.0.0.1:5000"),
+    )
+
+    client = RemoClipClient(config)
+    client.copy_stream(iter([b"one ", b"two"]))
+    # Compressed once the server has said it can decode gzip.
+    client._server_codecs = ("gzip",)
+    client.copy_stream(iter([b"one ", b"two"]))
+
+    assert calls == [
+        {
+            "url": "http://127.0.0.1:5000/copy?hostname=my+host",
+            "body": b"one two",
+            "headers": {"Content-Type": "text/plain; charset=utf-8"},
+        },
+        {
+            "url": "http://127.0.0.1:5000/copy?hostname=my+host",
+            "body": compress(b"one two", "gzip"),
+            "headers": {
+                "Content-Type": "text/plain; charset=utf-8",
+                "Content-Encoding": "gzip",
+            },
+        },
+    ]
+
+
+def test_client_compresses_large_copies_only(monkeypatch):
+    session = RecordingSession()
+    posted: list[dict[str, Any]] = []
+
+    def post(url, *, json=None, data=None, headers=None, timeout=0):
+        posted.append({"json": json, "data": data, "headers": headers})
+        return DummyResponse({"status": "ok"})
+
+    session.post = post  # type: ignore[method-assign]
+    monkeypatch.setattr(client_cli, "HTTPSession", lambda: session)
+    config = RemoClipConfig(
+        security_token=None,
+        server=ServerConfig(host="127.0.0.1", port=5000, db=Path("/tmp/db")),
+        client=ClientConfig(
+            url="http://127.0.0.1:5000",
+            compression=config_module.CompressionConfig(codec="gzip", min_size=100),
+        ),
+    )
+    client = RemoClipClient(config)
+
+    client.copy("short")
+    client.copy("x" * 5000)
+
+    assert posted[0]["json"]["content"] == "short"
+    assert posted[0]["data"] is None
+    assert posted[1]["json"] is None
+    assert posted[1]["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(decompress(posted[1]["data"], "gzip"))["content"] == "x" * 5000
+    assert len(posted[1]["data"]) < 200
+
+
+@pytest.mark.parametrize(
+    ("status", "rejection_headers", "learned"),
+    [
+        (400, {}, ()),
+        (415, {"Accept-Encoding": "gzip"}, ("gzip",)),
+    ],
+)
+def test_client_resends_copies_the_server_cannot_decode(
+    monkeypatch, status, rejection_headers, learned
+):
+    import requests
+
+    posted: list[dict[str, Any]] = []
+
+    class RejectingSession(RecordingSession):
+        def post(self, url, *, json=None, data=None, headers=None, timeout=0):
+            posted.append({"json": json, "headers": headers})
+            if headers.get("Content-Encoding") not in (None, *learned):
+                response = requests.Response()
+                response.status_code = status
+                response.headers.update(rejection_headers)
+                raise requests.HTTPError(f"{status}", response=response)
+            return DummyResponse({"status": "ok"})
+
+    monkeypatch.setattr(client_cli, "HTTPSession", RejectingSession)
+    config = RemoClipConfig(
+        security_token=None,
+        server=ServerConfig(host="127.0.0.1", port=5000, db=Path("/tmp/db")),
+        client=ClientConfig(
+            url="http://127.0.0.1:5000",
+            compression=config_module.CompressionConfig(codec="zstd", min_size=100),
+        ),
+    )
+    monkeypatch.setattr(client_cli, "is_codec_available", lambda codec: True)
+    monkeypatch.setattr(client_cli, "compress", lambda data, codec: data)
+    client = RemoClipClient(config)
+
+    assert client.copy("x" * 5000) == {"status": "ok"}
+    assert posted[0]["headers"]["Content-Encoding"] == "zstd"
+    assert posted[1]["json"]["content"] == "x" * 5000
+    assert client._server_codecs == learned
+
+    client.copy("y" * 5000)
+    expected = "gzip" if learned else None
+    assert posted[2]["headers"].get("Content-Encoding") == expected
+    assert len(posted) == 3
+
+
+def test_paste_cache_reuses_unchanged_content(monkeypatch, tmp_path):
+    cache_path = tmp_path / "cache" / "paste"
+    requests_seen: list[dict[str, str]] = []
+
+    class ConditionalResponse(DummyResponse):
+        def __init__(self, status_code: int, payload: dict[str, Any]):
+            super().__init__(payload)
+            self.status_code = status_code
+            self.headers = {"ETag": 'W/"abc"'}
+
+    class ConditionalSession:
+        def get(self, url, json, headers=None, timeout=0):
+            requests_seen.append(dict(headers or {}))
+            if (headers or {}).get("If-None-Match") == 'W/"abc"':
+                return ConditionalResponse(304, {})
+            return ConditionalResponse(200, {"content": "large value"})
+
+    monkeypatch.setattr(client_cli, "HTTPSession", ConditionalSession)
+    config = RemoClipConfig(
+        security_token=None,
+        server=ServerConfig(host="127.0.0.1", port=5000, db=Path("/tmp/db")),
+        client=ClientConfig(url="http://127.0.0.1:5000", paste_cache=cache_path),
+    )
+    client = RemoClipClient(config)
+
+    assert client.paste() == "large value"
+    assert cache_path.stat().st_mode & 0o777 == 0o600
+    assert client.paste() == "large value"
+    assert client.paste(event_id=4) == "large value"
+
+    assert [seen.get("If-None-Match") for seen in requests_seen] == [None, 'W/"abc"', None]
@@ -0,0 +1,250 @@
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+import pytest
+
+from remoclip import clipboard, clipboard_helper
+from remoclip.clipboard import (
+    HelperClipboardBackend,
+    PrivateClipboardBackend,
+    SystemClipboardBackend,
+    TimeoutClipboardBackend,
+)
+from remoclip.digest import content_digest
+
+
+def test_private_backend_snapshot_tracks_copies():
+    backend = PrivateClipboardBackend(_value="seed")
+
+    assert backend.snapshot() == ("seed", content_digest("seed"))
+    backend.copy("next")
+    assert backend.snapshot() == ("next", content_digest("next"))
+
+
+def test_system_backend_snapshot_follows_external_changes(monkeypatch):
+    class FakePyperclip:
+        value = "one"
+
+        @classmethod
+        def copy(cls, text):
+            cls.value = text
+
+        @classmethod
+        def paste(cls):
+            return cls.value
+
+    monkeypatch.setattr(clipboard, "pyperclip", FakePyperclip)
+    backend = SystemClipboardBackend()
+
+    assert backend.snapshot() == ("one", content_digest("one"))
+    FakePyperclip.value = "changed elsewhere"
+    assert backend.snapshot() == ("changed elsewhere", content_digest("changed elsewhere"))
+    backend.copy("two")
+    assert backend.snapshot()[1] == content_digest("two")
+
+
+class _SlowBackend:
+    def __init__(self) -> None:
+        self.value = "system"
+        self.release = threading.Event()
+        self.release.set()
+        self.copies: list[str] = []
+
+    def copy(self, text: str) -> None:
+        self.release.wait()
+        self.copies.append(text)
+        self.value = text
+
+    def paste(self) -> str:
+        self.release.wait()
+        return self.value
+
+    def snapshot(self) -> tuple[str, str]:
+        value = self.paste()
+        return value, content_digest(value)
+
+
+def test_timeout_backend_passes_calls_through():
+    inner = _SlowBackend()
+    backend = TimeoutClipboardBackend(inner, timeout=1.0, fallback="seed")
+
+    assert backend.paste() == "system"
+    backend.copy("next")
+    assert backend.snapshot() == ("next", content_digest("next"))
+
+    stats = backend.stats()
+    assert stats["copy"]["calls"] == 1
+    assert stats["paste"]["calls"] == 2
+    assert stats["paste"]["timeouts"] == 0
+
+
+def test_timeout_backend_serves_last_known_value_while_stuck():
+    inner = _SlowBackend()
+    backend = TimeoutClipboardBackend(inner, timeout=0.05, fallback="seed")
+    inner.release.clear()
+
+    started = time.monotonic()
+    assert backend.paste() == "seed"
+    # Once a call is stuck, nothing else waits on the backend.
+    backend.copy("first")
+    backend.copy("second")
+    assert backend.snapshot() == ("second", content_digest("second"))
+    assert time.monotonic() - started < 1.0
+    assert backend.stats()["paste"]["timeouts"] == 1
+    assert backend.stats()["copy"]["timeouts"] == 2
+
+    inner.release.set()
+    deadline = time.monotonic() + 2.0
+    while inner.copies != ["second"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert inner.copies == ["second"]
+    assert backend.paste() == "second"
+
+
+def test_timeout_backend_does_not_stay_stuck_after_a_late_finish(monkeypatch):
+    class LateFuture(Future):
+        def result(self, timeout=None):
+            if timeout is None:
+                return super().result()
+            # The call finishes and the worker clears the stuck flag before
+            # the waiting thread handles its timeout.
+            super().result()
+            time.sleep(0.05)
+            raise FutureTimeoutError()
+
+    inner = _SlowBackend()
+    backend = TimeoutClipboardBackend(inner, timeout=0.05, fallback="seed")
+    monkeypatch.setattr(clipboard, "Future", LateFuture)
+
+    assert backend.paste() == "system"
+    monkeypatch.undo()
+    assert not backend._stuck
+    backend.copy("new")
+    assert inner.copies == ["new"]
+    assert backend.stats()["paste"]["timeouts"] == 0
+
+
+def test_timeout_backend_reraises_backend_errors():
+    class FailingBackend(_SlowBackend):
+        def copy(self, text: str) -> None:
+            raise RuntimeError("no display")
+
+    backend = TimeoutClipboardBackend(FailingBackend(), timeout=1.0)
+
+    with pytest.raises(RuntimeError, match="no display"):
+        backend.copy("value")
+    assert backend.stats()["copy"]["errors"] == 1
+
+
+def test_timeout_backend_keeps_fallback_when_a_copy_fails():
+    class FailingBackend(_SlowBackend):
+        def copy(self, text: str) -> None:
+            raise RuntimeError("no display")
+
+    inner = FailingBackend()
+    backend = TimeoutClipboardBackend(inner, timeout=0.05, fallback="seed")
+
+    with pytest.raises(RuntimeError, match="no display"):
+        backend.copy("never copied")
+    inner.release.clear()
+    # The backend is stuck, so the paste is answered from the fallback.
+    assert backend.paste() == "seed"
+    inner.release.set()
+
+
+FAKE_HELPER = '''
+import struct
+import sys
+
+header = struct.Struct(">cI")
+value = b""
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+while True:
+    raw = stdin.read(header.size)
+    if not raw:
+        break
+    code, size = header.unpack(raw)
+    payload = stdin.read(size)
+    if code == b"C":
+        if payload == b"crash":
+            sys.exit(1)
+        value = payload
+        stdout.write(header.pack(b"O", 0))
+    elif code == b"P":
+        stdout.write(header.pack(b"O", len(value)) + value)
+    else:
+        stdout.write(header.pack(b"E", 3) + b"bad")
+    stdout.flush()
+'''
+
+
+@pytest.fixture
+def helper_backend(tmp_path):
+    script = tmp_path / "fake_helper.py"
+    script.write_text(FAKE_HELPER)
+    backend = HelperClipboardBackend([sys.executable, str(script)])
+    yield backend
+    backend.close()
+
+
+def test_helper_backend_round_trips_through_one_process(helper_backend):
+    helper_backend.copy("héllo\nwörld")
+    process = helper_backend._process
+
+    assert helper_backend.paste() == "héllo\nwörld"
+    assert helper_backend.snapshot() == ("héllo\nwörld", content_digest("héllo\nwörld"))
+    helper_backend.copy("")
+    assert helper_backend.paste() == ""
+    assert helper_backend._process is process
+
+
+def test_helper_backend_restarts_a_dead_helper(helper_backend):
+    helper_backend.copy("before")
+    first = helper_backend._process
+    first.kill()
+    first.wait()
+
+    helper_backend.copy("after")
+    assert helper_backend.paste() == "after"
+    assert helper_backend._process is not first
+
+    with pytest.raises(RuntimeError, match="not responding"):
+        helper_backend.copy("crash")
+    # The next request starts a fresh helper again.
+    assert helper_backend.paste() == ""
+
+
+def test_helper_protocol_reports_errors():
+    stream = io.BytesIO()
+    clipboard_helper.write_frame(stream, b"X", b"")
+    stream.seek(0)
+    code, payload = clipboard_helper.read_frame(stream)
+
+    response = clipboard_helper.handle_request(code, payload, lambda text: None, lambda: "")
+    assert response[0] == clipboard_helper.ERROR
+    assert clipboard_helper.read_frame(stream) is None
+
+
+def test_clipboard_module_does_not_import_sqlalchemy():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(Path(clipboard.__file__).parents[1]), env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, remoclip.clipboard; print('sqlalchemy' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -1,3 +1,4 @@
+import os
 import textwrap
 from pathlib import Path
 import sys
@@ -25,6 +26,9 @@ def test_load_config_uses_defaults_when_file_missing(tmp_path, monkeypatch):
         "clipboard_backend"
     ]
     assert loaded.server.allow_deletions is False
+    assert loaded.server.concurrency == "threads"
+    assert loaded.server.max_workers == config.DEFAULT_CONFIG["server"]["max_workers"]
+    assert loaded.server.queue_size == config.DEFAULT_CONFIG["server"]["queue_size"]
     assert loaded.client.url == config.DEFAULT_CONFIG["client"]["url"]
     assert loaded.client.socket is None
 
@@ -40,7 +44,14 @@ def test_load_config_overrides_defaults(tmp_path):
                 port: 4000
                 db: ~/custom.sqlite
                 clipboard_backend: private
+                clipboard_timeout: 0.5
                 allow_deletions: true
+                concurrency: single
+                max_workers: 2
+                queue_size: 0
+                event_log:
+                    mode: async
+                    batch_size: 10
             client:
                 url: https://example.com:4000
                 socket: /tmp/remoclip.sock
@@ -55,6 +66,189 @@ def test_load_config_overrides_defaults(tmp_path):
     assert loaded.server.port == 4000
     assert loaded.server.db_path == Path("~/custom.sqlite").expanduser()
     assert loaded.server.clipboard_backend == "private"
+    assert loaded.server.clipboard_timeout == 0.5
     assert loaded.server.allow_deletions is True
+    assert loaded.server.concurrency == "single"
+    assert loaded.server.max_workers == 2
+    assert loaded.server.queue_size == 0
+    assert loaded.server.event_log.mode == "async"
+    assert loaded.server.event_log.batch_size == 10
+    assert loaded.server.event_log.flush_interval == config.DEFAULT_CONFIG["server"][
+        "event_log"
+    ]["flush_interval"]
     assert loaded.client.url == "https://example.com:4000"
     assert loaded.client.socket_path == Path("/tmp/remoclip.sock")
+
+
+@pytest.mark.parametrize(
+    ("snippet", "error"),
+    [
+        ("concurrency: forked", ValueError),
+        ("max_workers: 0", ValueError),
+        ("queue_size: many", TypeError),
+        ("keep_alive_timeout: -1", ValueError),
+        ("event_log: async", TypeError),
+        ("event_log: {mode: later}", ValueError),
+        ("storage: fast", TypeError),
+        ("storage: {preset: reckless}", ValueError),
+        ("storage: {journal_mode: memory}", ValueError),
+        ("storage: {page_size: 4096}", ValueError),
+        ("storage: {mmap_size: -1}", ValueError),
+        ("retention: {max_events: -5}", ValueError),
+        ("retention: {actions: [paste]}", TypeError),
+        ("retention: {actions: {cut: 3}}", ValueError),
+        ("compression: {codec: brotli}", ValueError),
+        ("compression: {min_size: big}", TypeError),
+        ("history_cache: {entries: -1}", ValueError),
+        ("history_cache: 200", TypeError),
+        ("clipboard_timeout: -1", ValueError),
+        ("clipboard_timeout: soon", TypeError),
+        ("clipboard_backend: xclip", ValueError),
+        ("clipboard_helper: [helper, 3]", TypeError),
+        ("local_watch: {enabled: yes please}", TypeError),
+        ("local_watch: {min_interval: 2, max_interval: 1}", ValueError),
+        ("local_watch: {cpu_budget: 0}", ValueError),
+    ],
+)
+def test_load_config_rejects_invalid_concurrency_settings(tmp_path, snippet, error):
+    config_file = tmp_path / "invalid.yaml"
+    config_file.write_text(f"server:\n    {snippet}\n")
+
+    with pytest.raises(error):
+        config.load_config(str(config_file))
+
+
+def test_clipboard_helper_command_accepts_string_or_list(tmp_path):
+    config_file = tmp_path / "helper.yaml"
+    config_file.write_text(
+        "server:\n    clipboard_backend: helper\n"
+        "    clipboard_helper: \"/opt/clip helper --quiet 'two words'\"\n"
+    )
+    loaded = config.load_config(str(config_file))
+    assert loaded.server.clipboard_backend == "helper"
+    assert loaded.server.clipboard_helper == ("/opt/clip", "helper", "--quiet", "two words")
+
+    config_file.write_text("server:\n    clipboard_helper: [wl-helper, --primary]\n")
+    assert config.load_config(str(config_file)).server.clipboard_helper == (
+        "wl-helper",
+        "--primary",
+    )
+
+
+def test_storage_preset_resolves_pragmas_with_overrides(tmp_path):
+    config_file = tmp_path / "storage.yaml"
+    config_file.write_text(
+        textwrap.dedent(
+            """
+            server:
+                storage:
+                    preset: fast
+                    busy_timeout: 2.5
+            """
+        )
+    )
+
+    storage = config.load_config(str(config_file)).server.storage
+
+    fast = config.STORAGE_PRESETS["fast"]
+    assert storage.preset == "fast"
+    assert storage.synchronous == fast["synchronous"]
+    assert storage.mmap_size == fast["mmap_size"]
+    assert storage.busy_timeout == 2.5
+    pragmas = storage.pragmas()
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["busy_timeout"] == 2500
+    assert pragmas["cache_size"] == -fast["cache_size"]
+
+
+def test_retention_settings_are_loaded(tmp_path):
+    config_file = tmp_path / "retention.yaml"
+    config_file.write_text(
+        textwrap.dedent(
+            """
+            server:
+                retention:
+                    interval: 60
+                    max_age_days: 90
+                    max_bytes: 1000000
+                    actions:
+                        history: 7
+                        paste: 30
+            """
+        )
+    )
+
+    retention = config.load_config(str(config_file)).server.retention
+
+    assert retention.enabled
+    assert retention.interval == 60
+    assert retention.max_age_days == 90
+    assert retention.max_events is None
+    assert retention.max_bytes == 1000000
+    assert retention.actions == {"history": 7, "paste": 30}
+    assert retention.batch_size == config.DEFAULT_CONFIG["server"]["retention"]["batch_size"]
+
+
+def test_compression_settings_are_loaded_for_server_and_client(tmp_path):
+    config_file = tmp_path / "compression.yaml"
+    config_file.write_text(
+        textwrap.dedent(
+            """
+            server:
+                compression:
+                    codec: zstd
+                    min_size: 4096
+            client:
+                compression:
+                    codec: none
+            """
+        )
+    )
+
+    loaded = config.load_config(str(config_file))
+
+    assert loaded.server.compression == config.CompressionConfig(codec="zstd", min_size=4096)
+    assert loaded.client.compression.codec == "none"
+    assert not loaded.client.compression.enabled
+    assert loaded.client.compression.min_size == 1024
+
+
+def _write_settled(path: Path, text: str, age: float = 60.0) -> None:
+    path.write_text(text)
+    settled = path.stat().st_mtime - age
+    os.utime(path, (settled, settled))
+
+
+def test_parsed_configuration_is_cached_until_the_file_changes(tmp_path, monkeypatch):
+    import yaml
+
+    config_file = tmp_path / "cached.yaml"
+    _write_settled(config_file, "security_token: first\nserver:\n    port: 4000\n")
+
+    assert config.load_config(str(config_file)).security_token == "first"
+    cache_path = config.config_cache_path(config_file)
+    assert cache_path.stat().st_mode & 0o777 == 0o600
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached configuration should not be parsed")
+
+    monkeypatch.setattr(yaml, "safe_load", fail)
+    loaded = config.load_config(str(config_file))
+    assert loaded.security_token == "first"
+    assert loaded.server.port == 4000
+
+    monkeypatch.undo()
+    _write_settled(config_file, "security_token: second\n", age=30.0)
+    assert config.load_config(str(config_file)).security_token == "second"
+
+
+def test_config_cache_skips_recent_and_non_json_files(tmp_path):
+    config_file = tmp_path / "fresh.yaml"
+    config_file.write_text("security_token: fresh\n")
+    config.load_config(str(config_file))
+    assert not config.config_cache_path(config_file).exists()
+
+    # A YAML date has no JSON form, so the file is parsed every time.
+    _write_settled(config_file, "security_token: fresh\nnote: 2024-01-01\n")
+    config.load_config(str(config_file))
+    assert not config.config_cache_path(config_file).exists()
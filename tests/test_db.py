@@ -1,6 +1,21 @@
+import sqlite3
+
 import pytest
+from sqlalchemy import text
 
-from remoclip.db import ClipboardEvent, create_session_factory, session_scope
+from remoclip.db import (
+    PREVIEW_LENGTH,
+    SCHEMA_VERSION,
+    ClipboardBlob,
+    ClipboardEvent,
+    checkpoint_wal,
+    content_digest,
+    create_session_factory,
+    delete_unreferenced_blobs,
+    load_clipboard_state,
+    search_events,
+    session_scope,
+)
 
 
 def _make_configured_session_factory(tmp_path):
@@ -36,3 +51,307 @@ def test_session_scope_rolls_back_on_exception(tmp_path):
     with session_scope(session_factory) as session:
         events = session.query(ClipboardEvent).all()
         assert events == []
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    session_factory, _ = _make_configured_session_factory(tmp_path)
+
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="copy", content="same"))
+        session.add(ClipboardEvent(hostname="host", action="paste", content="same"))
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="paste", content="same"))
+        session.add(ClipboardEvent(hostname="host", action="copy", content="héllo"))
+
+    with session_scope(session_factory) as session:
+        blobs = {blob.hash: blob for blob in session.query(ClipboardBlob)}
+        assert set(blobs) == {content_digest("same"), content_digest("héllo")}
+        assert blobs[content_digest("héllo")].size == len("héllo".encode("utf-8"))
+        contents = [
+            event.content
+            for event in session.query(ClipboardEvent).order_by(ClipboardEvent.id)
+        ]
+        assert contents == ["same", "same", "same", "héllo"]
+
+
+def test_delete_unreferenced_blobs_keeps_shared_content(tmp_path):
+    session_factory, _ = _make_configured_session_factory(tmp_path)
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="copy", content="shared"))
+        session.add(ClipboardEvent(hostname="host", action="paste", content="shared"))
+        session.add(ClipboardEvent(hostname="host", action="copy", content="single"))
+
+    with session_scope(session_factory) as session:
+        for event in session.query(ClipboardEvent).filter(ClipboardEvent.action == "copy"):
+            session.delete(event)
+        deleted = delete_unreferenced_blobs(
+            session, [content_digest("shared"), content_digest("single")]
+        )
+        assert deleted == 1
+
+    with session_scope(session_factory) as session:
+        assert [blob.content for blob in session.query(ClipboardBlob)] == ["shared"]
+
+
+def test_blobs_store_a_truncated_preview(tmp_path):
+    session_factory, _ = _make_configured_session_factory(tmp_path)
+    content = "é" * (PREVIEW_LENGTH + 20)
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="copy", content=content))
+
+    with session_scope(session_factory) as session:
+        blob = session.get(ClipboardBlob, content_digest(content))
+        assert blob.preview == "é" * PREVIEW_LENGTH
+        assert blob.size == len(content.encode("utf-8"))
+
+
+def test_search_index_follows_inserts_and_deletes(tmp_path):
+    session_factory, _ = _make_configured_session_factory(tmp_path)
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="copy", content="deploy the api"))
+        session.add(ClipboardEvent(hostname="host", action="paste", content="deploy the api"))
+        session.add(ClipboardEvent(hostname="host", action="copy", content="api-key rotation"))
+        session.add(ClipboardEvent(hostname="host", action="history", content='{"api": 1}'))
+
+    with session_scope(session_factory) as session:
+        assert [row.id for row in search_events(session, "api", limit=10)] == [3, 2]
+        assert [row.id for row in search_events(session, "API rotation", limit=10)] == [3]
+        assert [row.id for row in search_events(session, 'deploy "the', limit=10)] == [2]
+        assert [row.id for row in search_events(session, "api", limit=1, offset=1)] == [2]
+        match = search_events(session, "rotation", limit=1)[0]
+        assert (match.action, match.size, match.preview) == (
+            "copy",
+            len("api-key rotation"),
+            "api-key rotation",
+        )
+        assert search_events(session, "rot", limit=10) == []
+        with pytest.raises(ValueError, match="must not be empty"):
+            search_events(session, "  ", limit=10)
+
+        session.delete(session.get(ClipboardEvent, 2))
+        session.flush()
+        delete_unreferenced_blobs(session, [content_digest("deploy the api")])
+
+    with session_scope(session_factory) as session:
+        assert [row.id for row in search_events(session, "deploy", limit=10)] == [1]
+        session.delete(session.get(ClipboardEvent, 3))
+        session.flush()
+        delete_unreferenced_blobs(session, [content_digest("api-key rotation")])
+
+    with session_scope(session_factory) as session:
+        assert [row.id for row in search_events(session, "rotation", limit=10)] == []
+        # Raises if the index disagrees with the content it was built from.
+        session.execute(
+            text("INSERT INTO clipboard_search (clipboard_search) VALUES ('integrity-check')")
+        )
+
+
+def test_pasting_indexed_content_does_not_grow_the_search_index(tmp_path):
+    session_factory, _ = _make_configured_session_factory(tmp_path)
+    content = "release notes " * 1000
+
+    def index_size() -> int:
+        with session_scope(session_factory) as session:
+            return session.execute(
+                text("SELECT sum(length(block)) FROM clipboard_search_data")
+            ).scalar()
+
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="copy", content=content))
+    size = index_size()
+    with session_scope(session_factory) as session:
+        for _ in range(5):
+            session.add(ClipboardEvent(hostname="host", action="paste", content=content))
+
+    assert index_size() == size
+    with session_scope(session_factory) as session:
+        assert [row.id for row in search_events(session, "release", limit=10)] == [6]
+        for index in range(5):
+            session.add(
+                ClipboardEvent(hostname="host", action="history", content=f'{{"audit": {index}}}')
+            )
+
+    assert index_size() == size
+    with session_scope(session_factory) as session:
+        assert search_events(session, "audit", limit=10) == []
+
+
+def _schema_summary(db_path):
+    with sqlite3.connect(db_path) as connection:
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        indexes = {
+            name: [row[2] for row in connection.execute(f"PRAGMA index_info({name})")]
+            for (name,) in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND name NOT LIKE 'sqlite_autoindex%'"
+            )
+        }
+        columns = {
+            table: [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+            for (table,) in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+    connection.close()
+    return version, indexes, columns
+
+
+def test_create_session_factory_upgrades_inline_content(tmp_path):
+    db_path = tmp_path / "legacy.sqlite"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "CREATE TABLE clipboard_events ("
+            "id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL, "
+            "hostname VARCHAR(255) NOT NULL, action VARCHAR(32) NOT NULL, "
+            "content TEXT NOT NULL)"
+        )
+        connection.executemany(
+            "INSERT INTO clipboard_events (id, timestamp, hostname, action, content) "
+            "VALUES (?, ?, 'host', ?, ?)",
+            [
+                (1, "2025-01-01 00:00:01", "copy", "log"),
+                (2, "2025-01-01 00:00:02", "paste", "log"),
+                (3, "2025-01-01 00:00:03", "copy", "other"),
+                (4, "2025-01-01 00:00:04", "paste", "latest"),
+            ],
+        )
+    connection.close()
+
+    session_factory = create_session_factory(db_path)
+
+    with session_scope(session_factory) as session:
+        events = session.query(ClipboardEvent).order_by(ClipboardEvent.id).all()
+        assert [(event.id, event.action, event.content) for event in events] == [
+            (1, "copy", "log"),
+            (2, "paste", "log"),
+            (3, "copy", "other"),
+            (4, "paste", "latest"),
+        ]
+        assert session.query(ClipboardBlob).count() == 3
+        assert load_clipboard_state(session) == ("latest", 2)
+        assert session.get(ClipboardBlob, content_digest("other")).preview == "other"
+        assert [row.id for row in search_events(session, "log", limit=10)] == [2]
+
+    create_session_factory(tmp_path / "fresh.sqlite")
+    assert _schema_summary(db_path) == _schema_summary(tmp_path / "fresh.sqlite")
+    assert _schema_summary(db_path)[0] == SCHEMA_VERSION
+
+
+def test_create_session_factory_rejects_newer_schema(tmp_path):
+    db_path = tmp_path / "future.sqlite"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    connection.close()
+
+    with pytest.raises(RuntimeError, match="newer than this remoclip release"):
+        create_session_factory(db_path)
+
+
+def test_latest_action_lookup_uses_action_timestamp_index(tmp_path):
+    session_factory, db_path = _make_configured_session_factory(tmp_path)
+
+    with sqlite3.connect(db_path) as connection:
+        plan = " ".join(
+            row[-1]
+            for row in connection.execute(
+                "EXPLAIN QUERY PLAN SELECT content_hash FROM clipboard_events "
+                "WHERE action = 'copy' ORDER BY timestamp DESC LIMIT 1"
+            )
+        )
+    connection.close()
+
+    assert "ix_clipboard_events_action_timestamp" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_copy_events_advance_clipboard_state(tmp_path):
+    session_factory, _ = _make_configured_session_factory(tmp_path)
+
+    with session_scope(session_factory) as session:
+        assert load_clipboard_state(session) == ("", 0)
+        session.add(ClipboardEvent(hostname="host", action="copy", content="one"))
+    with session_scope(session_factory) as session:
+        assert load_clipboard_state(session) == ("one", 1)
+        session.add(ClipboardEvent(hostname="host", action="copy", content="two"))
+        session.add(ClipboardEvent(hostname="host", action="copy", content="three"))
+        session.add(ClipboardEvent(hostname="host", action="paste", content="one"))
+    with session_scope(session_factory) as session:
+        assert load_clipboard_state(session) == ("three", 3)
+
+
+def test_deleting_current_content_moves_state_to_previous_copy(tmp_path):
+    session_factory, _ = _make_configured_session_factory(tmp_path)
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="copy", content="older"))
+    with session_scope(session_factory) as session:
+        session.add(ClipboardEvent(hostname="host", action="copy", content="secret"))
+
+    with session_scope(session_factory) as session:
+        secret = session.query(ClipboardEvent).filter(
+            ClipboardEvent.content_hash == content_digest("secret")
+        ).one()
+        session.delete(secret)
+        assert delete_unreferenced_blobs(session, [content_digest("secret")]) == 1
+
+    with session_scope(session_factory) as session:
+        assert load_clipboard_state(session) == ("older", 2)
+        assert [blob.content for blob in session.query(ClipboardBlob)] == ["older"]
+
+
+def test_create_session_factory_applies_pragmas(tmp_path):
+    db_path = tmp_path / "remoclip.sqlite"
+    session_factory = create_session_factory(
+        db_path,
+        pragmas={"journal_mode": "wal", "synchronous": "normal", "busy_timeout": 1234},
+    )
+
+    with session_scope(session_factory) as session:
+        connection = session.connection()
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1234
+
+
+def test_checkpoint_wal_truncates_large_log(tmp_path):
+    db_path = tmp_path / "remoclip.sqlite"
+    session_factory = create_session_factory(db_path, pragmas={"journal_mode": "wal"})
+    with session_scope(session_factory) as session:
+        session.add_all(
+            ClipboardEvent(hostname="host", action="copy", content=f"entry {index}" * 100)
+            for index in range(50)
+        )
+    wal_path = tmp_path / "remoclip.sqlite-wal"
+    assert wal_path.stat().st_size > 0
+
+    busy, _, _ = checkpoint_wal(session_factory)
+    assert busy == 0
+    assert wal_path.stat().st_size > 0
+
+    checkpoint_wal(session_factory, size_limit=1)
+    assert wal_path.stat().st_size == 0
+
+
+def test_checkpoint_wal_skips_rollback_journal(tmp_path):
+    session_factory = create_session_factory(tmp_path / "remoclip.sqlite")
+
+    assert checkpoint_wal(session_factory, size_limit=1) is None
+
+
+def test_databases_use_incremental_auto_vacuum(tmp_path):
+    legacy_path = tmp_path / "legacy.sqlite"
+    with sqlite3.connect(legacy_path) as connection:
+        connection.execute(
+            "CREATE TABLE clipboard_events ("
+            "id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL, "
+            "hostname VARCHAR(255) NOT NULL, action VARCHAR(32) NOT NULL, "
+            "content TEXT NOT NULL)"
+        )
+    connection.close()
+
+    create_session_factory(legacy_path)
+    create_session_factory(tmp_path / "fresh.sqlite", pragmas={"journal_mode": "wal"})
+
+    for path in (legacy_path, tmp_path / "fresh.sqlite"):
+        with sqlite3.connect(path) as connection:
+            assert connection.execute("PRAGMA auto_vacuum").fetchone() == (2,)
+        connection.close()
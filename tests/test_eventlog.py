@@ -0,0 +1,83 @@
+import threading
+
+from remoclip.db import ClipboardEvent, create_session_factory, session_scope
+from remoclip.eventlog import AsyncEventLog, SynchronousEventLog
+
+
+def _make_async_log(tmp_path, **options):
+    session_factory = create_session_factory(tmp_path / "events.sqlite")
+    write_lock = threading.Lock()
+    settings = {"batch_size": 4, "flush_interval": 0.01, "queue_size": 100}
+    settings.update(options)
+    return AsyncEventLog(session_factory, write_lock, **settings), session_factory, write_lock
+
+
+def _stored_contents(session_factory):
+    with session_scope(session_factory) as session:
+        return [
+            event.content
+            for event in session.query(ClipboardEvent).order_by(ClipboardEvent.id)
+        ]
+
+
+def test_synchronous_log_commits_immediately(tmp_path):
+    session_factory = create_session_factory(tmp_path / "events.sqlite")
+    event_log = SynchronousEventLog(session_factory, threading.Lock())
+
+    event_log.log("host", "copy", "hello")
+
+    assert _stored_contents(session_factory) == ["hello"]
+
+
+def test_async_log_writes_batches_in_order(tmp_path):
+    event_log, session_factory, _ = _make_async_log(tmp_path)
+
+    for index in range(10):
+        event_log.log("host", "copy", str(index))
+    event_log.flush()
+
+    assert _stored_contents(session_factory) == [str(index) for index in range(10)]
+    with session_scope(session_factory) as session:
+        timestamps = [
+            timestamp
+            for (timestamp,) in session.query(ClipboardEvent.timestamp).order_by(
+                ClipboardEvent.id
+            )
+        ]
+    assert timestamps == sorted(timestamps)
+    event_log.stop()
+
+
+def test_async_log_stop_drains_pending_events(tmp_path):
+    event_log, session_factory, write_lock = _make_async_log(tmp_path, flush_interval=60)
+
+    with write_lock:
+        for index in range(6):
+            event_log.log("host", "paste", str(index))
+
+    event_log.stop()
+
+    assert _stored_contents(session_factory) == [str(index) for index in range(6)]
+
+
+def test_async_log_applies_backpressure_when_queue_is_full(tmp_path):
+    event_log, session_factory, write_lock = _make_async_log(
+        tmp_path, batch_size=1, queue_size=1
+    )
+
+    def producer() -> None:
+        # The blocked writer holds "first" and the queue holds "second", so
+        # logging "third" has to wait.
+        for content in ("first", "second", "third"):
+            event_log.log("host", "copy", content)
+
+    with write_lock:
+        blocked = threading.Thread(target=producer)
+        blocked.start()
+        blocked.join(timeout=0.2)
+        assert blocked.is_alive()
+
+    blocked.join(timeout=5)
+    assert not blocked.is_alive()
+    event_log.stop()
+    assert _stored_contents(session_factory) == ["first", "second", "third"]
@@ -0,0 +1,111 @@
+import sys
+from datetime import datetime, timezone
+
+from remoclip.db import EventRecord
+from remoclip.history_cache import HistoryCache
+
+
+def _record(event_id: int, action: str = "copy", content: str | None = None) -> EventRecord:
+    return EventRecord(
+        event_id,
+        datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "host",
+        action,
+        f"hash-{event_id}",
+        content if content is not None else f"content {event_id}",
+    )
+
+
+def _ids(records):
+    return None if records is None else [record.id for record in records]
+
+
+def test_window_serves_pages_it_fully_covers():
+    cache = HistoryCache(entries=3, lookup_entries=2, max_bytes=1 << 20)
+    cache.warm([_record(5), _record(4), _record(2)])
+    cache.add([_record(6), _record(7, action="history"), _record(8)])
+
+    assert _ids(cache.page(limit=2)) == [8, 6]
+    assert _ids(cache.page(limit=3)) == [8, 6, 5]
+    assert cache.page(limit=4) is None
+    assert _ids(cache.page(limit=1, before_id=6)) == [5]
+    assert cache.page(limit=2, before_id=6) is None
+    assert _ids(cache.page(limit=1, after_id=5)) == [6]
+    assert _ids(cache.page(limit=5, after_id=4)) == [8, 6, 5]
+    assert cache.page(limit=5, after_id=3) is None
+    assert cache.page(limit=None) is None
+    assert cache.stats()["hits"] == 5
+    assert cache.stats()["misses"] == 4
+
+
+def test_small_history_is_served_completely():
+    cache = HistoryCache(entries=10, lookup_entries=0, max_bytes=1 << 20)
+    cache.warm([_record(2), _record(1)])
+
+    assert _ids(cache.page(limit=None)) == [2, 1]
+    assert _ids(cache.page(limit=5, before_id=2)) == [1]
+    assert _ids(cache.page(limit=5, after_id=2)) == []
+
+    cache.discard([2])
+    assert _ids(cache.page(limit=None)) == [1]
+
+
+def test_byte_budget_evicts_lookups_before_the_window():
+    big = "x" * 1000
+    budget = 3 * sys.getsizeof(big) + 10
+    cache = HistoryCache(entries=10, lookup_entries=5, max_bytes=budget)
+    cache.warm([_record(11, content=big), _record(10, content=big)])
+    cache.remember(_record(3, content=big), cache.generation)
+    assert cache.get(3) is not None
+
+    cache.add([_record(12, content=big)])
+    assert cache.get(3) is None
+    assert _ids(cache.page(limit=None)) == [12, 11, 10]
+
+    cache.add([_record(13, content=big)])
+    assert _ids(cache.page(limit=3)) == [13, 12, 11]
+    # Something older than the window was evicted, so it no longer knows
+    # the complete history.
+    assert cache.page(limit=None) is None
+    assert cache.stats()["entries"] == 3
+    assert cache.stats()["bytes"] <= budget
+
+
+def test_lookups_are_least_recently_used():
+    cache = HistoryCache(entries=1, lookup_entries=2, max_bytes=1 << 20)
+    cache.remember(_record(1), cache.generation)
+    cache.remember(_record(2), cache.generation)
+    cache.get(1)
+    cache.remember(_record(3), cache.generation)
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+
+
+def test_events_deleted_while_loading_are_not_remembered():
+    cache = HistoryCache(entries=1, lookup_entries=2, max_bytes=1 << 20)
+    generation = cache.generation
+    # The event was read, then deleted before the reader could cache it.
+    cache.discard([1])
+    cache.remember(_record(1), generation)
+
+    assert cache.get(1) is None
+    cache.remember(_record(1), cache.generation)
+    assert cache.get(1) is not None
+
+
+def test_disabled_cache_never_answers():
+    cache = HistoryCache(entries=0, lookup_entries=10, max_bytes=1 << 20)
+    cache.warm([_record(1)])
+    cache.remember(_record(1), cache.generation)
+
+    assert cache.page(limit=1) is None
+    assert cache.get(1) is None
+    assert cache.stats() == {
+        "hits": 0,
+        "misses": 0,
+        "entries": 0,
+        "lookup_entries": 0,
+        "bytes": 0,
+    }
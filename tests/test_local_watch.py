@@ -0,0 +1,93 @@
+import threading
+
+from remoclip.clipboard import PrivateClipboardBackend
+from remoclip.local_watch import BACKOFF_FACTOR, LocalClipboardWatcher
+
+
+def _make_watcher(backend, **options):
+    changes: list[str] = []
+    lock = threading.Lock()
+    watcher = LocalClipboardWatcher(backend, changes.append, lock, **options)
+    return watcher, changes, lock
+
+
+def test_watcher_reports_changes_once():
+    backend = PrivateClipboardBackend(_value="seed")
+    watcher, changes, _ = _make_watcher(backend, initial_value="seed")
+
+    assert watcher.poll_once() is False
+    backend.copy("copied locally")
+    assert watcher.poll_once() is True
+    assert watcher.poll_once() is False
+
+    assert changes == ["copied locally"]
+
+
+def test_watcher_ignores_values_written_by_remoclip():
+    backend = PrivateClipboardBackend()
+    watcher, changes, lock = _make_watcher(backend)
+
+    with lock:
+        backend.copy("from /copy")
+        watcher.observe("from /copy")
+
+    assert watcher.poll_once() is False
+    assert changes == []
+
+
+def test_watcher_drops_a_poll_that_raced_a_remote_copy():
+    backend = PrivateClipboardBackend()
+    lock = threading.Lock()
+    changes: list[str] = []
+
+    class RacingBackend:
+        def paste(self):
+            value = backend.paste()
+            # A remote copy lands while the local read is in flight.
+            with lock:
+                watcher.observe("remote")
+            return value
+
+    watcher = LocalClipboardWatcher(RacingBackend(), changes.append, lock)
+    backend.copy("stale local")
+
+    assert watcher.poll_once() is False
+    assert changes == []
+
+
+def test_watcher_backs_off_while_idle_and_resets_on_change():
+    backend = PrivateClipboardBackend()
+    watcher, _, _ = _make_watcher(backend, min_interval=0.1, max_interval=0.3)
+
+    watcher.poll_once()
+    assert watcher.interval == 0.1 * BACKOFF_FACTOR
+    for _ in range(5):
+        watcher.poll_once()
+    assert watcher.interval == 0.3
+
+    backend.copy("new")
+    watcher.poll_once()
+    assert watcher.interval == 0.1
+
+
+def test_watcher_interval_respects_cpu_budget(monkeypatch):
+    ticks = iter([0.0, 0.05])
+    monkeypatch.setattr("remoclip.local_watch.time.perf_counter", lambda: next(ticks))
+    watcher, _, _ = _make_watcher(
+        PrivateClipboardBackend(), min_interval=0.1, max_interval=1.0, cpu_budget=0.01
+    )
+
+    watcher.poll_once()
+
+    assert watcher.interval == 5.0
+
+
+def test_watcher_survives_backend_errors():
+    class BrokenBackend:
+        def paste(self):
+            raise RuntimeError("no display")
+
+    watcher, changes, _ = _make_watcher(BrokenBackend())
+
+    assert watcher.poll_once() is False
+    assert changes == []
@@ -0,0 +1,121 @@
+import threading
+from datetime import timedelta
+
+from remoclip.config import RetentionConfig
+from remoclip.db import (
+    ClipboardBlob,
+    ClipboardEvent,
+    create_session_factory,
+    load_clipboard_state,
+    session_scope,
+    utc_now,
+)
+from remoclip.retention import enforce_retention
+
+
+def _seed(session_factory, events):
+    with session_scope(session_factory) as session:
+        session.add_all(
+            ClipboardEvent(timestamp=timestamp, hostname="host", action=action, content=content)
+            for timestamp, action, content in events
+        )
+
+
+def _remaining(session_factory):
+    with session_scope(session_factory) as session:
+        return [
+            (event.action, event.content)
+            for event in session.query(ClipboardEvent).order_by(ClipboardEvent.id)
+        ]
+
+
+def test_age_rules_prune_old_events_in_batches(tmp_path):
+    session_factory = create_session_factory(tmp_path / "remoclip.sqlite")
+    now = utc_now()
+    _seed(
+        session_factory,
+        [
+            (now - timedelta(days=40), "copy", "ancient"),
+            (now - timedelta(days=10), "history", "{}"),
+            (now - timedelta(days=10), "paste", "older"),
+            (now - timedelta(days=10), "copy", "older"),
+            (now - timedelta(days=1), "history", "{}"),
+            (now - timedelta(days=1), "copy", "recent"),
+        ],
+    )
+    retention = RetentionConfig(
+        batch_size=1, max_age_days=30, actions={"history": 7, "paste": 7}
+    )
+
+    assert enforce_retention(session_factory, threading.Lock(), retention, now=now) == 3
+
+    assert _remaining(session_factory) == [
+        ("copy", "older"),
+        ("history", "{}"),
+        ("copy", "recent"),
+    ]
+    with session_scope(session_factory) as session:
+        assert {blob.content for blob in session.query(ClipboardBlob)} == {
+            "older",
+            "recent",
+            "{}",
+        }
+
+
+def test_count_and_size_limits_keep_current_clipboard(tmp_path):
+    session_factory = create_session_factory(tmp_path / "remoclip.sqlite")
+    now = utc_now()
+    _seed(
+        session_factory,
+        [(now, "copy", f"entry {index}" * 10) for index in range(10)]
+        + [(now, "paste", "entry 9" * 10)],
+    )
+
+    enforce_retention(
+        session_factory, threading.Lock(), RetentionConfig(batch_size=3, max_events=4)
+    )
+    assert len(_remaining(session_factory)) == 4
+
+    enforce_retention(
+        session_factory, threading.Lock(), RetentionConfig(batch_size=3, max_bytes=1)
+    )
+    assert _remaining(session_factory) == [("paste", "entry 9" * 10)]
+    with session_scope(session_factory) as session:
+        assert load_clipboard_state(session) == ("entry 9" * 10, 10)
+        assert session.query(ClipboardBlob).count() == 1
+
+
+def test_size_limit_stops_at_an_oversized_current_clipboard(tmp_path):
+    session_factory = create_session_factory(tmp_path / "remoclip.sqlite")
+    now = utc_now()
+    large = "x" * 300
+    _seed(
+        session_factory,
+        [(now, "copy", "a"), (now, "copy", "b"), (now, "copy", large), (now, "paste", large)],
+    )
+
+    retention = RetentionConfig(batch_size=1, max_bytes=10)
+    assert enforce_retention(session_factory, threading.Lock(), retention) == 2
+
+    assert _remaining(session_factory) == [("copy", large), ("paste", large)]
+    assert enforce_retention(session_factory, threading.Lock(), retention) == 0
+
+
+def test_retention_returns_freed_pages_to_the_file_system(tmp_path):
+    db_path = tmp_path / "remoclip.sqlite"
+    session_factory = create_session_factory(db_path)
+    old = utc_now() - timedelta(days=2)
+    _seed(session_factory, [(old, "copy", f"{index} " * 5000) for index in range(50)])
+    size_before = db_path.stat().st_size
+
+    enforce_retention(session_factory, threading.Lock(), RetentionConfig(max_age_days=1))
+
+    assert db_path.stat().st_size < size_before / 2
+    with session_scope(session_factory) as session:
+        assert session.connection().exec_driver_sql("PRAGMA freelist_count").scalar() == 0
+
+
+def test_retention_is_disabled_without_limits():
+    assert not RetentionConfig().enabled
+    assert RetentionConfig(actions={"paste": 1}).enabled
+    assert not RetentionConfig(interval=0, max_events=10).enabled